@@ -168,6 +168,8 @@ class DataflowDAG:
         return paths
 
 class AstInterpreter(InterpreterBase):
+    keep_whitespace = True
+
     def __init__(self, source_root: str, subdir: str, subproject: SubProject, subproject_dir: str, env: environment.Environment, visitors: T.Optional[T.List[AstVisitor]] = None):
         super().__init__(source_root, subdir, subproject, subproject_dir, env)
         self.visitors = visitors if visitors is not None else []
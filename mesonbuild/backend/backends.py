@@ -4,7 +4,7 @@
 from __future__ import annotations
 
 from collections import OrderedDict
-from dataclasses import dataclass, InitVar
+from dataclasses import dataclass, field, InitVar
 from functools import lru_cache
 from itertools import chain
 from pathlib import Path
@@ -16,6 +16,7 @@ import pickle
 import re
 import shlex
 import shutil
+import sys
 import typing as T
 import hashlib
 
@@ -25,6 +26,7 @@ from .. import programs
 from .. import mesonlib
 from .. import mlog
 from .. import compilers
+from ..coredata import version as meson_version
 from ..compilers import detect, lang_suffixes
 from ..mesonlib import (
     File, MachineChoice, MesonException, MesonBugException, OrderedSet,
@@ -69,6 +71,32 @@ class RegenInfo:
     source_dir: str
     build_dir: str
     depfiles: T.List[str]
+    # Content hashes of the depfiles, only stored with skip_noop_regen
+    hashes: T.Dict[str, str] = field(default_factory=dict)
+    version: str = ''
+
+    def changed_files(self) -> T.Optional[T.List[str]]:
+        """Return the depfiles whose content changed.
+
+        Returns None if skip_noop_regen is disabled or any file cannot be
+        compared, in which case the build files must be regenerated.
+        """
+        if not self.hashes or self.version != meson_version:
+            return None
+        changed: T.List[str] = []
+        for f, digest in self.hashes.items():
+            try:
+                if hash_file(os.path.join(self.build_dir, f)) != digest:
+                    changed.append(f)
+            except OSError:
+                return None
+        return changed
+
+def hash_file(fname: str) -> str:
+    h = hashlib.sha256()
+    with open(fname, 'rb') as f:
+        h.update(f.read())
+    return h.hexdigest()
 
 class TestProtocol(enum.Enum):
 
@@ -620,6 +648,31 @@ class Backend:
                                        exe_wrapper, workdir,
                                        extra_paths, capture, feed, tag, verbose, installdir_map)
 
+    @mesonlib.lazy_property
+    def use_script_worker(self) -> bool:
+        if self.name != 'ninja' or getattr(sys, 'frozen', False):
+            return False
+        if not self.environment.coredata.optstore.get_value_for(OptionKey('script_worker')):
+            return False
+        from ..scripts import worker
+        if not worker.is_supported(self.environment.get_scratch_dir()):
+            mlog.debug('Not using the script worker, it is not supported on this platform or the build directory path is too long')
+            return False
+        return True
+
+    def get_script_command(self, script: str) -> T.List[str]:
+        """Return the command that runs the internal script `script`.
+
+        With the script_worker option, scripts that are run for many build
+        edges go through a client of the persistent worker process.
+        """
+        if self.use_script_worker:
+            from ..scripts import worker
+            if script in worker.WORKER_SCRIPTS:
+                client = os.path.join(os.path.dirname(worker.__file__), 'worker_client.py')
+                return mesonlib.python_command + ['-I', client, self.environment.get_scratch_dir(), script]
+        return self.environment.get_build_command() + ['--internal', script]
+
     def as_meson_exe_cmdline(self, exe: T.Union[str, mesonlib.File, build.BuildTarget, build.CustomTarget, programs.ExternalProgram],
                              cmd_args: T.Sequence[T.Union[str, mesonlib.File, build.BuildTarget, build.CustomTarget, programs.ExternalProgram]],
                              workdir: T.Optional[str] = None,
@@ -689,7 +742,7 @@ class Backend:
                 args += ['--feed', feed]
 
             return (
-                self.environment.get_build_command() + ['--internal', 'exe'] + args + ['--'] + es.cmd_args,
+                self.get_script_command('exe') + args + ['--'] + es.cmd_args,
                 ', '.join(reasons)
             )
 
@@ -718,7 +771,7 @@ class Backend:
         exe_data = os.path.join(self.environment.get_scratch_dir(), scratch_file)
         with open(exe_data, 'wb') as f:
             pickle.dump(es, f)
-        return (self.environment.get_build_command() + ['--internal', 'exe', '--unpickle', exe_data],
+        return (self.get_script_command('exe') + ['--unpickle', exe_data],
                 ', '.join(reasons))
 
     def serialize_tests(self) -> T.Tuple[str, str]:
@@ -1318,11 +1371,19 @@ class Backend:
         self.check_clock_skew(deps)
         return list(deps)
 
+    def get_regen_hashes(self) -> T.Dict[str, str]:
+        '''Content hashes of the files returned by get_regen_filelist().'''
+        build_dir = self.environment.get_build_dir()
+        return {f: hash_file(os.path.join(build_dir, f)) for f in self.get_regen_filelist()}
+
     def generate_regen_info(self) -> None:
         deps = self.get_regen_filelist()
         regeninfo = RegenInfo(self.environment.get_source_dir(),
                               self.environment.get_build_dir(),
                               deps)
+        if self.environment.coredata.optstore.get_value_for(OptionKey('skip_noop_regen')):
+            regeninfo.hashes = self.get_regen_hashes()
+            regeninfo.version = self.environment.coredata.version
         filename = os.path.join(self.environment.get_scratch_dir(),
                                 'regeninfo.dump')
         with open(filename, 'wb') as f:
@@ -119,6 +119,19 @@ Please report this error with a test case to the Meson bug tracker.'''
 
     return text
 
+# The same paths and arguments are quoted for thousands of build statements
+@lru_cache(maxsize=None)
+def ninja_quote_path(text: str) -> str:
+    return ninja_quote(text, True)
+
+@lru_cache(maxsize=None)
+def ninja_quote_arg(text: str, qf: T.Callable[[str], str]) -> str:
+    return ninja_quote(qf(text))
+
+# Variable values longer than this that are used by several build statements
+# are written once as a global variable
+SHARED_VARIABLE_MIN_LENGTH = 100
+
 
 @dataclass
 class TargetDependencyScannerInfo:
@@ -346,8 +359,8 @@ class NinjaBuildElement:
         if not self.rule.rspable:
             return False
 
-        infilenames = ' '.join([ninja_quote(i, True) for i in self.infilenames])
-        outfilenames = ' '.join([ninja_quote(i, True) for i in self.outfilenames])
+        infilenames = ' '.join([ninja_quote_path(i) for i in self.infilenames])
+        outfilenames = ' '.join([ninja_quote_path(i) for i in self.outfilenames])
 
         return self.rule.length_estimate(infilenames,
                                          outfilenames,
@@ -360,26 +373,25 @@ class NinjaBuildElement:
             else:
                 self.rule.refcount += 1
 
-    def write(self, outfile: T.TextIO) -> None:
+    def get_build_line(self) -> str:
         if self.output_errors:
             raise MesonException(self.output_errors)
-        ins = ' '.join([ninja_quote(i, True) for i in self.infilenames])
-        outs = ' '.join([ninja_quote(i, True) for i in self.outfilenames])
-        implicit_outs = ' '.join([ninja_quote(i, True) for i in self.implicit_outfilenames])
+        ins = ' '.join([ninja_quote_path(i) for i in self.infilenames])
+        outs = ' '.join([ninja_quote_path(i) for i in self.outfilenames])
+        implicit_outs = ' '.join([ninja_quote_path(i) for i in self.implicit_outfilenames])
         if implicit_outs:
             implicit_outs = ' | ' + implicit_outs
-        use_rspfile = self._should_use_rspfile
-        if use_rspfile:
+        if self._should_use_rspfile:
             rulename = self.rulename + '_RSP'
             mlog.debug(f'Command line for building {self.outfilenames} is long, using a response file')
         else:
             rulename = self.rulename
         line = f'build {outs}{implicit_outs}: {rulename} {ins}'
         if len(self.deps) > 0:
-            line += ' | ' + ' '.join([ninja_quote(x, True) for x in sorted(self.deps)])
+            line += ' | ' + ' '.join([ninja_quote_path(x) for x in sorted(self.deps)])
         if len(self.orderdeps) > 0:
             orderdeps = [str(x) for x in self.orderdeps]
-            line += ' || ' + ' '.join([ninja_quote(x, True) for x in sorted(orderdeps)])
+            line += ' || ' + ' '.join([ninja_quote_path(x) for x in sorted(orderdeps)])
         line += '\n'
         # This is the only way I could find to make this work on all
         # platforms including Windows command shell. Slash is a dir separator
@@ -394,9 +406,12 @@ class NinjaBuildElement:
                 (l.replace('//', '\\\\', 1) if l.startswith('//') else l)
                 for l in line.split(' ')
             )
-        outfile.write(line)
+        return line
 
-        if use_rspfile:
+    @mesonlib.lazy_property
+    def variables(self) -> T.List[T.Tuple[str, str]]:
+        """The quoted values of the variables of this build statement."""
+        if self._should_use_rspfile:
             if self.rule.rspfile_quote_style in {RSPFileSyntax.MSVC, RSPFileSyntax.TASKING}:
                 qf = cmd_quote
             else:
@@ -404,20 +419,26 @@ class NinjaBuildElement:
         else:
             qf = quote_func
 
-        for e in self.elems:
-            (name, elems) = e
+        variables: T.List[T.Tuple[str, str]] = []
+        for name, elems in self.elems:
             should_quote = name not in raw_names
-            line = f' {name} = '
             newelems = []
             for i in elems:
                 if not should_quote or i == '&&': # Hackety hack hack
                     newelems.append(ninja_quote(i))
                 else:
-                    newelems.append(ninja_quote(qf(i)))
-            line += ' '.join(newelems)
-            line += '\n'
-            outfile.write(line)
-        outfile.write('\n')
+                    newelems.append(ninja_quote_arg(i, qf))
+            variables.append((name, ' '.join(newelems)))
+        return variables
+
+    def write(self, outfile: T.TextIO, shared_variables: T.Optional[T.Mapping[str, str]] = None) -> None:
+        lines = [self.get_build_line()]
+        for name, value in self.variables:
+            if shared_variables and value in shared_variables:
+                value = '$' + shared_variables[value]
+            lines.append(f' {name} = {value}\n')
+        lines.append('\n')
+        outfile.write(''.join(lines))
 
     def check_outputs(self) -> None:
         for n in self.outfilenames:
@@ -537,12 +558,12 @@ class NinjaBackend(backends.Backend):
                 continue
             if compiler.id == 'pgi' and mesonlib.is_windows():
                 # for the purpose of this function, PGI doesn't act enough like MSVC
-                return open(tempfilename, 'a', encoding='utf-8')
+                return open(tempfilename, 'a', encoding='utf-8', buffering=1024 * 1024)
             if compiler.get_argument_syntax() == 'msvc':
                 break
         else:
             # None of our compilers are MSVC, we're done.
-            return open(tempfilename, 'a', encoding='utf-8')
+            return open(tempfilename, 'a', encoding='utf-8', buffering=1024 * 1024)
         filebase = 'incdetect.' + compilers.lang_suffixes[compiler.language][0]
         filename = os.path.join(self.environment.get_scratch_dir(),
                                 filebase)
@@ -581,7 +602,7 @@ class NinjaBackend(backends.Backend):
                 if match:
                     with open(tempfilename, 'ab') as binfile:
                         binfile.write(b'msvc_deps_prefix = ' + match.group(1) + b'\n')
-                    return open(tempfilename, 'a', encoding='utf-8')
+                    return open(tempfilename, 'a', encoding='utf-8', buffering=1024 * 1024)
             return None
 
         # Some cl wrappers (e.g. Squish Coco) output dependency info
@@ -688,6 +709,10 @@ class NinjaBackend(backends.Backend):
         # fully created.
         os.replace(tempfilename, outfilename)
         mlog.cmd_ci_include(outfilename)  # For CI debugging
+        self.generate_regen_info()
+        if self.use_script_worker:
+            from ..scripts import worker
+            worker.write_info(self.environment.get_scratch_dir(), self.environment.get_build_command())
         # Refresh Ninja's caches. https://github.com/ninja-build/ninja/pull/1685
         # Cannot use when running with dyndeps: https://github.com/ninja-build/ninja/issues/1952
         if ((mesonlib.version_compare(self.ninja_version, '>= 1.12.0') or
@@ -1448,8 +1473,29 @@ class NinjaBackend(backends.Backend):
             r.write(outfile)
 
     def write_builds(self, outfile: T.TextIO) -> None:
+        # Long values that are used by several build statements, like the
+        # arguments shared by all sources of a target, are written only once.
+        # This makes build.ninja smaller and faster for ninja to load.
+        counts: T.Dict[str, int] = defaultdict(int)
+        for b in self.build_elements:
+            if isinstance(b, NinjaBuildElement):
+                for name, value in b.variables:
+                    if name not in raw_names and len(value) >= SHARED_VARIABLE_MIN_LENGTH:
+                        counts[value] += 1
+        shared_variables: T.Dict[str, str] = {}
+        for value, count in counts.items():
+            if count > 1:
+                name = f'shared_vars_{len(shared_variables)}'
+                outfile.write(f'{name} = {value}\n')
+                shared_variables[value] = name
+        if shared_variables:
+            outfile.write('\n')
+
         for b in ProgressBar(self.build_elements, desc='Writing build.ninja'):
-            b.write(outfile)
+            if isinstance(b, NinjaBuildElement):
+                b.write(outfile, shared_variables)
+            else:
+                b.write(outfile)
         mlog.log_timestamp("build.ninja generated")
 
     def generate_phony(self) -> None:
@@ -2499,10 +2545,8 @@ class NinjaBackend(backends.Backend):
                 options = {}
                 self.add_rule(NinjaRule(rule, command, args, description, **options, extra=None))
 
-        args = self.environment.get_build_command() + \
-            ['--internal',
-             'symbolextractor',
-             self.environment.get_build_dir(),
+        args = self.get_script_command('symbolextractor') + \
+            [self.environment.get_build_dir(),
              '$in',
              '$IMPLIB',
              '$out']
@@ -2732,16 +2776,14 @@ https://gcc.gnu.org/bugzilla/show_bug.cgi?id=47485'''))
             # Scanning command is the same for native and cross compilation.
             return
 
-        command = self.environment.get_build_command() + \
-            ['--internal', 'depscan']
+        command = self.get_script_command('depscan')
         args = ['$picklefile', '$out', '$in']
         description = 'Scanning target $name for modules'
         rule = NinjaRule(rulename, command, args, description)
         self.add_rule(rule)
 
         rulename = 'depaccumulate'
-        command = self.environment.get_build_command() + \
-            ['--internal', 'depaccumulate']
+        command = self.get_script_command('depaccumulate')
         args = ['$out', '$in']
         description = 'Generating dynamic dependency information for target $name'
         rule = NinjaRule(rulename, command, args, description)
@@ -3118,28 +3160,35 @@ https://gcc.gnu.org/bugzilla/show_bug.cgi?id=47485'''))
     # Currently used for the purpose of populating VisualStudio intellisense fields but possibly useful in other scenarios.
     def generate_common_compile_args_per_src_type(self, target: build.BuildTarget) -> dict[str, list[str]]:
         src_type_to_args = {}
-
-        use_pch = self.target_uses_pch(target)
-
         for src_type_str in target.compilers.keys():
             compiler = target.compilers[src_type_str]
-            commands = self._generate_single_compile_base_args(target, compiler)
+            commands = compiler.compiler_args(self._generate_single_compile_commands(target, compiler))
+            src_type_to_args[src_type_str] = commands.to_native()
+        return src_type_to_args
 
-            # Include PCH header as first thing as it must be the first one or it will be
-            # ignored by gcc https://gcc.gnu.org/bugzilla/show_bug.cgi?id=100462
-            if use_pch and 'mw' not in compiler.id:
-                commands += self.get_pch_include_args(compiler, target)
+    @lru_cache(maxsize=None)
+    def _generate_single_compile_commands(self, target: build.BuildTarget, compiler: Compiler) -> CompilerArgs:
+        # The arguments common to all sources of a target compiled with the
+        # same compiler. They are computed once per target and copied for
+        # each source, which then adds its own arguments. This only lasts for
+        # one generation, nothing is reused when build.ninja is regenerated.
+        commands = self._generate_single_compile_base_args(target, compiler)
 
-            commands += self._generate_single_compile_target_args(target, compiler)
+        # Include PCH header as first thing as it must be the first one or it will be
+        # ignored by gcc https://gcc.gnu.org/bugzilla/show_bug.cgi?id=100462
+        use_pch = self.target_uses_pch(target)
+        if use_pch and 'mw' not in compiler.id:
+            commands += self.get_pch_include_args(compiler, target)
 
-            # Metrowerks compilers require PCH include args to come after intraprocedural analysis args
-            if use_pch and 'mw' in compiler.id:
-                commands += self.get_pch_include_args(compiler, target)
+        commands += self._generate_single_compile_target_args(target, compiler)
 
-            commands = commands.compiler.compiler_args(commands)
+        # Metrowerks compilers require PCH include args to come after intraprocedural analysis args
+        if use_pch and 'mw' in compiler.id:
+            commands += self.get_pch_include_args(compiler, target)
 
-            src_type_to_args[src_type_str] = commands.to_native()
-        return src_type_to_args
+        commands = commands.compiler.compiler_args(commands)
+        commands.flush_pre_post()
+        return commands
 
     def generate_single_compile(self, target: build.BuildTarget, src,
                                 is_generated: bool = False, header_deps=None,
@@ -3157,21 +3206,7 @@ https://gcc.gnu.org/bugzilla/show_bug.cgi?id=47485'''))
             raise AssertionError(f'BUG: sources should not contain headers {src!r}')
 
         compiler = get_compiler_for_source(target.compilers.values(), src)
-        commands = self._generate_single_compile_base_args(target, compiler)
-
-        # Include PCH header as first thing as it must be the first one or it will be
-        # ignored by gcc https://gcc.gnu.org/bugzilla/show_bug.cgi?id=100462
-        use_pch = self.target_uses_pch(target)
-        if use_pch and 'mw' not in compiler.id:
-            commands += self.get_pch_include_args(compiler, target)
-
-        commands += self._generate_single_compile_target_args(target, compiler)
-
-        # Metrowerks compilers require PCH include args to come after intraprocedural analysis args
-        if use_pch and 'mw' in compiler.id:
-            commands += self.get_pch_include_args(compiler, target)
-
-        commands = commands.compiler.compiler_args(commands)
+        commands = compiler.compiler_args(self._generate_single_compile_commands(target, compiler))
 
         # Create introspection information
         if is_generated is False:
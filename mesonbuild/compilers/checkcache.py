@@ -0,0 +1,134 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2026 The Meson development team
+
+"""A persistent cache of compiler check results shared between build directories.
+
+It is enabled by setting the MESON_CHECK_CACHE_DIR environment variable. Each
+result is stored in its own file named after the hash of its key, so that
+concurrent Meson processes never see partial entries. Entries are touched when
+used and the least recently used ones are evicted once the cache grows beyond
+MESON_CHECK_CACHE_MAX_SIZE (in MiB, 64 by default).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import typing as T
+
+from .. import mlog
+from ..coredata import version as meson_version
+
+if T.TYPE_CHECKING:
+    from .compilers import Compiler
+
+# Environment variables that change the outcome of compiler checks
+CHECK_ENV_VARS = [
+    'CPATH', 'C_INCLUDE_PATH', 'CPLUS_INCLUDE_PATH', 'OBJC_INCLUDE_PATH',
+    'LIBRARY_PATH', 'COMPILER_PATH', 'GCC_EXEC_PREFIX', 'SDKROOT',
+    'MACOSX_DEPLOYMENT_TARGET', 'INCLUDE', 'LIB', 'LIBPATH',
+    'LD_LIBRARY_PATH', 'DYLD_LIBRARY_PATH', 'PATH',
+]
+
+DEFAULT_MAX_SIZE = 64
+
+
+class CheckCache:
+
+    def __init__(self, cachedir: str, max_size: int) -> None:
+        self.cachedir = cachedir
+        self.max_size = max_size
+        self.identities: T.Dict[T.Tuple[str, ...], T.Tuple[T.Any, ...]] = {}
+        self.pruned = False
+
+    def compiler_identity(self, compiler: Compiler) -> T.Tuple[T.Any, ...]:
+        """Identify the compiler binaries by path, size and mtime."""
+        exelist = tuple(compiler.get_exelist())
+        if exelist not in self.identities:
+            identity: T.List[T.Any] = []
+            for exe in exelist:
+                path = shutil.which(exe) if not os.path.isabs(exe) else exe
+                try:
+                    st = os.stat(path) if path else None
+                except OSError:
+                    st = None
+                identity.append((exe, st.st_size, st.st_mtime_ns) if st else (exe,))
+            self.identities[exelist] = tuple(identity)
+        return self.identities[exelist]
+
+    def make_key(self, compiler: Compiler, kind: str, key: T.Tuple[T.Any, ...]) -> str:
+        env = tuple((v, os.environ.get(v)) for v in CHECK_ENV_VARS)
+        exe_wrapper = compiler.environment.exe_wrapper
+        wrapper = tuple(exe_wrapper.get_command()) if exe_wrapper is not None else ()
+        data = repr((meson_version, kind, self.compiler_identity(compiler), compiler.version, wrapper, env, key))
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cachedir, key[:2], key)
+
+    def get(self, key: str) -> T.Any:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError, ImportError):
+            return None
+        return result
+
+    def put(self, key: str, value: T.Any) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(path), prefix='.', delete=False) as f:
+                pickle.dump(value, f)
+            os.replace(f.name, path)
+        except OSError as e:
+            mlog.debug(f'Failed storing compiler check in {self.cachedir}: {e}')
+            return
+        if not self.pruned:
+            self.pruned = True
+            self.prune()
+
+    def prune(self) -> None:
+        """Remove the least recently used entries until the cache fits in max_size."""
+        entries: T.List[T.Tuple[float, int, str]] = []
+        try:
+            for d in os.scandir(self.cachedir):
+                if d.is_dir():
+                    for f in os.scandir(d.path):
+                        st = f.stat()
+                        entries.append((st.st_mtime, st.st_size, f.path))
+        except OSError:
+            return
+        total = sum(e[1] for e in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
+
+
+_cache: T.Optional[CheckCache] = None
+_cache_dir: T.Optional[str] = None
+
+def get_check_cache() -> T.Optional[CheckCache]:
+    """Return the persistent check cache, or None if it is not enabled."""
+    global _cache, _cache_dir
+    cachedir = os.environ.get('MESON_CHECK_CACHE_DIR')
+    if not cachedir:
+        return None
+    if _cache is None or _cache_dir != cachedir:
+        try:
+            max_size = int(os.environ.get('MESON_CHECK_CACHE_MAX_SIZE', DEFAULT_MAX_SIZE))
+        except ValueError:
+            max_size = DEFAULT_MAX_SIZE
+        _cache = CheckCache(os.path.abspath(cachedir), max_size * 1024 * 1024)
+        _cache_dir = cachedir
+    return _cache
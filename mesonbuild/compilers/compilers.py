@@ -8,6 +8,7 @@ import abc
 import contextlib, os.path, re
 import enum
 import itertools
+import threading
 import typing as T
 from dataclasses import dataclass, field
 from functools import lru_cache
@@ -438,6 +439,24 @@ def get_base_link_args(target: 'BuildTarget',
 class CrossNoRunException(MesonException):
     pass
 
+# Keys of the checks that were compiled ahead of time on a thread inside
+# prefetching_checks(). The first use of such a result is not reported as
+# cached, since that use is what the check was run for.
+_prefetch_state = threading.local()
+_prefetched_checks: T.Set['coredata.CompilerCheckCacheKey'] = set()
+
+@contextlib.contextmanager
+def prefetching_checks() -> T.Iterator[None]:
+    _prefetch_state.active = True
+    try:
+        yield
+    finally:
+        _prefetch_state.active = False
+
+def _is_prefetching() -> bool:
+    return getattr(_prefetch_state, 'active', False)
+
+
 @dataclass
 class RunResult(HoldableObject):
     compiled: bool
@@ -730,7 +749,20 @@ class Compiler(HoldableObject, metaclass=abc.ABCMeta):
             mlog.debug('Cached run stdout:\n', p.stdout)
             mlog.debug('Cached run stderr:\n', p.stderr)
         else:
-            p = self.run(code, extra_args=extra_args, dependencies=dependencies)
+            from .checkcache import get_check_cache
+            check_cache = get_check_cache()
+            shared_key = check_cache.make_key(self, 'run', key) if check_cache else ''
+            shared = check_cache.get(shared_key) if check_cache else None
+            if isinstance(shared, RunResult):
+                p = shared
+                p.cached = True
+                mlog.debug('Using shared cached run result:')
+                mlog.debug('Code:\n', code)
+                mlog.debug('Cached run returncode:\n', p.returncode)
+            else:
+                p = self.run(code, extra_args=extra_args, dependencies=dependencies)
+                if check_cache and p.compiled:
+                    check_cache.put(shared_key, p)
             run_check_cache[key] = p
         return p
 
@@ -910,16 +942,38 @@ class Compiler(HoldableObject, metaclass=abc.ABCMeta):
         cache = self.environment.coredata.compiler_check_cache
         if key in cache:
             p = cache[key]
-            p.cached = True
+            if _is_prefetching():
+                p.cached = True
+            else:
+                p.cached = key not in _prefetched_checks
+                _prefetched_checks.discard(key)
             mlog.debug('Using cached compile:')
             mlog.debug('Cached command line: ', ' '.join(p.command), '\n')
             mlog.debug('Code:\n', code)
             mlog.debug('Cached compiler stdout:\n', p.stdout)
             mlog.debug('Cached compiler stderr:\n', p.stderr)
             yield p
+            return
+
+        # Only checks of literal code can be shared, files may change
+        from .checkcache import get_check_cache
+        check_cache = get_check_cache() if isinstance(code, str) else None
+        shared_key = check_cache.make_key(self, 'compile', key) if check_cache else ''
+        shared = check_cache.get(shared_key) if check_cache else None
+        if isinstance(shared, CompileResult):
+            shared.cached = True
+            mlog.debug('Using shared cached compile:')
+            mlog.debug('Cached command line: ', ' '.join(shared.command), '\n')
+            mlog.debug('Code:\n', code)
+            cache[key] = shared
+            yield shared
         else:
             with self.compile(code, extra_args=extra_args, mode=mode, want_output=False, temp_dir=temp_dir) as p:
                 cache[key] = p
+                if _is_prefetching():
+                    _prefetched_checks.add(key)
+                if check_cache:
+                    check_cache.put(shared_key, p)
                 yield p
 
     def get_colorout_args(self, colortype: str) -> T.List[str]:
@@ -1444,8 +1498,13 @@ class Compiler(HoldableObject, metaclass=abc.ABCMeta):
             key = self.form_compileropt_key(key)
         if target:
             return self.environment.coredata.get_option_for_target(target, key)
-        else:
-            return self.environment.coredata.optstore.get_value_for(key.evolve(subproject=subproject))
+        key = key.evolve(subproject=subproject)
+        optstore = self.environment.coredata.optstore
+        if subproject is not None:
+            value = optstore.get_snapshot(subproject).get(key)
+            if value is not None:
+                return value
+        return optstore.get_value_for(key)
 
     def _update_language_stds(self, opts: MutableKeyedOptionDictType, value: T.List[str]) -> None:
         key = self.form_compileropt_key('std')
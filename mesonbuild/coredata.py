@@ -7,8 +7,9 @@ from __future__ import annotations
 import copy
 
 from . import mlog, options
-import pickle, os, uuid
+import io, pickle, os, uuid
 import sys
+import threading
 from functools import lru_cache
 from collections import OrderedDict
 import textwrap
@@ -39,6 +40,10 @@ if T.TYPE_CHECKING:
     CompilerCheckCacheKey = T.Tuple[T.Tuple[str, ...], str, FileOrString, T.Tuple[str, ...], CompileCheckMode]
     # code, args
     RunCheckCacheKey = T.Tuple[str, T.Tuple[str, ...]]
+    # pkg-config command, PKG_CONFIG* environment variables
+    PkgConfigCacheKey = T.Tuple[T.Tuple[str, ...], T.Tuple[T.Tuple[str, str], ...]]
+    # search path stamp, {args: (returncode, stdout, stderr)}
+    PkgConfigCacheValue = T.Tuple[str, T.Dict[T.Tuple[str, ...], T.Tuple[int, str, str]]]
 
 # Check major_versions_differ() if changing versioning scheme.
 #
@@ -206,6 +211,58 @@ class CMakeStateCache:
         return set(self.__cache.keys())
 
 
+class _SectionPickler(pickle.Pickler):
+
+    """Pickler for a lazily loaded section of CoreData.
+
+    Objects shared with the rest of CoreData (itself, the option store, the
+    compilers and the Environment) are stored as references so that they are
+    not duplicated when the section is loaded.
+    """
+
+    def __init__(self, file: T.BinaryIO, coredata: CoreData) -> None:
+        super().__init__(file)
+        from .environment import Environment
+        self.environment_type = Environment
+        self.coredata = coredata
+        self.environment: T.Optional[Environment] = None
+        self.compilers: T.Dict[int, T.Tuple[str, int, str]] = {}
+        for machine in MachineChoice:
+            for lang, comp in coredata.compilers[machine].items():
+                self.compilers[id(comp)] = ('compiler', machine.value, lang)
+
+    def persistent_id(self, obj: T.Any) -> T.Any:
+        if obj is self.coredata:
+            return 'coredata'
+        if obj is self.coredata.optstore:
+            return 'optstore'
+        if isinstance(obj, self.environment_type) and obj.coredata is self.coredata:
+            self.environment = obj
+            return 'environment'
+        return self.compilers.get(id(obj))
+
+
+class _SectionUnpickler(pickle.Unpickler):
+
+    def __init__(self, file: T.BinaryIO, coredata: CoreData, environment: T.Any) -> None:
+        super().__init__(file)
+        self.coredata = coredata
+        self.environment = environment
+
+    def persistent_load(self, pid: T.Any) -> T.Any:
+        if pid == 'coredata':
+            return self.coredata
+        if pid == 'optstore':
+            return self.coredata.optstore
+        if pid == 'environment':
+            return self.environment
+        _, machine, lang = pid
+        return self.coredata.compilers[MachineChoice(machine)][lang]
+
+
+# Guards the unpickling of CoreData.lazy_sections
+_sections_lock = threading.RLock()
+
 # Can't bind this near the class method it seems, sadly.
 _V = T.TypeVar('_V')
 
@@ -215,7 +272,13 @@ _V = T.TypeVar('_V')
 
 class CoreData:
 
+    # These caches can grow very large and most commands never use them, they
+    # are pickled separately and unpickled only when first accessed
+    lazy_sections = ('deps', 'compiler_check_cache', 'run_check_cache', 'pkgconfig_cache', 'cmake_cache')
+
     def __init__(self, cmd_options: SharedCMDOptions, scratch_dir: str, meson_command: T.List[str]):
+        self.__sections: T.Dict[str, bytes] = {}
+        self.__environment: T.Any = None
         self.lang_guids = {
             'default': '8BC9CEB8-8B4A-11D0-8D11-00A0C91BC942',
             'c': '8BC9CEB8-8B4A-11D0-8D11-00A0C91BC942',
@@ -253,6 +316,10 @@ class CoreData:
         self.compiler_check_cache: T.Dict['CompilerCheckCacheKey', 'CompileResult'] = OrderedDict()
         self.run_check_cache: T.Dict['RunCheckCacheKey', 'RunResult'] = OrderedDict()
 
+        # Results of pkg-config invocations, valid as long as no .pc file
+        # in its search path changes
+        self.pkgconfig_cache: T.Dict['PkgConfigCacheKey', 'PkgConfigCacheValue'] = {}
+
         # CMake cache
         self.cmake_cache: PerMachine[CMakeStateCache] = PerMachine(CMakeStateCache(), CMakeStateCache())
 
@@ -261,6 +328,44 @@ class CoreData:
         self.builtin_options_libdir_cross_fixup()
         self.optstore.init_builtins()
 
+    def __getstate__(self) -> T.Dict[str, T.Any]:
+        state = self.__dict__.copy()
+        sections = dict(state.pop('_CoreData__sections', {}))
+        environment = state.pop('_CoreData__environment', None)
+        for name in self.lazy_sections:
+            if name in state:
+                f = io.BytesIO()
+                pickler = _SectionPickler(f, self)
+                pickler.dump(state.pop(name))
+                sections[name] = f.getvalue()
+                environment = pickler.environment or environment
+        state['_CoreData__sections'] = sections
+        state['_CoreData__environment'] = environment
+        return state
+
+    def __setstate__(self, state: T.Dict[str, T.Any]) -> None:
+        state.setdefault('_CoreData__sections', {})
+        state.setdefault('_CoreData__environment', None)
+        self.__dict__.update(state)
+
+    # Hidden from mypy, otherwise all attributes of CoreData would become Any
+    if not T.TYPE_CHECKING:
+        def __getattr__(self, name: str) -> T.Any:
+            # Only called when the attribute is not found, i.e. for sections not yet loaded.
+            # Compiler checks may run in worker threads, so only one of them unpickles
+            # a section and the others see the result once it is set.
+            with _sections_lock:
+                if name in self.__dict__:
+                    return self.__dict__[name]
+                sections = self.__dict__.get('_CoreData__sections')
+                if not sections or name not in sections:
+                    raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')
+                unpickler = _SectionUnpickler(io.BytesIO(sections[name]), self, self.__dict__.get('_CoreData__environment'))
+                value = unpickler.load()
+                setattr(self, name, value)
+                del sections[name]
+                return value
+
     @staticmethod
     def __load_config_files(cmd_options: SharedCMDOptions, scratch_dir: str, ftype: str) -> T.List[str]:
         # Need to try and make the passed filenames absolute because when the
@@ -353,8 +458,14 @@ class CoreData:
             newkey = newkey.evolve(subproject=target.subproject)
         if self.is_cross_build():
             newkey = newkey.evolve(machine=target.for_machine)
-        option_object, value = self.optstore.get_option_and_value_for(newkey)
         override = target.get_override(newkey.name)
+        if override is None:
+            # The backend asks for the same few options of every target, look
+            # them up in the values resolved once for the whole subproject
+            value = self.optstore.get_snapshot(target.subproject).get(newkey)
+            if value is not None:
+                return value
+        option_object, value = self.optstore.get_option_and_value_for(newkey)
         if override is not None:
             return option_object.validate_value(override)
         return value
@@ -365,8 +476,13 @@ class CoreData:
     def clear_cache(self) -> None:
         self.deps.host.clear()
         self.deps.build.clear()
+        # No need to unpickle the check caches only to clear them
+        for name in ('compiler_check_cache', 'run_check_cache', 'pkgconfig_cache'):
+            if self.__sections.pop(name, None) is not None:
+                setattr(self, name, OrderedDict())
         self.compiler_check_cache.clear()
         self.run_check_cache.clear()
+        self.pkgconfig_cache.clear()
 
     def get_nondefault_buildtype_args(self) -> T.List[T.Union[T.Tuple[str, str, str], T.Tuple[str, bool, bool]]]:
         result: T.List[T.Union[T.Tuple[str, str, str], T.Tuple[str, bool, bool]]] = []
@@ -6,13 +6,15 @@ from __future__ import annotations
 from pathlib import Path
 
 from .base import ExternalDependency, DependencyException, sort_libpaths, DependencyTypeName
-from ..mesonlib import (EnvironmentVariables, OrderedSet, PerMachine, Popen_safe, Popen_safe_logged, MachineChoice,
-                        join_args, MesonException)
+from ..mesonlib import (EnvironmentVariables, OrderedSet, PerMachine, Popen_safe, MachineChoice,
+                        join_args, MesonException, determine_worker_count)
 from ..options import OptionKey
 from ..programs import find_external_program, ExternalProgram
 from .. import mlog
 from pathlib import PurePath
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
+import hashlib
 import re
 import os
 import shlex
@@ -123,6 +125,11 @@ class PkgConfigInterface:
         '''Return module variable or None if variable is not defined'''
         raise NotImplementedError
 
+    def prefetch(self, name: str, cflags_allow_system: bool = False, static: bool = False) -> None:
+        '''Prepare the cflags and libs of a module, if the implementation can
+           do it faster all at once than with separate calls.
+        '''
+
     def list_all(self) -> ImmutableListProtocol[str]:
         '''Return all available pkg-config modules'''
         raise NotImplementedError
@@ -138,6 +145,10 @@ class PkgConfigCLI(PkgConfigInterface):
         if self.pkgbin and not silent:
             mlog.log('Found pkg-config:', mlog.green('YES'), mlog.bold(f'({self.pkgbin.get_path()})'), mlog.blue(self.pkgbin_version))
         self.extra_paths = extra_paths or []
+        self._default_search_path: T.Optional[T.List[str]] = None
+        # Stamps of the search path, computed at most once per Meson run for
+        # each set of PKG_CONFIG* environment variables
+        self._search_path_stamps: T.Dict[T.Tuple[T.Tuple[str, str], ...], str] = {}
 
     def found(self) -> bool:
         return bool(self.pkgbin)
@@ -156,9 +167,8 @@ class PkgConfigCLI(PkgConfigInterface):
                 ret.append('--define-variable=' + '='.join(pair))
         return ret
 
-    @lru_cache(maxsize=None)
-    def cflags(self, name: str, allow_system: bool = False,
-               define_variable: PkgConfigDefineType = None) -> ImmutableListProtocol[str]:
+    def _cflags_query(self, name: str, allow_system: bool,
+                      define_variable: PkgConfigDefineType) -> T.Tuple[T.List[str], T.Optional[EnvironOrDict]]:
         env = None
         if allow_system:
             env = os.environ.copy()
@@ -166,14 +176,10 @@ class PkgConfigCLI(PkgConfigInterface):
         args: T.List[str] = []
         args += self._define_variable_args(define_variable)
         args += ['--cflags', name]
-        ret, out, err = self._call_pkgbin(args, env=env)
-        if ret != 0:
-            raise DependencyException(f'Could not generate cflags for {name}:\n{err}\n')
-        return self._split_args(out)
+        return args, env
 
-    @lru_cache(maxsize=None)
-    def libs(self, name: str, static: bool = False, allow_system: bool = False,
-             define_variable: PkgConfigDefineType = None) -> ImmutableListProtocol[str]:
+    def _libs_query(self, name: str, static: bool, allow_system: bool,
+                    define_variable: PkgConfigDefineType) -> T.Tuple[T.List[str], T.Optional[EnvironOrDict]]:
         env = None
         if allow_system:
             env = os.environ.copy()
@@ -183,7 +189,27 @@ class PkgConfigCLI(PkgConfigInterface):
         if static:
             args.append('--static')
         args += ['--libs', name]
-        ret, out, err = self._call_pkgbin(args, env=env)
+        return args, env
+
+    def prefetch(self, name: str, cflags_allow_system: bool = False, static: bool = False) -> None:
+        self._call_pkgbin_many([
+            self._cflags_query(name, cflags_allow_system, None),
+            self._libs_query(name, static, True, None),
+            self._libs_query(name, static, False, None),
+        ])
+
+    @lru_cache(maxsize=None)
+    def cflags(self, name: str, allow_system: bool = False,
+               define_variable: PkgConfigDefineType = None) -> ImmutableListProtocol[str]:
+        ret, out, err = self._call_pkgbin(*self._cflags_query(name, allow_system, define_variable))
+        if ret != 0:
+            raise DependencyException(f'Could not generate cflags for {name}:\n{err}\n')
+        return self._split_args(out)
+
+    @lru_cache(maxsize=None)
+    def libs(self, name: str, static: bool = False, allow_system: bool = False,
+             define_variable: PkgConfigDefineType = None) -> ImmutableListProtocol[str]:
+        ret, out, err = self._call_pkgbin(*self._libs_query(name, static, allow_system, define_variable))
         if ret != 0:
             raise DependencyException(f'Could not generate libs for {name}:\n{err}\n')
         return self._split_args(out)
@@ -295,13 +321,104 @@ class PkgConfigCLI(PkgConfigInterface):
                 mlog.debug(f'env[{key}]: {value}')
         return env
 
+    def _get_search_path(self, env: T.Mapping[str, str]) -> T.List[str]:
+        paths = [p for p in env.get('PKG_CONFIG_PATH', '').split(os.pathsep) if p]
+        if 'PKG_CONFIG_LIBDIR' in env:
+            return paths + [p for p in env['PKG_CONFIG_LIBDIR'].split(os.pathsep) if p]
+        if self._default_search_path is None:
+            p, out = Popen_safe(self.pkgbin.get_command() + ['--variable=pc_path', 'pkg-config'])[0:2]
+            self._default_search_path = [d for d in out.strip().split(os.pathsep) if d] if p.returncode == 0 else []
+        return paths + self._default_search_path
+
+    @staticmethod
+    def _stamp_search_path(paths: T.List[str]) -> str:
+        '''Return a hash of the name and modification time of every .pc file
+        in @paths, which changes if pkg-config could give a different answer.'''
+        h = hashlib.sha1()
+        for path in paths:
+            h.update(path.encode(errors='surrogateescape') + b'\0')
+            try:
+                entries = sorted(os.scandir(path), key=lambda e: e.name)
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.name.endswith('.pc'):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime_ns
+                except OSError:
+                    mtime = 0
+                h.update(f'{entry.name}\0{mtime}\0'.encode(errors='surrogateescape'))
+        return h.hexdigest()
+
+    @staticmethod
+    def _is_persistent_result(result: T.Tuple[int, str, str]) -> bool:
+        '''Whether @result can be reused until the search path stamp changes.
+
+        That is the case for successes and for failures caused by a missing
+        .pc file, but not for other errors that may not happen again.'''
+        rc, _, err = result
+        return rc == 0 or 'was not found in the pkg-config search path' in err
+
+    def _get_query_cache(self, env: T.Mapping[str, str]) -> T.Dict[T.Tuple[str, ...], T.Tuple[int, str, str]]:
+        '''Return the results of earlier pkg-config invocations with the same
+        environment, dropping them if the .pc files may have changed since.'''
+        envkey = tuple(sorted((k, v) for k, v in env.items() if k.startswith('PKG_CONFIG')))
+        stamp = self._search_path_stamps.get(envkey)
+        if stamp is None:
+            stamp = self.pkgbin_version + ':' + self._stamp_search_path(self._get_search_path(env))
+            self._search_path_stamps[envkey] = stamp
+        key = (tuple(self.pkgbin.get_command()), envkey)
+        cache = self.env.coredata.pkgconfig_cache
+        if key not in cache or cache[key][0] != stamp:
+            cache[key] = (stamp, {})
+        return cache[key][1]
+
     def _call_pkgbin(self, args: T.List[str], env: T.Optional[EnvironOrDict] = None) -> T.Tuple[int, str, str]:
+        return self._call_pkgbin_many([(args, env)])[0]
+
+    def _call_pkgbin_many(self, queries: T.List[T.Tuple[T.List[str], T.Optional[EnvironOrDict]]]) -> T.List[T.Tuple[int, str, str]]:
+        '''Run pkg-config once for each (args, env) query that is not cached yet.
+
+        The invocations are independent from each other, so they run
+        concurrently. They are logged afterwards, in the order of @queries.
+        '''
         assert isinstance(self.pkgbin, ExternalProgram)
-        env = env or os.environ
-        env = self._setup_env(env)
-        cmd = self.pkgbin.get_command() + args
-        p, out, err = Popen_safe_logged(cmd, env=env)
-        return p.returncode, out.strip(), err.strip()
+        results: T.List[T.Optional[T.Tuple[int, str, str]]] = []
+        pending: T.List[T.Tuple[int, T.List[str], T.List[str], T.Dict[str, str]]] = []
+        for args, env in queries:
+            full_env = self._setup_env(env or os.environ)
+            cmd = self.pkgbin.get_command() + args
+            cached = self._get_query_cache(full_env).get(tuple(args))
+            if cached is not None:
+                mlog.debug('-----------')
+                mlog.debug(f'Using cached pkg-config result: `{join_args(cmd)}` -> {cached[0]}')
+            else:
+                pending.append((len(results), args, cmd, full_env))
+            results.append(cached)
+
+        def run(query: T.Tuple[int, T.List[str], T.List[str], T.Dict[str, str]]) -> T.Tuple[int, str, str]:
+            p, out, err = Popen_safe(query[2], env=query[3])
+            return p.returncode, out, err
+
+        if len(pending) < 2:
+            outputs = [run(q) for q in pending]
+        else:
+            with ThreadPoolExecutor(min(len(pending), determine_worker_count())) as executor:
+                outputs = list(executor.map(run, pending))
+
+        for (i, args, cmd, full_env), (rc, out, err) in zip(pending, outputs):
+            mlog.debug('-----------')
+            mlog.debug(f'Called: `{join_args(cmd)}` -> {rc}')
+            if out.strip():
+                mlog.debug(f'stdout:\n{out.strip()}\n-----------')
+            if err.strip():
+                mlog.debug(f'stderr:\n{err.strip()}\n-----------')
+            result = (rc, out.strip(), err.strip())
+            if self._is_persistent_result(result):
+                self._get_query_cache(full_env)[tuple(args)] = result
+            results[i] = result
+        return results
 
 
 class PkgConfigDependency(ExternalDependency):
@@ -328,6 +445,7 @@ class PkgConfigDependency(ExternalDependency):
 
         self.version = version
         self.is_found = True
+        self.pkgconfig.prefetch(name, self._cflags_allow_system(), self.static)
 
         try:
             # Fetch cargs to be used while using this dependency
@@ -380,13 +498,13 @@ class PkgConfigDependency(ExternalDependency):
             converted.append(arg)
         return converted
 
+    def _cflags_allow_system(self) -> bool:
+        # gfortran doesn't appear to look in system paths for INCLUDE files,
+        # so don't allow pkg-config to suppress -I flags for system paths
+        return self.language == 'fortran'
+
     def _set_cargs(self) -> None:
-        allow_system = False
-        if self.language == 'fortran':
-            # gfortran doesn't appear to look in system paths for INCLUDE files,
-            # so don't allow pkg-config to suppress -I flags for system paths
-            allow_system = True
-        cflags = self.pkgconfig.cflags(self.name, allow_system)
+        cflags = self.pkgconfig.cflags(self.name, self._cflags_allow_system())
         self.compile_args = self._convert_mingw_paths(cflags)
 
     def _search_libs(self, libs_in: ImmutableListProtocol[str], raw_libs_in: ImmutableListProtocol[str]) -> T.Tuple[T.List[str], T.List[str]]:
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import collections
 import enum
+from concurrent.futures import ThreadPoolExecutor
 import functools
 import os
 import itertools
@@ -15,8 +16,9 @@ from .. import dependencies
 from .. import options
 from .. import mesonlib
 from .. import mlog
+from .. import mparser
 from ..compilers import SUFFIX_TO_LANG, RunResult
-from ..compilers.compilers import CompileCheckMode
+from ..compilers.compilers import CompileCheckMode, prefetching_checks
 from ..interpreterbase import (ObjectHolder, noPosargs, noKwargs,
                                FeatureNew, FeatureNewKwargs, disablerIfNotFound,
                                InterpreterException, InterpreterObject)
@@ -99,6 +101,9 @@ if T.TYPE_CHECKING:
         depends: T.List[build.BuildTargetTypes]
 
 
+_T = T.TypeVar('_T')
+
+
 class _TestMode(enum.Enum):
 
     """Whether we're doing a compiler or linker check."""
@@ -186,6 +191,66 @@ _COMPILES_KWS: T.List[KwargInfo] = [
 _HEADER_KWS: T.List[KwargInfo] = [REQUIRED_KW.evolve(since='0.50.0', default=False), *_COMMON_KWS]
 _HAS_REQUIRED_KW = REQUIRED_KW.evolve(since='1.3.0', default=False)
 
+
+def _is_literal_string(node: mparser.BaseNode) -> bool:
+    return isinstance(node, mparser.StringNode) and not node.is_fstring
+
+def _compiler_language(node: mparser.BaseNode) -> T.Optional[str]:
+    """Return the language if @node is a `meson.get_compiler('<lang>')` call."""
+    if (isinstance(node, mparser.MethodNode) and node.name.value == 'get_compiler'
+            and isinstance(node.source_object, mparser.IdNode) and node.source_object.value == 'meson'
+            and not node.args.kwargs and len(node.args.arguments) == 1
+            and _is_literal_string(node.args.arguments[0])):
+        return T.cast('mparser.StringNode', node.args.arguments[0]).value
+    return None
+
+def find_literal_checks(codeblock: mparser.CodeBlockNode) -> T.Dict[str, T.Tuple[T.List[str], T.List[str]]]:
+    """Find the header and function checks of a build file that can be run
+    before it is evaluated.
+
+    These are the has_header(s)() and has_function(s)() calls with only
+    literal arguments, made on the result of meson.get_compiler() or on a
+    variable assigned from it. This is a guess, a check that is found here
+    but never evaluated only costs time. Returns the headers and functions
+    to check for each language.
+    """
+    nodes: T.List[mparser.BaseNode] = []
+    stack: T.List[object] = [codeblock]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, mparser.BaseNode):
+            nodes.append(obj)
+            stack.extend(vars(obj).values())
+        elif isinstance(obj, list):
+            stack.extend(obj)
+        elif isinstance(obj, dict):
+            stack.extend(obj.items())
+        elif isinstance(obj, tuple):
+            stack.extend(obj)
+    nodes.sort(key=lambda n: (n.lineno, n.colno))
+
+    variables: T.Dict[str, T.Optional[str]] = {}
+    for node in nodes:
+        if isinstance(node, mparser.AssignmentNode):
+            lang = None if isinstance(node, mparser.PlusAssignmentNode) else _compiler_language(node.value)
+            name = node.var_name.value
+            variables[name] = lang if variables.get(name, lang) == lang else None
+
+    checks: T.Dict[str, T.Tuple[T.List[str], T.List[str]]] = {}
+    for node in nodes:
+        if not isinstance(node, mparser.MethodNode) or node.name.value not in {'has_header', 'has_headers', 'has_function', 'has_functions'}:
+            continue
+        if node.args.kwargs or not node.args.arguments or not all(_is_literal_string(a) for a in node.args.arguments):
+            continue
+        source = node.source_object
+        lang = variables.get(source.value) if isinstance(source, mparser.IdNode) else _compiler_language(source)
+        if lang is None:
+            continue
+        headers, functions = checks.setdefault(lang, ([], []))
+        names = [T.cast('mparser.StringNode', a).value for a in node.args.arguments]
+        (headers if node.name.value.startswith('has_header') else functions).extend(names)
+    return checks
+
 class CompilerHolder(ObjectHolder['Compiler']):
     preprocess_uid: T.Dict[str, itertools.count] = collections.defaultdict(itertools.count)
 
@@ -252,6 +317,54 @@ class CompilerHolder(ObjectHolder['Compiler']):
         deps = dependencies.get_leaf_external_dependencies(deps)
         return deps, self._dep_msg(deps, compile_only, endl)
 
+    def _determine_args_for_modes(self, kwargs: BaseCompileKW) -> T.Callable[[CompileCheckMode], T.List[str]]:
+        # Computed upfront so that worker threads do not have to touch the interpreter
+        args = {mode: self._determine_args(kwargs, mode) for mode in CompileCheckMode}
+        return lambda mode: args[mode].copy()
+
+    def _run_checks(self, check: T.Callable[[_T], T.Tuple[bool, bool]], items: T.List[_T]) -> T.List[T.Tuple[bool, bool]]:
+        """Run independent compiler checks concurrently.
+
+        The checks must not use the interpreter. What they write to the log
+        file is buffered and written once all of them are done, in the order
+        of the items, and so are the returned results.
+        """
+        if len(items) < 2:
+            return [check(i) for i in items]
+
+        def run(item: _T) -> T.Tuple[T.Tuple[bool, bool], str]:
+            with mlog.buffer_log_file() as buf:
+                return check(item), buf.getvalue()
+
+        with ThreadPoolExecutor(min(len(items), mesonlib.determine_worker_count())) as executor:
+            outputs = list(executor.map(run, items))
+        for _, text in outputs:
+            mlog.write_log_file(text)
+        return [result for result, _ in outputs]
+
+    def prefetch_checks(self, headers: T.List[str], functions: T.List[str]) -> None:
+        """Run has_header() and has_function() checks without keyword arguments
+        concurrently, ahead of their evaluation.
+
+        The results are only stored in the check cache, where the evaluation
+        finds them. See find_literal_checks().
+        """
+        kwargs: HeaderKW = {'required': False, 'args': [], 'dependencies': [], 'include_directories': [],
+                            'prefix': '', 'no_builtin_args': False}
+        header_args = self._determine_args_for_modes(kwargs)
+        function_args = self._determine_args(kwargs)
+
+        def check(item: T.Tuple[bool, str]) -> T.Tuple[bool, bool]:
+            is_header, name = item
+            with prefetching_checks():
+                if is_header:
+                    return self.compiler.has_header(name, '', extra_args=header_args, dependencies=[])
+                return self.compiler.has_function(name, '', extra_args=function_args.copy(), dependencies=[])
+
+        items = [(True, h) for h in dict.fromkeys(headers)] + [(False, f) for f in dict.fromkeys(functions)]
+        mlog.debug(f'Prefetching {len(items)} {self.compiler.get_display_language()} compiler checks')
+        self._run_checks(check, items)
+
     @typed_pos_args('compiler.alignment', str)
     @typed_kwargs(
         'compiler.alignment',
@@ -384,16 +497,34 @@ class CompilerHolder(ObjectHolder['Compiler']):
     @typed_kwargs('compiler.has_function', _HAS_REQUIRED_KW, *_COMMON_KWS)
     @InterpreterObject.method('has_function')
     def has_function_method(self, args: T.Tuple[str], kwargs: 'HasKW') -> bool:
-        funcname = args[0]
+        return self._has_function_impl(args[0], kwargs)
+
+    @FeatureNew('compiler.has_functions', '1.11.0')
+    @typed_pos_args('compiler.has_functions', varargs=str, min_varargs=1)
+    @typed_kwargs('compiler.has_functions', _HAS_REQUIRED_KW, *_COMMON_KWS)
+    @InterpreterObject.method('has_functions')
+    def has_functions_method(self, args: T.Tuple[T.List[str]], kwargs: 'HasKW') -> T.Dict[str, bool]:
+        funcnames = list(dict.fromkeys(args[0]))
+        results: T.List[T.Optional[T.Tuple[bool, bool]]] = [None] * len(funcnames)
+        if not extract_required_kwarg(kwargs, self.subproject, default=False)[0]:
+            extra_args = self._determine_args(kwargs)
+            deps, _ = self._determine_dependencies(kwargs['dependencies'], compile_only=False)
+            results = list(self._run_checks(
+                lambda f: self.compiler.has_function(f, kwargs['prefix'], extra_args=extra_args.copy(), dependencies=deps),
+                funcnames))
+        return {f: self._has_function_impl(f, kwargs, r) for f, r in zip(funcnames, results)}
+
+    def _has_function_impl(self, funcname: str, kwargs: 'HasKW', result: T.Optional[T.Tuple[bool, bool]] = None) -> bool:
         disabled, required, feature = extract_required_kwarg(kwargs, self.subproject, default=False)
         if disabled:
             mlog.log('Has function', mlog.bold(funcname, True), 'skipped: feature', mlog.bold(feature), 'disabled')
             return False
-        extra_args = self._determine_args(kwargs)
         deps, msg = self._determine_dependencies(kwargs['dependencies'], compile_only=False)
-        had, cached = self.compiler.has_function(funcname, kwargs['prefix'],
-                                                 extra_args=extra_args,
-                                                 dependencies=deps)
+        if result is None:
+            result = self.compiler.has_function(funcname, kwargs['prefix'],
+                                                extra_args=self._determine_args(kwargs),
+                                                dependencies=deps)
+        had, cached = result
         cached_msg = mlog.blue('(cached)') if cached else ''
         if required and not had:
             raise InterpreterException(f'{self.compiler.get_display_language()} function {funcname!r} not usable')
@@ -605,15 +736,17 @@ class CompilerHolder(ObjectHolder['Compiler']):
         mlog.log('Check usable header', mlog.bold(hname, True), msg, h, cached_msg)
         return haz
 
-    def _has_header_impl(self, hname: str, kwargs: 'HeaderKW') -> bool:
+    def _has_header_impl(self, hname: str, kwargs: 'HeaderKW', result: T.Optional[T.Tuple[bool, bool]] = None) -> bool:
         disabled, required, feature = extract_required_kwarg(kwargs, self.subproject, default=False)
         if disabled:
             mlog.log('Has header', mlog.bold(hname, True), 'skipped: feature', mlog.bold(feature), 'disabled')
             return False
-        extra_args = functools.partial(self._determine_args, kwargs)
         deps, msg = self._determine_dependencies(kwargs['dependencies'])
-        haz, cached = self.compiler.has_header(hname, kwargs['prefix'],
-                                               extra_args=extra_args, dependencies=deps)
+        if result is None:
+            extra_args = functools.partial(self._determine_args, kwargs)
+            result = self.compiler.has_header(hname, kwargs['prefix'],
+                                              extra_args=extra_args, dependencies=deps)
+        haz, cached = result
         cached_msg = mlog.blue('(cached)') if cached else ''
         if required and not haz:
             raise InterpreterException(f'{self.compiler.get_display_language()} header {hname!r} not found')
@@ -630,6 +763,21 @@ class CompilerHolder(ObjectHolder['Compiler']):
     def has_header_method(self, args: T.Tuple[str], kwargs: 'HeaderKW') -> bool:
         return self._has_header_impl(args[0], kwargs)
 
+    @FeatureNew('compiler.has_headers', '1.11.0')
+    @typed_pos_args('compiler.has_headers', varargs=str, min_varargs=1)
+    @typed_kwargs('compiler.has_headers', *_HEADER_KWS)
+    @InterpreterObject.method('has_headers')
+    def has_headers_method(self, args: T.Tuple[T.List[str]], kwargs: 'HeaderKW') -> T.Dict[str, bool]:
+        hnames = list(dict.fromkeys(args[0]))
+        results: T.List[T.Optional[T.Tuple[bool, bool]]] = [None] * len(hnames)
+        if not extract_required_kwarg(kwargs, self.subproject, default=False)[0]:
+            extra_args = self._determine_args_for_modes(kwargs)
+            deps, _ = self._determine_dependencies(kwargs['dependencies'])
+            results = list(self._run_checks(
+                lambda h: self.compiler.has_header(h, kwargs['prefix'], extra_args=extra_args, dependencies=deps),
+                hnames))
+        return {h: self._has_header_impl(h, kwargs, r) for h, r in zip(hnames, results)}
+
     @typed_pos_args('compiler.has_header_symbol', str, str)
     @typed_kwargs('compiler.has_header_symbol', *_HEADER_KWS)
     @InterpreterObject.method('has_header_symbol')
@@ -721,9 +869,13 @@ class CompilerHolder(ObjectHolder['Compiler']):
                                            self.compiler.language, self.held_object.for_machine)
         return lib
 
+    def _argument_test(self, mode: _TestMode) -> T.Callable[[T.List[str]], T.Tuple[bool, bool]]:
+        return self.compiler.has_multi_link_arguments if mode is _TestMode.LINKER else self.compiler.has_multi_arguments
+
     def _has_argument_impl(self, arguments: T.Union[str, T.List[str]],
                            mode: _TestMode = _TestMode.COMPILER,
-                           kwargs: T.Optional['ExtractRequired'] = None) -> bool:
+                           kwargs: T.Optional['ExtractRequired'] = None,
+                           result: T.Optional[T.Tuple[bool, bool]] = None) -> bool:
         """Shared implementation for methods checking compiler and linker arguments."""
         # This simplifies the callers
         if isinstance(arguments, str):
@@ -740,17 +892,18 @@ class CompilerHolder(ObjectHolder['Compiler']):
             logargs += ['skipped: feature', mlog.bold(feature), 'disabled']
             mlog.log(*logargs)
             return False
-        test = self.compiler.has_multi_link_arguments if mode is _TestMode.LINKER else self.compiler.has_multi_arguments
-        result, cached = test(arguments)
-        if required and not result:
+        if result is None:
+            result = self._argument_test(mode)(arguments)
+        supported, cached = result
+        if required and not supported:
             logargs += ['not usable']
             raise InterpreterException(*logargs)
         logargs += [
-            mlog.green('YES') if result else mlog.red('NO'),
+            mlog.green('YES') if supported else mlog.red('NO'),
             mlog.blue('(cached)') if cached else '',
         ]
         mlog.log(*logargs)
-        return result
+        return supported
 
     @typed_pos_args('compiler.has_argument', str)
     @typed_kwargs('compiler.has_argument', _HAS_REQUIRED_KW)
@@ -777,8 +930,10 @@ class CompilerHolder(ObjectHolder['Compiler']):
         supported_args: T.List[str] = []
         checked = kwargs['checked']
 
-        for arg in args[0]:
-            if not self._has_argument_impl([arg]):
+        test = self._argument_test(_TestMode.COMPILER)
+        results = self._run_checks(lambda a: test([a]), args[0])
+        for arg, result in zip(args[0], results):
+            if not self._has_argument_impl([arg], result=result):
                 msg = f'Compiler for {self.compiler.get_display_language()} does not support "{arg}"'
                 if checked == 'warn':
                     mlog.warning(msg)
@@ -819,8 +974,10 @@ class CompilerHolder(ObjectHolder['Compiler']):
     @InterpreterObject.method('get_supported_link_arguments')
     def get_supported_link_arguments_method(self, args: T.Tuple[T.List[str]], kwargs: 'TYPE_kwargs') -> T.List[str]:
         supported_args: T.List[str] = []
-        for arg in args[0]:
-            if self._has_argument_impl([arg], mode=_TestMode.LINKER):
+        test = self._argument_test(_TestMode.LINKER)
+        results = self._run_checks(lambda a: test([a]), args[0])
+        for arg, result in zip(args[0], results):
+            if self._has_argument_impl([arg], mode=_TestMode.LINKER, result=result):
                 supported_args.append(arg)
         return supported_args
 
@@ -836,7 +993,8 @@ class CompilerHolder(ObjectHolder['Compiler']):
         mlog.log('First supported link argument:', mlog.red('None'))
         return []
 
-    def _has_function_attribute_impl(self, attr: str, kwargs: T.Optional['ExtractRequired'] = None) -> bool:
+    def _has_function_attribute_impl(self, attr: str, kwargs: T.Optional['ExtractRequired'] = None,
+                                     result: T.Optional[T.Tuple[bool, bool]] = None) -> bool:
         """Common helper for function attribute testing."""
         logargs: TV_LoggableList = [
             f'Compiler for {self.compiler.get_display_language()} supports function attribute {attr}:',
@@ -847,7 +1005,7 @@ class CompilerHolder(ObjectHolder['Compiler']):
             logargs += ['skipped: feature', mlog.bold(feature), 'disabled']
             mlog.log(*logargs)
             return False
-        had, cached = self.compiler.has_func_attribute(attr)
+        had, cached = result if result is not None else self.compiler.has_func_attribute(attr)
         if required and not had:
             logargs += ['not usable']
             raise InterpreterException(*logargs)
@@ -870,7 +1028,8 @@ class CompilerHolder(ObjectHolder['Compiler']):
     @typed_pos_args('compiler.get_supported_function_attributes', varargs=str)
     @InterpreterObject.method('get_supported_function_attributes')
     def get_supported_function_attributes_method(self, args: T.Tuple[T.List[str]], kwargs: 'TYPE_kwargs') -> T.List[str]:
-        return [a for a in args[0] if self._has_function_attribute_impl(a)]
+        results = self._run_checks(self.compiler.has_func_attribute, args[0])
+        return [a for a, r in zip(args[0], results) if self._has_function_attribute_impl(a, result=r)]
 
     @FeatureNew('compiler.get_argument_syntax', '0.49.0')
     @noPosargs
@@ -295,6 +295,9 @@ class Interpreter(InterpreterBase, HoldableObject):
     def __getnewargs_ex__(self) -> T.Tuple[T.Tuple[object], T.Dict[str, object]]:
         raise MesonBugException('This class is unpicklable')
 
+    def ast_cache_dir(self) -> T.Optional[str]:
+        return os.path.join(self.environment.get_scratch_dir(), 'ast-cache')
+
     def load_root_cargo_lock_file(self) -> None:
         cargo_lock = os.path.join(self.source_root, self.subdir, 'Cargo.lock')
         if not os.path.isfile(cargo_lock):
@@ -880,9 +883,9 @@ class Interpreter(InterpreterBase, HoldableObject):
         # command line.
         if forced_options:
             for k, v in forced_options.items():
-                # FIXME: this should have no business poking at augments[],
-                # but set_option() does not do what we want
-                self.coredata.optstore.augments[k.evolve(subproject=subp_name)] = v
+                # FIXME: this should have no business setting augments
+                # directly, but set_option() does not do what we want
+                self.coredata.optstore.set_augment(k.evolve(subproject=subp_name), v)
             default_options = {**forced_options, **default_options}
 
         if subp_name == '':
@@ -1300,6 +1303,18 @@ class Interpreter(InterpreterBase, HoldableObject):
         if not self.is_subproject():
             self.check_stdlibs()
 
+        self.prefetch_compiler_checks()
+
+    def prefetch_compiler_checks(self) -> None:
+        # Compiler checks with literal arguments can run in parallel before
+        # the evaluation reaches them, it then uses the cached results
+        if mesonlib.determine_worker_count() < 2:
+            return
+        for lang, (headers, functions) in compilerOBJ.find_literal_checks(self.ast).items():
+            comp = self.coredata.compilers.host.get(lang)
+            if comp is not None and len(headers) + len(functions) > 1:
+                compilerOBJ.CompilerHolder(comp, self).prefetch_checks(headers, functions)
+
     @typed_kwargs('add_languages', KwargInfo('native', (bool, NoneType), since='0.54.0'), REQUIRED_KW)
     @typed_pos_args('add_languages', varargs=str)
     def func_add_languages(self, node: mparser.FunctionNode, args: T.Tuple[T.List[str]], kwargs: 'kwtypes.FuncAddLanguages') -> bool:
@@ -178,7 +178,9 @@ class UndefinedVariable(MesonInterpreterObject):
     '''This class is only used for the rewriter/static introspection tool and
     represents the `value` a meson-variable has if it was never written to.'''
 
-HoldableTypes = (HoldableObject, int, bool, str, list, dict)
+# The builtin types come first, they are the most common and checking them is
+# much cheaper than checking the HoldableObject ABC
+HoldableTypes = (str, int, bool, list, dict, HoldableObject)
 TYPE_HoldableTypes = T.Union[TYPE_var, HoldableObject]
 InterpreterObjectTypeVar = T.TypeVar('InterpreterObjectTypeVar', bound=TYPE_HoldableTypes)
 
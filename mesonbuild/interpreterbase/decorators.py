@@ -168,6 +168,13 @@ def typed_pos_args(name: str, *types: T.Union[T.Type, T.Tuple[T.Type, ...]],
     correct, all of the arguments are string names of files. If the first
     argument is something else the it should be separated.
     """
+    # The argument counts and types do not depend on the call, as the wrapper
+    # runs on every call of the function they are computed once here
+    num_types = len(types)
+    min_args = num_types + min_varargs
+    max_args = num_types + max_varargs
+    all_types = types + tuple(optargs) if optargs else types
+
     def inner(f: TV_func) -> TV_func:
 
         @wraps(f)
@@ -182,12 +189,9 @@ def typed_pos_args(name: str, *types: T.Union[T.Type, T.Tuple[T.Type, ...]],
                 'varargs and optargs not supported together as this would be ambiguous'
 
             num_args = len(args)
-            num_types = len(types)
             a_types = types
 
             if varargs:
-                min_args = num_types + min_varargs
-                max_args = num_types + max_varargs
                 if max_varargs == 0 and num_args < min_args:
                     raise InvalidArguments(f'{name} takes at least {min_args} arguments, but got {num_args}.')
                 elif max_varargs != 0 and (num_args < min_args or num_args > max_args):
@@ -199,8 +203,7 @@ def typed_pos_args(name: str, *types: T.Union[T.Type, T.Tuple[T.Type, ...]],
                     raise InvalidArguments(f'{name} takes at most {num_types + len(optargs)} arguments, but got {num_args}.')
                 # Add the number of positional arguments required
                 if num_args > num_types:
-                    diff = num_args - num_types
-                    a_types = tuple(list(types) + list(optargs[:diff]))
+                    a_types = all_types[:num_args]
             elif num_args != num_types:
                 raise InvalidArguments(f'{name} takes exactly {num_types} arguments, but got {num_args}.')
 
@@ -281,6 +284,20 @@ class ContainerTypeInfo:
             return False
         return True
 
+    def compile_check(self) -> T.Callable[[T.Any], bool]:
+        """Specialized version of check() for this container type.
+
+        :return: A callable returning the same as check()
+        """
+        if self.pairs or not self.allow_empty:
+            return self.check
+        container = self.container
+        contains = self.contains
+        if container is list:
+            return lambda value: isinstance(value, list) and all(isinstance(i, contains) for i in value)
+        return lambda value: isinstance(value, container) and \
+            all(isinstance(i, contains) for i in (value.values() if isinstance(value, dict) else value))
+
     def check_any(self, value: T.Any) -> bool:
         """Check a value should emit new/deprecated feature.
 
@@ -309,6 +326,20 @@ class ContainerTypeInfo:
             s += ' that cannot be empty'
         return s
 
+def compile_type_check(types_tuple: T.Tuple[T.Union[T.Type, ContainerTypeInfo], ...]) -> T.Callable[[T.Any], bool]:
+    """Build a callable checking that a value matches one of types_tuple.
+
+    :param types_tuple: plain types and :class:ContainerTypeInfo, as in :class:KwargInfo
+    :return: A callable returning True if the value is valid
+    """
+    plain = tuple(t for t in types_tuple if not isinstance(t, ContainerTypeInfo))
+    containers = [t.compile_check() for t in types_tuple if isinstance(t, ContainerTypeInfo)]
+    if not containers:
+        return lambda value: isinstance(value, plain)
+    if not plain and len(containers) == 1:
+        return containers[0]
+    return lambda value: isinstance(value, plain) or any(c(value) for c in containers)
+
 _T = T.TypeVar('_T')
 
 class _NULL_T:
@@ -481,15 +512,19 @@ def typed_kwargs(name: str, *types: KwargInfo, allow_unknown: bool = False) -> T
                 return 'dict[]'
             return type(t).__name__
 
-        def check_value_type(types_tuple: T.Tuple[T.Union[T.Type, ContainerTypeInfo], ...],
-                             value: T.Any) -> bool:
-            for t in types_tuple:
-                if isinstance(t, ContainerTypeInfo):
-                    if t.check(value):
-                        return True
-                elif isinstance(value, t):
-                    return True
-            return False
+        # Everything that does not depend on the arguments is computed once
+        # here, as the wrapper runs on every call of the function
+        all_names = frozenset(t.name for t in types)
+        compiled: T.List[T.Tuple[KwargInfo, T.Tuple[T.Union[T.Type, ContainerTypeInfo], ...], T.Callable[[T.Any], bool],
+                                 T.Optional[FeatureNew], T.Optional[FeatureDeprecated], bool]] = []
+        for info in types:
+            types_tuple = info.types if isinstance(info.types, tuple) else (info.types,)
+            check_value_type = compile_type_check(types_tuple)
+            feature_name = info.name + ' arg in ' + name
+            since = FeatureNew(feature_name, info.since, info.since_message) if info.since else None
+            deprecated = FeatureDeprecated(feature_name, info.deprecated, info.deprecated_message) if info.deprecated else None
+            default_valid = info.required or check_value_type(info.default)
+            compiled.append((info, types_tuple, check_value_type, since, deprecated, default_valid))
 
         @wraps(f)
         def wrapper(*wrapped_args: T.Any, **wrapped_kwargs: T.Any) -> T.Any:
@@ -523,23 +558,18 @@ def typed_kwargs(name: str, *types: KwargInfo, allow_unknown: bool = False) -> T
             # Cast here, as the convertor function may place something other than a TYPE_var in the kwargs
             kwargs = T.cast('T.Dict[str, object]', _kwargs)
 
-            if not allow_unknown:
-                all_names = {t.name for t in types}
+            if not allow_unknown and not all_names.issuperset(kwargs):
                 unknowns = set(kwargs).difference(all_names)
-                if unknowns:
-                    ustr = ', '.join([f'"{u}"' for u in sorted(unknowns)])
-                    raise InvalidArguments(f'{name} got unknown keyword arguments {ustr}')
+                ustr = ', '.join([f'"{u}"' for u in sorted(unknowns)])
+                raise InvalidArguments(f'{name} got unknown keyword arguments {ustr}')
 
-            for info in types:
-                types_tuple = info.types if isinstance(info.types, tuple) else (info.types,)
+            for info, types_tuple, check_value_type, since, deprecated, default_valid in compiled:
                 value = kwargs.get(info.name)
                 if value is not None:
-                    if info.since:
-                        feature_name = info.name + ' arg in ' + name
-                        FeatureNew.single_use(feature_name, info.since, subproject, info.since_message, location=node)
-                    if info.deprecated:
-                        feature_name = info.name + ' arg in ' + name
-                        FeatureDeprecated.single_use(feature_name, info.deprecated, subproject, info.deprecated_message, location=node)
+                    if since:
+                        since.use(subproject, node)
+                    if deprecated:
+                        deprecated.use(subproject, node)
                     if info.as_default:
                         found = mesonlib.first(info.as_default, lambda x: value == x[0])
                         if found is not None:
@@ -551,7 +581,7 @@ def typed_kwargs(name: str, *types: KwargInfo, allow_unknown: bool = False) -> T
                             value = copy.copy(info.default)
                     if info.listify:
                         kwargs[info.name] = value = mesonlib.listify(value)
-                    if not check_value_type(types_tuple, value):
+                    if not check_value_type(value):
                         extra_desc: T.List[str] = []
                         if info.extra_types:
                             if isinstance(value, list):
@@ -588,7 +618,7 @@ def typed_kwargs(name: str, *types: KwargInfo, allow_unknown: bool = False) -> T
                 else:
                     # set the value to the default, this ensuring all kwargs are present
                     # This both simplifies the typing checking and the usage
-                    assert check_value_type(types_tuple, info.default), f'In function {name} default value of {info.name} is not a valid type, got {type(info.default)} expected {types_description(types_tuple)}'
+                    assert default_valid, f'In function {name} default value of {info.name} is not a valid type, got {type(info.default)} expected {types_description(types_tuple)}'
                     # Create a shallow copy of the container. This allows mutable
                     # types to be used safely as default values
                     kwargs[info.name] = copy.copy(info.default)
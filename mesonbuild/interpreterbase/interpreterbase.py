@@ -63,6 +63,10 @@ if T.TYPE_CHECKING:
     ]
 
 
+# Nodes that always evaluate to their value, unless they are f-strings
+LITERAL_NODES = {mparser.StringNode, mparser.NumberNode, mparser.BooleanNode}
+
+
 class InvalidCodeOnVoid(InvalidCode):
 
     def __init__(self, op_type: str) -> None:
@@ -70,6 +74,9 @@ class InvalidCodeOnVoid(InvalidCode):
 
 
 class InterpreterBase:
+    # Whitespace and comments are only needed by tools reproducing the source
+    keep_whitespace = False
+
     def __init__(self, source_root: str, subdir: str, subproject: SubProject, subproject_dir: str, env: environment.Environment):
         self.source_root = source_root
         self.funcs: FunctionType = {}
@@ -96,6 +103,35 @@ class InterpreterBase:
         # If it was part of a if-clause, it is used to temporally override the
         # current meson version target within that if-block.
         self.tmp_meson_version: T.Optional[str] = None
+        # Method evaluating each type of node, bound here so that evaluating a
+        # statement is a dictionary lookup and subclasses can still override
+        # the methods
+        self.statement_evaluators: T.Dict[T.Type[mparser.BaseNode], T.Callable[[T.Any], T.Optional[InterpreterObject]]] = {
+            mparser.FunctionNode: self.function_call,
+            mparser.PlusAssignmentNode: self.evaluate_plusassign,
+            mparser.AssignmentNode: self.assignment,
+            mparser.MethodNode: self.method_call,
+            mparser.StringNode: self.evaluate_string,
+            mparser.BooleanNode: self.evaluate_literal,
+            mparser.IfClauseNode: self.evaluate_if,
+            mparser.IdNode: self.evaluate_id,
+            mparser.ComparisonNode: self.evaluate_comparison,
+            mparser.ArrayNode: self.evaluate_arraystatement,
+            mparser.DictNode: self.evaluate_dictstatement,
+            mparser.NumberNode: self.evaluate_literal,
+            mparser.AndNode: self.evaluate_andstatement,
+            mparser.OrNode: self.evaluate_orstatement,
+            mparser.NotNode: self.evaluate_notstatement,
+            mparser.UMinusNode: self.evaluate_uminusstatement,
+            mparser.ArithmeticNode: self.evaluate_arithmeticstatement,
+            mparser.ForeachClauseNode: self.evaluate_foreach,
+            mparser.IndexNode: self.evaluate_indexing,
+            mparser.TernaryNode: self.evaluate_ternary,
+            mparser.ContinueNode: self.evaluate_continue,
+            mparser.BreakNode: self.evaluate_break,
+            mparser.ParenthesizedNode: self.evaluate_parenthesized,
+            mparser.TestCaseClauseNode: self.evaluate_testcase,
+        }
 
     def handle_meson_version_from_ast(self, strict: bool = True) -> None:
         # do nothing in an AST interpreter
@@ -109,6 +145,15 @@ class InterpreterBase:
             node = mparser.BaseNode(1, 1, errname)
             raise InvalidCode.from_node(f'Build file failed to parse as unicode: {e}', node=node)
 
+    def ast_cache_dir(self) -> T.Optional[str]:
+        return None
+
+    def parse_buildfile(self, code: str, fname: str) -> mparser.CodeBlockNode:
+        cachedir = self.ast_cache_dir()
+        if cachedir is not None:
+            return mparser.parse_cached(code, fname, cachedir, self.keep_whitespace)
+        return mparser.Parser(code, fname, keep_whitespace=self.keep_whitespace).parse()
+
     def load_root_meson_file(self) -> None:
         build_filename = os.path.join(self.subdir, environment.build_filename)
         self.build_def_files.add(build_filename)
@@ -120,7 +165,7 @@ class InterpreterBase:
             raise InvalidCode('Builder file is empty.')
         assert isinstance(code, str)
         try:
-            self.ast = mparser.Parser(code, mesonfile).parse()
+            self.ast = self.parse_buildfile(code, mesonfile)
             self.handle_meson_version_from_ast()
         except mparser.ParseException as me:
             me.file = mesonfile
@@ -156,7 +201,7 @@ class InterpreterBase:
                         code = f.read()
 
                     try:
-                        ast = mparser.Parser(code, 'empty').parse()
+                        ast = mparser.Parser(code, 'empty', keep_whitespace=False).parse()
                     except mparser.ParseException:
                         continue
 
@@ -206,66 +251,51 @@ class InterpreterBase:
 
     def evaluate_statement(self, cur: mparser.BaseNode) -> T.Optional[InterpreterObject]:
         self.current_node = cur
-        if isinstance(cur, mparser.FunctionNode):
-            return self.function_call(cur)
-        elif isinstance(cur, mparser.PlusAssignmentNode):
-            self.evaluate_plusassign(cur)
-        elif isinstance(cur, mparser.AssignmentNode):
-            self.assignment(cur)
-        elif isinstance(cur, mparser.MethodNode):
-            return self.method_call(cur)
-        elif isinstance(cur, mparser.StringNode):
-            if cur.is_fstring:
-                if cur.is_multiline:
-                    return self.evaluate_multiline_fstring(cur)
-                else:
-                    return self.evaluate_fstring(cur)
+        try:
+            evaluator = self.statement_evaluators[type(cur)]
+        except KeyError:
+            evaluator = self._find_statement_evaluator(type(cur))
+        return evaluator(cur)
+
+    def _find_statement_evaluator(self, node_type: T.Type[mparser.BaseNode]) -> T.Callable[[T.Any], T.Optional[InterpreterObject]]:
+        # Nodes types that are not in the table are subclasses of those that are
+        for base in node_type.__mro__[1:]:
+            if base in self.statement_evaluators:
+                evaluator = self.statement_evaluators[node_type] = self.statement_evaluators[base]
+                return evaluator
+        raise InvalidCode("Unknown statement.")
+
+    def evaluate_string(self, cur: mparser.StringNode) -> InterpreterObject:
+        if cur.is_fstring:
+            if cur.is_multiline:
+                return self.evaluate_multiline_fstring(cur)
             else:
-                return self._holderify(cur.value)
-        elif isinstance(cur, mparser.BooleanNode):
-            return self._holderify(cur.value)
-        elif isinstance(cur, mparser.IfClauseNode):
-            return self.evaluate_if(cur)
-        elif isinstance(cur, mparser.IdNode):
-            return self.get_variable(cur.value)
-        elif isinstance(cur, mparser.ComparisonNode):
-            return self.evaluate_comparison(cur)
-        elif isinstance(cur, mparser.ArrayNode):
-            return self.evaluate_arraystatement(cur)
-        elif isinstance(cur, mparser.DictNode):
-            return self.evaluate_dictstatement(cur)
-        elif isinstance(cur, mparser.NumberNode):
-            return self._holderify(cur.value)
-        elif isinstance(cur, mparser.AndNode):
-            return self.evaluate_andstatement(cur)
-        elif isinstance(cur, mparser.OrNode):
-            return self.evaluate_orstatement(cur)
-        elif isinstance(cur, mparser.NotNode):
-            return self.evaluate_notstatement(cur)
-        elif isinstance(cur, mparser.UMinusNode):
-            return self.evaluate_uminusstatement(cur)
-        elif isinstance(cur, mparser.ArithmeticNode):
-            return self.evaluate_arithmeticstatement(cur)
-        elif isinstance(cur, mparser.ForeachClauseNode):
-            self.evaluate_foreach(cur)
-        elif isinstance(cur, mparser.IndexNode):
-            return self.evaluate_indexing(cur)
-        elif isinstance(cur, mparser.TernaryNode):
-            return self.evaluate_ternary(cur)
-        elif isinstance(cur, mparser.ContinueNode):
-            raise ContinueRequest()
-        elif isinstance(cur, mparser.BreakNode):
-            raise BreakRequest()
-        elif isinstance(cur, mparser.ParenthesizedNode):
-            return self.evaluate_statement(cur.inner)
-        elif isinstance(cur, mparser.TestCaseClauseNode):
-            return self.evaluate_testcase(cur)
-        else:
-            raise InvalidCode("Unknown statement.")
-        return None
+                return self.evaluate_fstring(cur)
+        return self._holderify(cur.value)
+
+    def evaluate_literal(self, cur: T.Union[mparser.BooleanNode, mparser.NumberNode]) -> InterpreterObject:
+        return self._holderify(cur.value)
+
+    def evaluate_id(self, cur: mparser.IdNode) -> InterpreterObject:
+        return self.get_variable(cur.value)
+
+    def evaluate_continue(self, cur: mparser.ContinueNode) -> None:
+        raise ContinueRequest()
+
+    def evaluate_break(self, cur: mparser.BreakNode) -> None:
+        raise BreakRequest()
+
+    def evaluate_parenthesized(self, cur: mparser.ParenthesizedNode) -> T.Optional[InterpreterObject]:
+        return self.evaluate_statement(cur.inner)
 
     def evaluate_arraystatement(self, cur: mparser.ArrayNode) -> InterpreterObject:
-        (arguments, kwargs) = self.reduce_arguments(cur.args)
+        args = cur.args
+        if not args.kwargs and all(type(a) in LITERAL_NODES and not getattr(a, 'is_fstring', False)
+                                   for a in args.arguments):
+            # Arrays of literals, like lists of sources, need no evaluation
+            literals = T.cast('T.List[mparser.ElementaryNode]', args.arguments)
+            return self._holderify([a.value for a in literals])
+        (arguments, kwargs) = self.reduce_arguments(args)
         if len(kwargs) > 0:
             raise InvalidCode('Keyword arguments are invalid in array construction.')
         return self._holderify([_unholder(x) for x in arguments])
@@ -544,13 +574,14 @@ class InterpreterBase:
         return self._holderify(res) if res is not None else None
 
     def _holderify(self, res: T.Union[TYPE_var, InterpreterObject]) -> InterpreterObject:
+        # Always check for an exact match first, types that are not holdable
+        # are not in the map
+        cls = self.holder_map.get(type(res), None)  # type: ignore[arg-type]
+        if cls is not None:
+            # Casts to Interpreter are required here since an assertion would
+            # not work for the `ast` module.
+            return cls(res, T.cast('Interpreter', self))
         if isinstance(res, HoldableTypes):
-            # Always check for an exact match first.
-            cls = self.holder_map.get(type(res), None)
-            if cls is not None:
-                # Casts to Interpreter are required here since an assertion would
-                # not work for the `ast` module.
-                return cls(res, T.cast('Interpreter', self))
             # Try the boundary types next.
             for typ, cls in self.bound_holder_map.items():
                 if isinstance(res, typ):
@@ -677,7 +708,7 @@ class InterpreterBase:
                 # We want fast  not cryptographically secure, this is just to
                 # see if the option file has changed
                 self.coredata.options_files[self.subproject] = (option_file, hashlib.sha1(f.read()).hexdigest())
-            oi = optinterpreter.OptionInterpreter(self.environment.coredata.optstore, self.subproject)
+            oi = optinterpreter.OptionInterpreter(self.environment.coredata.optstore, self.subproject, self.ast_cache_dir())
             oi.process(option_file)
             self.coredata.optstore.update_project_options(oi.options, self.subproject)
             self.build_def_files.add(option_file)
@@ -704,7 +735,7 @@ class InterpreterBase:
 
         code = self.read_buildfile(absname, buildfilename)
         try:
-            codeblock = mparser.Parser(code, absname).parse()
+            codeblock = self.parse_buildfile(code, absname)
         except mesonlib.MesonException as me:
             me.file = absname
             raise me
@@ -54,7 +54,7 @@ class MachineFileParser():
             # Windows paths...
             value = value.replace('\\', '\\\\')
             try:
-                ast = mparser.Parser(value, 'machinefile').parse()
+                ast = mparser.Parser(value, 'machinefile', keep_whitespace=False).parse()
                 if not ast.lines:
                     raise MesonException('value cannot be empty')
                 res = self._evaluate_statement(ast.lines[0])
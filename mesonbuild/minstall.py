@@ -6,10 +6,14 @@ from __future__ import annotations
 from glob import glob
 import argparse
 import errno
+import filecmp
+import hashlib
+import json
 import os
 import selectors
 import shlex
 import shutil
+import stat
 import subprocess
 import sys
 import typing as T
@@ -18,7 +22,7 @@ import re
 from . import build, tooldetect
 from .backend.backends import InstallData
 from .mesonlib import (MesonException, Popen_safe, RealPathAction, is_windows,
-                       is_aix, setup_vsenv, pickle_load, is_osx)
+                       is_aix, setup_vsenv, pickle_load, is_osx, determine_worker_count)
 from .options import OptionKey
 from .scripts import depfixer, destdir_join
 from .scripts.meson_exe import run_exe
@@ -30,6 +34,8 @@ except ImportError:
     main_file = None
 
 if T.TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
     from .backend.backends import (
             InstallDataBase, InstallEmptyDir,
             InstallSymlinkData, TargetInstallData
@@ -53,6 +59,9 @@ if T.TYPE_CHECKING:
         skip_subprojects: str
         tags: str
         strip: bool
+        jobs: int
+        copy_mode: str
+        incremental: bool
 
 
 symlink_warning = '''\
@@ -63,6 +72,10 @@ false to copy the link.'''
 
 selinux_updates: T.List[str] = []
 
+# _IOW(0x94, 9, int), clones a file on Linux filesystems that support
+# copy-on-write such as Btrfs and XFS.
+FICLONE = 0x40049409
+
 # Note: when adding arguments, please also add them to the completion
 # scripts in $MESONSRC/data/shell-completions/
 def add_arguments(parser: argparse.ArgumentParser) -> None:
@@ -86,6 +99,16 @@ def add_arguments(parser: argparse.ArgumentParser) -> None:
                         help='Install only targets having one of the given tags. (Since 0.60.0)')
     parser.add_argument('--strip', action='store_true',
                         help='Strip targets even if strip option was not set during configure. (Since 0.62.0)')
+    parser.add_argument('-j', '--jobs', default=0, type=int,
+                        help='The number of files to install in parallel. If the value is less than 1 '
+                             'the number of CPUs is used. (Since 1.11.0)')
+    parser.add_argument('--copy-mode', choices=['copy', 'reflink', 'hardlink'], default='copy',
+                        help='How to create the installed files when they do not need to be modified: '
+                             'reflink clones them on filesystems that support it, hardlink links them to '
+                             'the files in the build and source directories. (Since 1.11.0)')
+    parser.add_argument('--incremental', default=False, action='store_true',
+                        help='Only install the files whose source or install options changed since the last '
+                             'incremental install, and remove the files that are no longer installed. (Since 1.11.0)')
 
 class DirMaker:
     def __init__(self, lf: T.TextIO, makedirs: T.Callable[..., None]):
@@ -133,6 +156,50 @@ def is_executable(path: str, follow_symlinks: bool = False) -> bool:
     return bool(os.stat(path, follow_symlinks=follow_symlinks).st_mode & 0o111)
 
 
+def clone_file(src: str, dst: str) -> bool:
+    '''Creates @dst as a copy-on-write clone of @src, or as a copy made by the
+    kernel. Returns False if neither is supported, @dst then needs to be copied
+    again.'''
+    if not sys.platform.startswith('linux'):
+        return False
+    import fcntl
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return True
+        except OSError:
+            pass
+        if not hasattr(os, 'copy_file_range'):
+            return False
+        size = os.fstat(fsrc.fileno()).st_size
+        copied = 0
+        try:
+            while copied < size:
+                n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+                if n == 0:
+                    return False
+                copied += n
+        except OSError:
+            return False
+    return True
+
+def copy_file(src: str, dst: str, follow_symlinks: bool = True, copy_mode: str = 'copy') -> None:
+    '''Copies @src to @dst with its metadata like shutil.copy2(). With
+    copy_mode 'reflink' or 'hardlink', @dst shares its data with @src when
+    the filesystem allows it.'''
+    if follow_symlinks or not os.path.islink(src):
+        if copy_mode == 'hardlink':
+            try:
+                os.link(src, dst)
+                return
+            except OSError:
+                pass
+        elif copy_mode == 'reflink' and clone_file(src, dst):
+            shutil.copystat(src, dst)
+            return
+    shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+
+
 def append_to_log(lf: T.TextIO, line: str) -> None:
     lf.write(line)
     if not line.endswith('\n'):
@@ -239,6 +306,21 @@ def set_mode(path: str, mode: T.Optional['FileMode'], default_umask: T.Union[str
         sanitize_permissions(path, default_umask)
 
 
+def set_mode_is_noop(path: str, mode: T.Optional['FileMode'], default_umask: T.Union[str, int]) -> bool:
+    '''Whether set_mode() would leave the owner and permissions of @path
+    unchanged, so that it can be hardlinked instead of copied.'''
+    if mode is not None and (mode.owner is not None or mode.group is not None):
+        return False
+    st_mode = os.stat(path).st_mode
+    if mode is not None and mode.perms_s is not None:
+        return stat.S_IMODE(st_mode) == mode.perms
+    if default_umask == 'preserve':
+        return True
+    assert isinstance(default_umask, int), 'umask should only be "preserve" or an integer'
+    new_perms = 0o777 if st_mode & 0o111 else 0o666
+    return stat.S_IMODE(st_mode) == new_perms & ~default_umask
+
+
 def restore_selinux_contexts() -> None:
     '''
     Restores the SELinux context for files in @selinux_updates
@@ -300,6 +382,89 @@ def check_for_stampfile(fname: str) -> str:
     return fname
 
 
+def hash_file(fname: str) -> str:
+    h = hashlib.sha256()
+    with open(fname, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+class InstallManifest:
+    '''The files installed by the previous incremental install and the files
+    installed by the current one.
+
+    Each installed file records the size, modification time and hash of its
+    source and the options it was installed with, which is enough to know
+    whether it must be installed again. It also records the size and the
+    modification time of the installed file, so that files modified or
+    removed after being installed are installed again.
+    '''
+
+    VERSION = 1
+
+    def __init__(self, fname: str, destdir: str, prefix: str, umask: T.Union[str, int]):
+        self.fname = fname
+        self.header = {'version': self.VERSION, 'destdir': destdir, 'prefix': prefix, 'umask': umask}
+        self.old: T.Dict[str, T.Dict[str, T.Any]] = {}
+        self.new: T.Dict[str, T.Dict[str, T.Any]] = {}
+        try:
+            with open(fname, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Files installed somewhere else are not known
+        if isinstance(data, dict) and all(data.get(k) == v for k, v in self.header.items()):
+            self.old = data['files']
+
+    def is_up_to_date(self, from_file: str, to_file: str, options: str) -> bool:
+        entry = self.old.get(to_file)
+        if entry is None or entry.get('source') != from_file or entry.get('options') != options:
+            return False
+        try:
+            src = os.stat(from_file)
+            dst = os.stat(to_file)
+        except OSError:
+            return False
+        if entry['installed'] != [dst.st_size, dst.st_mtime_ns] or entry['size'] != src.st_size:
+            return False
+        if entry['mtime'] != src.st_mtime_ns:
+            # The source was regenerated, possibly with the same contents
+            if entry['hash'] != hash_file(from_file):
+                return False
+            entry = dict(entry, mtime=src.st_mtime_ns)
+        self.new[to_file] = entry
+        return True
+
+    def add_file(self, from_file: str, to_file: str, options: str) -> None:
+        '''Called once @from_file is copied. The installed file is stat'ed by
+        save(), after it has been stripped and had its rpath fixed.'''
+        src = os.stat(from_file)
+        self.new[to_file] = {'source': from_file, 'size': src.st_size, 'mtime': src.st_mtime_ns,
+                             'hash': hash_file(from_file), 'options': options, 'installed': None}
+
+    def add_symlink(self, target: str, link: str) -> None:
+        self.new[link] = {'symlink': target}
+
+    def get_removed(self) -> T.List[str]:
+        return sorted(f for f in self.old if f not in self.new)
+
+    def save(self, complete: bool) -> None:
+        '''Writes the manifest. If the install was not @complete, because it
+        was restricted to some tags or subprojects, the files that were not
+        installed are kept as they were.'''
+        files = self.new if complete else {**self.old, **self.new}
+        for to_file, entry in list(self.new.items()):
+            if 'installed' in entry and entry['installed'] is None:
+                try:
+                    st = os.stat(to_file)
+                    entry['installed'] = [st.st_size, st.st_mtime_ns]
+                except OSError:
+                    del files[to_file]
+        # json.dump() does not use the C encoder
+        with open(self.fname, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({**self.header, 'files': files}))
+
+
 class Installer:
 
     def __init__(self, options: 'ArgumentType', lf: T.TextIO):
@@ -308,12 +473,46 @@ class Installer:
         self.options = options
         self.lf = lf
         self.preserved_file_count = 0
+        self.unchanged_file_count = 0
+        self.manifest: T.Optional[InstallManifest] = None
         self.dry_run = options.dry_run
         # [''] means skip none,
         # ['*'] means skip all,
         # ['sub1', ...] means skip only those.
         self.skip_subprojects = [i.strip() for i in options.skip_subprojects.split(',')]
         self.tags = [i.strip() for i in options.tags.split(',')] if options.tags else None
+        # Pool copying, stripping and setting the mode of the installed files,
+        # see schedule(). None when installing sequentially.
+        self.pool: T.Optional[ThreadPoolExecutor] = None
+        self.pending: T.Dict[str, Future[None]] = {}
+
+    def schedule(self, path: str, func: T.Callable[..., None], *args: T.Any, **kwargs: T.Any) -> None:
+        '''Run func(*args, **kwargs) on the thread pool, after all the previous
+        jobs scheduled for the same installed path.'''
+        if self.pool is None:
+            func(*args, **kwargs)
+            return
+        previous = self.pending.get(path)
+
+        def job() -> None:
+            # The thread pool runs jobs in order, so previous is either
+            # running or done and this cannot deadlock.
+            if previous is not None:
+                previous.result()
+            func(*args, **kwargs)
+        self.pending[path] = self.pool.submit(job)
+
+    def wait(self, path: T.Optional[str] = None) -> None:
+        '''Wait for the jobs of @path, or for all the jobs, to be done. Errors
+        of the jobs are raised here.'''
+        if path is not None:
+            if path in self.pending:
+                self.pending.pop(path).result()
+            return
+        jobs = list(self.pending.values())
+        self.pending.clear()
+        for f in jobs:
+            f.result()
 
     def remove(self, *args: T.Any, **kwargs: T.Any) -> None:
         if not self.dry_run:
@@ -331,6 +530,10 @@ class Installer:
         if not self.dry_run:
             shutil.copy(*args, **kwargs)
 
+    def copy_file(self, *args: T.Any, **kwargs: T.Any) -> None:
+        if not self.dry_run:
+            copy_file(*args, **kwargs)
+
     def copy2(self, *args: T.Any, **kwargs: T.Any) -> None:
         if not self.dry_run:
             shutil.copy2(*args, **kwargs)
@@ -343,9 +546,9 @@ class Installer:
         if not self.dry_run:
             shutil.copystat(*args, **kwargs)
 
-    def fix_rpath(self, *args: T.Any, **kwargs: T.Any) -> None:
+    def fix_rpaths(self, *args: T.Any, **kwargs: T.Any) -> None:
         if not self.dry_run:
-            depfixer.fix_rpath(*args, **kwargs)
+            depfixer.fix_rpaths(*args, **kwargs)
 
     def set_chown(self, *args: T.Any, **kwargs: T.Any) -> None:
         if not self.dry_run:
@@ -359,9 +562,20 @@ class Installer:
         if not self.dry_run:
             sanitize_permissions(*args, **kwargs)
 
-    def set_mode(self, *args: T.Any, **kwargs: T.Any) -> None:
+    def set_mode(self, path: str, mode: T.Optional[FileMode], default_umask: T.Union[str, int]) -> None:
         if not self.dry_run:
-            set_mode(*args, **kwargs)
+            self.schedule(path, set_mode, path, mode, default_umask)
+
+    def may_hardlink(self, from_file: str, mode: T.Optional[FileMode], default_umask: T.Union[str, int]) -> bool:
+        '''A hardlink shares its owner and permissions with the source and build
+        trees, so it can only be used if setting the mode afterwards does not
+        change them.'''
+        if self.options.copy_mode != 'hardlink':
+            return False
+        try:
+            return set_mode_is_noop(from_file, mode, default_umask)
+        except OSError:
+            return False
 
     def restore_selinux_contexts(self, destdir: str) -> None:
         if not self.dry_run and not destdir:
@@ -397,16 +611,32 @@ class Installer:
         # Always replace danging symlinks
         if os.path.islink(from_file) and not os.path.isfile(from_file):
             return False
-        from_time = os.stat(from_file).st_mtime
-        to_time = os.stat(to_file).st_mtime
-        return from_time <= to_time
+        from_stat = os.stat(from_file)
+        to_stat = os.stat(to_file)
+        if from_stat.st_mtime <= to_stat.st_mtime:
+            return True
+        # The file may have been regenerated with the same contents
+        return from_stat.st_size == to_stat.st_size and filecmp.cmp(from_file, to_file, shallow=False)
 
     def do_copyfile(self, from_file: str, to_file: str,
                     makedirs: T.Optional[T.Tuple[T.Any, str]] = None,
-                    follow_symlinks: T.Optional[bool] = None) -> bool:
+                    follow_symlinks: T.Optional[bool] = None,
+                    may_hardlink: bool = False, options: T.Any = None) -> bool:
+        '''Installs @from_file as @to_file. The file is copied by the thread
+        pool, the caller must use schedule() to modify it afterwards, and can
+        only pass may_hardlink=True if that leaves the file unchanged, see
+        may_hardlink(). @options are the install options that, when changed,
+        require the file to be installed again by an incremental install.'''
         outdir = os.path.split(to_file)[0]
+        # The same file can be installed twice
+        self.wait(to_file)
         if not os.path.isfile(from_file) and not os.path.islink(from_file):
             raise MesonException(f'Tried to install something that isn\'t a file: {from_file!r}')
+        options = repr(options)
+        if self.manifest is not None and self.manifest.is_up_to_date(from_file, to_file, options):
+            append_to_log(self.lf, to_file)
+            self.unchanged_file_count += 1
+            return False
         # copyfile fails if the target file already exists, so remove it to
         # allow overwriting a previous install. If the target is not a file, we
         # want to give a readable error.
@@ -416,6 +646,9 @@ class Installer:
             if self.should_preserve_existing_file(from_file, to_file):
                 append_to_log(self.lf, f'# Preserving old file {to_file}\n')
                 self.preserved_file_count += 1
+                # Still installed by the project, it must not be removed
+                if self.manifest is not None:
+                    self.manifest.add_file(from_file, to_file, options)
                 return False
             self.log(f'Installing {from_file} to {outdir}')
             self.remove(to_file)
@@ -426,17 +659,23 @@ class Installer:
                 dirmaker, outdir = makedirs
                 # Create dirs if needed
                 dirmaker.makedirs(outdir, exist_ok=True)
+        copy_mode = self.options.copy_mode
+        if copy_mode == 'hardlink' and not may_hardlink:
+            copy_mode = 'copy'
         if os.path.islink(from_file):
             if not os.path.exists(from_file):
                 # Dangling symlink. Replicate as is.
-                self.copy(from_file, outdir, follow_symlinks=False)
+                self.schedule(to_file, self.copy, from_file, outdir, follow_symlinks=False)
             else:
                 if follow_symlinks is None:
                     follow_symlinks = True  # TODO: change to False when removing the warning
                     print(symlink_warning)
-                self.copy2(from_file, to_file, follow_symlinks=follow_symlinks)
+                self.schedule(to_file, self.copy_file, from_file, to_file,
+                              follow_symlinks=follow_symlinks, copy_mode=copy_mode)
         else:
-            self.copy2(from_file, to_file)
+            self.schedule(to_file, self.copy_file, from_file, to_file, copy_mode=copy_mode)
+        if self.manifest is not None and os.path.exists(from_file):
+            self.schedule(to_file, self.manifest.add_file, from_file, to_file, options)
         selinux_updates.append(to_file)
         append_to_log(self.lf, to_file)
         return True
@@ -461,6 +700,8 @@ class Installer:
                       "Skipping all symlinking.")
                 self.printed_symlink_error = True
             return False
+        if self.manifest is not None:
+            self.manifest.add_symlink(target, link)
         append_to_log(self.lf, link)
         return True
 
@@ -534,7 +775,8 @@ class Installer:
                     dm.makedirs(parent_dir)
                     self.copystat(os.path.dirname(abs_src), parent_dir)
                 # FIXME: what about symlinks?
-                self.do_copyfile(abs_src, abs_dst, follow_symlinks=follow_symlinks)
+                self.do_copyfile(abs_src, abs_dst, follow_symlinks=follow_symlinks, options=install_mode,
+                                 may_hardlink=self.may_hardlink(abs_src, install_mode, data.install_umask))
                 self.set_mode(abs_dst, install_mode, data.install_umask)
 
     def do_install(self, datafilename: str) -> None:
@@ -551,25 +793,42 @@ class Installer:
             os.environ['DESTDIR'] = destdir
         destdir = destdir or ''
         fullprefix = destdir_join(destdir, d.prefix)
+        if self.options.copy_mode == 'hardlink' and not destdir:
+            # The installed files would share their inode with the source and
+            # build trees, where modifying one modifies the other
+            raise MesonException('--copy-mode=hardlink can only be used with a DESTDIR')
 
         if d.install_umask != 'preserve':
             assert isinstance(d.install_umask, int)
             os.umask(d.install_umask)
 
+        if self.options.incremental and not self.dry_run:
+            self.manifest = InstallManifest(os.path.join(os.path.dirname(self.lf.name), 'install-manifest.json'),
+                                            destdir, d.prefix, d.install_umask)
+
         self.did_install_something = False
+        jobs = self.options.jobs if self.options.jobs > 0 else determine_worker_count()
         try:
             with DirMaker(self.lf, self.makedirs) as dm:
-                self.install_subdirs(d, dm, destdir, fullprefix) # Must be first, because it needs to delete the old subtree.
-                self.install_targets(d, dm, destdir, fullprefix)
-                self.install_headers(d, dm, destdir, fullprefix)
-                self.install_man(d, dm, destdir, fullprefix)
-                self.install_emptydir(d, dm, destdir, fullprefix)
-                self.install_data(d, dm, destdir, fullprefix)
+                if jobs > 1 and not self.dry_run:
+                    from concurrent.futures import ThreadPoolExecutor
+                    try:
+                        with ThreadPoolExecutor(max_workers=jobs) as self.pool:
+                            self.install_files(d, dm, destdir, fullprefix)
+                    finally:
+                        self.pool = None
+                        self.pending.clear()
+                else:
+                    self.install_files(d, dm, destdir, fullprefix)
                 self.install_symlinks(d, dm, destdir, fullprefix)
+                if self.manifest is not None:
+                    self.update_manifest(self.manifest)
                 self.restore_selinux_contexts(destdir)
                 self.run_install_script(d, destdir, fullprefix)
-                if not self.did_install_something:
+                if not self.did_install_something and self.unchanged_file_count == 0:
                     self.log('Nothing to install.')
+                if not self.options.quiet and self.unchanged_file_count > 0:
+                    self.log(f'{self.unchanged_file_count} files were up to date')
                 if not self.options.quiet and self.preserved_file_count > 0:
                     self.log('Preserved {} unchanged files, see {} for the full list'
                              .format(self.preserved_file_count, os.path.normpath(self.lf.name)))
@@ -610,6 +869,27 @@ class Installer:
                               '-C', os.getcwd(), '--no-rebuild')
             raise
 
+    def update_manifest(self, manifest: InstallManifest) -> None:
+        # Files that are not installed because of --tags or
+        # --skip-subprojects are not removed.
+        complete = self.tags is None and self.skip_subprojects == ['']
+        if complete:
+            for fname in manifest.get_removed():
+                if os.path.islink(fname) or os.path.isfile(fname):
+                    self.did_install_something = True
+                    self.log(f'Removing {fname}')
+                    self.remove(fname)
+        manifest.save(complete)
+
+    def install_files(self, d: InstallData, dm: DirMaker, destdir: str, fullprefix: str) -> None:
+        self.install_subdirs(d, dm, destdir, fullprefix) # Must be first, because it needs to delete the old subtree.
+        self.install_targets(d, dm, destdir, fullprefix)
+        self.install_headers(d, dm, destdir, fullprefix)
+        self.install_man(d, dm, destdir, fullprefix)
+        self.install_emptydir(d, dm, destdir, fullprefix)
+        self.install_data(d, dm, destdir, fullprefix)
+        self.wait()
+
     def do_strip(self, strip_bin: T.List[str], fname: str, outname: str) -> None:
         self.log(f'Stripping target {fname!r}.')
         if is_osx():
@@ -643,7 +923,9 @@ class Installer:
             fullfilename = i.path
             outfilename = get_destdir_path(destdir, fullprefix, i.install_path)
             outdir = os.path.dirname(outfilename)
-            if self.do_copyfile(fullfilename, outfilename, makedirs=(dm, outdir), follow_symlinks=i.follow_symlinks):
+            if self.do_copyfile(fullfilename, outfilename, makedirs=(dm, outdir), follow_symlinks=i.follow_symlinks,
+                                options=i.install_mode,
+                                may_hardlink=self.may_hardlink(fullfilename, i.install_mode, d.install_umask)):
                 self.did_install_something = True
             self.set_mode(outfilename, i.install_mode, d.install_umask)
 
@@ -664,7 +946,8 @@ class Installer:
             full_source_filename = m.path
             outfilename = get_destdir_path(destdir, fullprefix, m.install_path)
             outdir = os.path.dirname(outfilename)
-            if self.do_copyfile(full_source_filename, outfilename, makedirs=(dm, outdir)):
+            if self.do_copyfile(full_source_filename, outfilename, makedirs=(dm, outdir), options=m.install_mode,
+                                may_hardlink=self.may_hardlink(full_source_filename, m.install_mode, d.install_umask)):
                 self.did_install_something = True
             self.set_mode(outfilename, m.install_mode, d.install_umask)
 
@@ -690,7 +973,8 @@ class Installer:
             outdir = get_destdir_path(destdir, fullprefix, t.install_path)
             outfilename = os.path.join(outdir, fname)
             if self.do_copyfile(fullfilename, outfilename, makedirs=(dm, outdir),
-                                follow_symlinks=t.follow_symlinks):
+                                follow_symlinks=t.follow_symlinks, options=t.install_mode,
+                                may_hardlink=self.may_hardlink(fullfilename, t.install_mode, d.install_umask)):
                 self.did_install_something = True
             self.set_mode(outfilename, t.install_mode, d.install_umask)
 
@@ -733,6 +1017,10 @@ class Installer:
                 sys.exit(rc)
 
     def install_targets(self, d: InstallData, dm: DirMaker, destdir: str, fullprefix: str) -> None:
+        # The rpaths of all the installed files are fixed at once, and file
+        # modes need to be set last, after strip/depfixer editing
+        rpath_jobs: T.List[T.Tuple[str, T.Set[bytes], str, str, T.Mapping[str, str]]] = []
+        modes: T.List[T.Tuple[str, T.Optional[FileMode]]] = []
         for t in d.targets:
             # In AIX, we archive our shared libraries.  When we install any package in AIX we need to
             # install the archive in which the shared library exists. The below code does the same.
@@ -759,26 +1047,31 @@ class Installer:
             install_rpath = t.install_rpath
             install_name_mappings = t.install_name_mappings
             install_mode = t.install_mode
+            options = (install_mode, should_strip, install_rpath, sorted(t.rpath_dirs_to_remove),
+                       final_path, install_name_mappings)
             if not os.path.exists(fname):
                 raise MesonException(f'File {fname!r} could not be found')
             elif os.path.isfile(fname):
-                file_copied = self.do_copyfile(fname, outname, makedirs=(dm, outdir))
-                if should_strip and d.strip_bin is not None:
+                file_copied = self.do_copyfile(fname, outname, makedirs=(dm, outdir), may_hardlink=False,
+                                               options=options)
+                if file_copied and should_strip and d.strip_bin is not None:
                     if fname.endswith('.jar'):
                         self.log('Not stripping jar target: {}'.format(os.path.basename(fname)))
                         continue
-                    self.do_strip(d.strip_bin, fname, outname)
+                    self.schedule(outname, self.do_strip, d.strip_bin, fname, outname)
                 if fname.endswith('.js') or fname.endswith('.mjs') or fname.endswith('.cjs'):
                     # Emscripten outputs js files and optionally a wasm file and a worker file
                     # If these were generated, install them as well.
                     wasm_source = os.path.splitext(fname)[0] + '.wasm'
                     if os.path.exists(wasm_source):
                         wasm_output = os.path.splitext(outname)[0] + '.wasm'
-                        file_copied = self.do_copyfile(wasm_source, wasm_output)
+                        file_copied = self.do_copyfile(wasm_source, wasm_output, may_hardlink=False,
+                                                       options=options)
                     worker_source = os.path.splitext(fname)[0] + '.worker' + os.path.splitext(fname)[1]
                     if os.path.exists(worker_source):
                         worker_output = os.path.splitext(outname)[0] + '.worker' + os.path.splitext(fname)[1]
-                        file_copied = self.do_copyfile(worker_source, worker_output)
+                        file_copied = self.do_copyfile(worker_source, worker_output, may_hardlink=False,
+                                                       options=options)
             elif os.path.isdir(fname):
                 fname = os.path.join(d.build_dir, fname.rstrip('/'))
                 outname = os.path.join(outdir, os.path.basename(fname))
@@ -788,16 +1081,15 @@ class Installer:
                 raise RuntimeError(f'Unknown file type for {fname!r}')
             if file_copied:
                 self.did_install_something = True
-                try:
-                    self.fix_rpath(outname, t.rpath_dirs_to_remove, install_rpath, final_path,
-                                   install_name_mappings, verbose=False)
-                except SystemExit as e:
-                    if isinstance(e.code, int) and e.code == 0:
-                        pass
-                    else:
-                        raise
-                # file mode needs to be set last, after strip/depfixer editing
-                self.set_mode(outname, install_mode, d.install_umask)
+                rpath_jobs.append((outname, t.rpath_dirs_to_remove, install_rpath, final_path,
+                                   install_name_mappings))
+                modes.append((outname, install_mode))
+        # depfixer has its own thread pool
+        for outname, *_ in rpath_jobs:
+            self.wait(outname)
+        self.fix_rpaths(rpath_jobs, verbose=False)
+        for outname, install_mode in modes:
+            self.set_mode(outname, install_mode, d.install_umask)
 
 def rebuild_all(wd: str, backend: str) -> bool:
     if backend == 'none':
@@ -16,6 +16,7 @@ import platform
 import shlex
 import subprocess
 import shutil
+import threading
 import typing as T
 from contextlib import contextmanager
 from dataclasses import dataclass, field
@@ -75,6 +76,8 @@ class _Logger:
     logged_once: T.Set[T.Tuple[str, ...]] = field(default_factory=set)
     log_warnings_counter = 0
     log_pager: T.Optional['subprocess.Popen'] = None
+    # Per thread state, see buffer_log_file()
+    log_thread_state: threading.local = field(default_factory=threading.local)
 
     _LOG_FNAME: T.ClassVar[str] = 'meson-log.txt'
     _SLOG_FNAME: T.ClassVar[str] = 'meson-setup.txt'
@@ -96,6 +99,28 @@ class _Logger:
         finally:
             self.log_disable_stdout = restore
 
+    @contextmanager
+    def buffer_log_file(self) -> T.Iterator[io.StringIO]:
+        '''Collect what the current thread writes to the log file instead of
+        writing it, so that work done in threads can be logged in order with
+        write_log_file().'''
+        buf = io.StringIO()
+        restore = getattr(self.log_thread_state, 'buffer', None)
+        self.log_thread_state.buffer = buf
+        try:
+            yield buf
+        finally:
+            self.log_thread_state.buffer = restore
+
+    def write_log_file(self, text: str) -> None:
+        if self.log_file is not None and text:
+            self.log_file.write(text)
+            self.log_file.flush()
+
+    def _log_file_target(self) -> T.Optional[T.TextIO]:
+        buf: T.Optional[io.StringIO] = getattr(self.log_thread_state, 'buffer', None)
+        return buf if buf is not None else self.log_file
+
     def set_quiet(self) -> None:
         self.log_errors_only = True
 
@@ -222,17 +247,19 @@ class _Logger:
     def debug(self, *args: TV_Loggable, sep: T.Optional[str] = None,
               end: T.Optional[str] = None, display_timestamp: bool = True) -> None:
         arr = process_markup(args, False, display_timestamp)
-        if self.log_file is not None:
-            print(*arr, file=self.log_file, sep=sep, end=end)
-            self.log_file.flush()
+        log_file = self._log_file_target()
+        if log_file is not None:
+            print(*arr, file=log_file, sep=sep, end=end)
+            log_file.flush()
 
     def _log(self, *args: TV_Loggable, is_error: bool = False,
              nested: bool = True, sep: T.Optional[str] = None,
              end: T.Optional[str] = None, display_timestamp: bool = True) -> None:
         arr = process_markup(args, False, display_timestamp)
-        if self.log_file is not None:
-            print(*arr, file=self.log_file, sep=sep, end=end)
-            self.log_file.flush()
+        log_file = self._log_file_target()
+        if log_file is not None:
+            print(*arr, file=log_file, sep=sep, end=end)
+            log_file.flush()
         if self.slog_file is not None:
             print(*arr, file=self.slog_file, sep=sep, end=end)
             self.slog_file.flush()
@@ -421,6 +448,7 @@ class _Logger:
                 pass
 
 _logger = _Logger()
+buffer_log_file = _logger.buffer_log_file
 cmd_ci_include = _logger.cmd_ci_include
 colorize_console = _logger.colorize_console
 debug = _logger.debug
@@ -448,6 +476,7 @@ shutdown = _logger.shutdown
 start_pager = _logger.start_pager
 stop_pager = _logger.stop_pager
 warning = _logger.warning
+write_log_file = _logger.write_log_file
 
 class AnsiDecorator:
     plain_code = "\033[0m"
@@ -4,7 +4,7 @@
 
 from __future__ import annotations
 
-import json, subprocess, os, sys, tarfile, io
+import json, subprocess, os, sys, tarfile, hashlib, shutil, tempfile
 import urllib.request, urllib.parse
 from pathlib import Path
 import typing as T
@@ -104,18 +104,119 @@ if T.TYPE_CHECKING:
         # These are missing from the base type
         link_args: T.List[str]
 
-def tar_strip1(files: T.List[tarfile.TarInfo]) -> T.Generator[tarfile.TarInfo, None, None]:
+# All the information needed from node is collected by a single invocation,
+# failing to resolve an optional package is reported instead of aborting
+node_probe_packages = ['node-addon-api', 'emnapi']
+node_probe_script = '''(() => {
+  const probe = (name) => {
+    try { return { ok: require(name) }; } catch (e) { return { error: String(e.message) }; }
+  };
+  return {
+    release: process.release,
+    version: process.version,
+    packages: Object.fromEntries(%s.map((p) => [p, probe(p)]))
+  };
+})()''' % json.dumps(node_probe_packages)
+node_probe_cache_file = 'node-api-probe.json'
+node_probe_cache_version = 1
+
+def node_package_json(name: str, source_root: Path) -> T.Optional[Path]:
+    """Emulate the node module resolution to find the package.json that
+    require(name) would load when run from source_root."""
+    search = [d / 'node_modules' for d in [source_root, *source_root.parents]]
+    search.extend(Path(d) for d in os.environ.get('NODE_PATH', '').split(os.pathsep) if d)
+    if 'HOME' in os.environ:
+        search.extend([Path(os.environ['HOME'], '.node_modules'), Path(os.environ['HOME'], '.node_libraries')])
+    for d in search:
+        pkg = d / name / 'package.json'
+        if pkg.is_file():
+            return pkg
+    return None
+
+def node_probe_key(source_root: Path) -> T.Optional[str]:
+    """Compute the key identifying a node probe result: the node binary
+    (path, size and mtime) and the contents of the package.json files of the
+    probed packages. Returns None if node cannot be found."""
+    node = shutil.which('node')
+    if node is None:
+        return None
+    node_stat = os.stat(os.path.realpath(node))
+    key: T.Dict[str, T.Any] = {
+        'version': node_probe_cache_version,
+        'node': [node, node_stat.st_size, node_stat.st_mtime_ns],
+        'NODE_PATH': os.environ.get('NODE_PATH'),
+        'packages': {},
+    }
+    for name in node_probe_packages:
+        pkg = node_package_json(name, source_root)
+        if pkg is not None:
+            key['packages'][name] = [str(pkg), hashlib.sha256(pkg.read_bytes()).hexdigest()]
+        else:
+            key['packages'][name] = None
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+def read_node_probe_cache(cache_file: Path, key: str) -> T.Optional[T.Dict[str, T.Any]]:
+    try:
+        with cache_file.open(encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get('key') != key:
+        return None
+    return T.cast('T.Dict[str, T.Any]', cached['probes'])
+
+def write_node_probe_cache(cache_file: Path, key: str, probes: T.Dict[str, T.Any]) -> None:
+    tmp = cache_file.with_name(cache_file.name + '~')
+    try:
+        with tmp.open('w', encoding='utf-8') as f:
+            json.dump({'key': key, 'probes': probes}, f)
+        os.replace(tmp, cache_file)
+    except OSError as e:
+        mlog.debug(f'Failed saving the node-api probe cache: {str(e)}')
+
+def tar_strip1(files: T.Iterable[tarfile.TarInfo]) -> T.Generator[tarfile.TarInfo, None, None]:
     for member in files:
         member.path = str(Path(*Path(member.path).parts[1:]))
         yield member
 
+class HashingReader:
+    """A file-like wrapper that computes the SHA256 of everything read through it."""
+
+    def __init__(self, stream: T.BinaryIO) -> None:
+        self.stream = stream
+        self.hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.hash.update(data)
+        return data
+
+    def drain(self) -> str:
+        while self.read(64 * 1024):
+            pass
+        return self.hash.hexdigest()
+
+def node_dist_url(url: str, version: str) -> str:
+    """Redirect a nodejs.org distribution URL to NODEJS_ORG_MIRROR if it is set.
+    The mirror can be an URL or a local directory for offline builds, in both
+    cases it must have the same layout as https://nodejs.org/download/release."""
+    mirror = os.environ.get('NODEJS_ORG_MIRROR')
+    if not mirror or f'/{version}/' not in url:
+        return url
+    if '://' not in mirror:
+        mirror = Path(mirror).resolve().as_uri()
+    rel = url.split(f'/{version}/', 1)[1]
+    return f'{mirror.rstrip("/")}/{version}/{rel}'
+
 class NapiModule(ExtensionModule):
 
     INFO = ModuleInfo('node-api', '1.5.0')
 
     def __init__(self, interpreter: 'Interpreter') -> None:
         super().__init__(interpreter)
+        self.node_probes: Any = None
         self.node_process: Any = None
+        self.node_checksums: T.Optional[T.Dict[str, str]] = None
         self.node_addon_api_package: Any = None
         self.emnapi_package: Any = None
         self.napi_dir: Path = None
@@ -145,19 +246,43 @@ class NapiModule(ExtensionModule):
             raise mesonlib.MesonException(f'Failed spawning node: {str(e)}')
         return result
 
+    # Spawning node is expensive, its results are cached in the build directory
+    # and are reused for as long as node and the probed packages do not change
+    def load_node_probes(self) -> None:
+        if self.node_probes is not None:
+            return
+        cache_file = Path(self.interpreter.environment.get_scratch_dir()) / node_probe_cache_file
+        key = node_probe_key(self.source_root)
+        probes = read_node_probe_cache(cache_file, key) if key is not None else None
+        if probes is None:
+            probes = self.parse_node_json_output(node_probe_script)
+            if key is not None:
+                write_node_probe_cache(cache_file, key, probes)
+        else:
+            mlog.debug('Using cached node-api probe results from', str(cache_file))
+        self.node_probes = probes
+
+    def load_node_package(self, name: str) -> Any:
+        self.load_node_probes()
+        result = self.node_probes['packages'][name]
+        if 'error' in result:
+            raise mesonlib.MesonException(f'Failed loading {name}: {result["error"]}')
+        return result['ok']
+
     def load_node_process(self) -> None:
         if self.node_process is None:
-            self.node_process = self.parse_node_json_output('process')
+            self.load_node_probes()
+            self.node_process = {'release': self.node_probes['release'], 'version': self.node_probes['version']}
             self.get_napi_dir()
 
     def load_node_addon_api_package(self) -> None:
         if self.node_addon_api_package is None:
-            self.node_addon_api_package = self.parse_node_json_output('require("node-addon-api")')
+            self.node_addon_api_package = self.load_node_package('node-addon-api')
             mlog.log('node-addon-api:', mlog.bold(self.node_addon_api_package['include'].strip('\"')))
 
     def load_emnapi_package(self) -> None:
         if self.emnapi_package is None:
-            self.emnapi_package = self.parse_node_json_output('require("emnapi")')
+            self.emnapi_package = self.load_node_package('emnapi')
             mlog.log('emnapi:', mlog.bold(str([str(p) for p in self.emnapi_include_dirs(self.source_root)])))
 
     def construct_swig_options(self, opts: 'NodeAPIOptions') -> T.List[str]:
@@ -221,29 +346,79 @@ class NapiModule(ExtensionModule):
         else:
             raise mesonlib.MesonException(f'Unsupported platform: {sys.platform}')
 
+    def load_node_checksums(self, url: str) -> T.Dict[str, str]:
+        if self.node_checksums is None:
+            self.node_checksums = {}
+            sums_url = url.split(f'/{self.node_process["version"]}/', 1)[0] + f'/{self.node_process["version"]}/SHASUMS256.txt'
+            try:
+                with urllib.request.urlopen(node_dist_url(sums_url, self.node_process['version'])) as remote:
+                    for line in remote.read().decode('utf-8').splitlines():
+                        parts = line.split()
+                        if len(parts) == 2:
+                            self.node_checksums[parts[1]] = parts[0].lower()
+            except Exception as e:
+                mlog.warning(f'Cannot retrieve {sums_url}, Node.js downloads will not be verified: {str(e)}')
+        return self.node_checksums
+
+    def verify_item(self, url: str, actual: str) -> None:
+        name = url.split(f'/{self.node_process["version"]}/', 1)[-1]
+        expected = self.load_node_checksums(url).get(name)
+        if expected is None:
+            mlog.warning(f'No checksum for {name}, cannot verify it')
+        elif expected != actual:
+            raise mesonlib.MesonException(f'Incorrect hash for {name}:\n {expected} expected\n {actual} actual.')
+
+    # Concurrent builds sharing the same cache wait on a lock for the first one
+    # to complete the download, the items are extracted to a temporary location
+    # and moved in place only after being verified, so an interrupted build
+    # never leaves a partial item
     def download_item(self, url: str, dest: Path) -> None:
         try:
-            if url.endswith('.tar.gz'):
-                if not os.path.exists(dest):
-                    mlog.log(f'Downloading {url} to {dest}')
-                    remote = urllib.request.urlopen(url)
-                    with tarfile.open(fileobj=io.BytesIO(remote.read()), mode='r:gz') as input:
-                        input.extractall(path=dest, members=tar_strip1(input.getmembers()))
-            else:
-                filename = urllib.parse.urlparse(url)
-                file = Path(dest, os.path.basename(filename.path))
-                if not os.path.exists(file):
-                    mlog.log(f'Downloading {url} to {str(file)}')
-                    remote = urllib.request.urlopen(url)
-                    data = remote.read()
-                    if os.path.exists(file):
-                        mlog.warning(f'{file} appeared while downloading, multiple concurrent builds?')
-                        return
-                    with file.open('wb') as output:
-                        output.write(data)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            with mesonlib.DirectoryLock(str(dest.parent), f'.{dest.name}.lock',
+                                        mesonlib.DirectoryLockAction.WAIT,
+                                        f'Failed to lock {dest.parent}'):
+                if url.endswith('.tar.gz'):
+                    if not os.path.exists(dest):
+                        self.download_tarball(url, dest)
+                else:
+                    filename = urllib.parse.urlparse(url)
+                    file = Path(dest, os.path.basename(filename.path))
+                    if not os.path.exists(file):
+                        self.download_file(url, file)
         except Exception as e:
             raise mesonlib.MesonException(f'Failed downloading from {url}: {str(e)}')
 
+    def download_tarball(self, url: str, dest: Path) -> None:
+        mlog.log(f'Downloading {url} to {dest}')
+        tmp = tempfile.mkdtemp(dir=dest.parent, prefix=f'.{dest.name}.')
+        try:
+            with urllib.request.urlopen(node_dist_url(url, self.node_process['version'])) as remote:
+                reader = HashingReader(remote)
+                with tarfile.open(fileobj=T.cast('T.BinaryIO', reader), mode='r|gz') as input:
+                    input.extractall(path=tmp, members=tar_strip1(input))
+                self.verify_item(url, reader.drain())
+            os.rename(tmp, dest)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    def download_file(self, url: str, file: Path) -> None:
+        mlog.log(f'Downloading {url} to {str(file)}')
+        file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=file.parent, prefix=f'.{file.name}.', delete=False) as output:
+            try:
+                with urllib.request.urlopen(node_dist_url(url, self.node_process['version'])) as remote:
+                    reader = HashingReader(remote)
+                    shutil.copyfileobj(reader, output)
+                output.close()
+                self.verify_item(url, reader.hash.hexdigest())
+                os.replace(output.name, file)
+            except BaseException:
+                output.close()
+                os.unlink(output.name)
+                raise
+
     def download_headers(self) -> None:
         if 'headersUrl' in self.node_process['release']:
             self.download_item(self.node_process['release']['headersUrl'], self.napi_dir)
@@ -5,7 +5,10 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 import re
 import codecs
+import hashlib
 import os
+import pickle
+import tempfile
 import typing as T
 
 from .mesonlib import MesonException
@@ -97,6 +100,48 @@ class Token(T.Generic[TV_TokenTypes]):
 
 IDENT_RE = re.compile('[_a-zA-Z][_0-9a-zA-Z]*')
 
+# Alternatives are tried in order, so they need to be sorted longest to shortest.
+TOKEN_SPECIFICATION = [
+    ('whitespace', r'[ \t]+'),
+    ('multiline_fstring', r"f'''[\s\S]*?'''"),
+    ('fstring', r"f'(?:[^'\\]|\\.)*'"),
+    ('id', IDENT_RE.pattern),
+    ('number', r'0[bB][01]+|0[oO][0-7]+|0[xX][0-9a-fA-F]+|0|[1-9]\d*'),
+    ('eol_cont', r'\\[ \t]*(?:#.*)?\n'),
+    ('multiline_string', r"'''[\s\S]*?'''"),
+    ('comment', r'#.*'),
+    ('string', r"'(?:[^'\\]|\\.)*'"),
+    ('plusassign', r'\+='),
+    ('equal', r'=='),
+    ('nequal', r'!='),
+    ('le', r'<='),
+    ('ge', r'>='),
+    ('eol', r'\n'),
+    ('lparen', r'\('),
+    ('rparen', r'\)'),
+    ('lbracket', r'\['),
+    ('rbracket', r'\]'),
+    ('lcurl', r'\{'),
+    ('rcurl', r'\}'),
+    ('dblquote', r'"'),
+    ('comma', r','),
+    ('dot', r'\.'),
+    ('plus', r'\+'),
+    ('dash', r'-'),
+    ('star', r'\*'),
+    ('percent', r'%'),
+    ('fslash', r'/'),
+    ('colon', r':'),
+    ('assign', r'='),
+    ('lt', r'<'),
+    ('gt', r'>'),
+    ('questionmark', r'\?'),
+]
+
+# A single regex with one named group per token type, so that every token is
+# matched with a single call into the regex engine.
+TOKEN_RE = re.compile('|'.join(f'(?P<{tid}>{regex})' for tid, regex in TOKEN_SPECIFICATION))
+
 class Lexer:
     def __init__(self, code: str):
         if code.startswith(codecs.BOM_UTF8.decode('utf-8')):
@@ -111,125 +156,89 @@ class Lexer:
         self.in_unit_test = 'MESON_RUNNING_IN_PROJECT_TESTS' in os.environ
         if self.in_unit_test:
             self.keywords.update({'testcase', 'endtestcase'})
-        self.token_specification = [
-            # Need to be sorted longest to shortest.
-            ('whitespace', re.compile(r'[ \t]+')),
-            ('multiline_fstring', re.compile(r"f'''(.|\n)*?'''", re.M)),
-            ('fstring', re.compile(r"f'([^'\\]|(\\.))*'")),
-            ('id', IDENT_RE),
-            ('number', re.compile(r'0[bB][01]+|0[oO][0-7]+|0[xX][0-9a-fA-F]+|0|[1-9]\d*')),
-            ('eol_cont', re.compile(r'\\[ \t]*(#.*)?\n')),
-            ('multiline_string', re.compile(r"'''(.|\n)*?'''", re.M)),
-            ('comment', re.compile(r'#.*')),
-            ('string', re.compile(r"'([^'\\]|(\\.))*'")),
-            ('plusassign', re.compile(r'\+=')),
-            ('equal', re.compile(r'==')),
-            ('nequal', re.compile(r'!=')),
-            ('le', re.compile(r'<=')),
-            ('ge', re.compile(r'>=')),
-        ]
-
-        self.single_char_tokens = {
-            '\n': 'eol',
-            '(': 'lparen',
-            ')': 'rparen',
-            '[': 'lbracket',
-            ']': 'rbracket',
-            '{': 'lcurl',
-            '}': 'rcurl',
-            '"': 'dblquote',
-            ',': 'comma',
-            '.': 'dot',
-            '+': 'plus',
-            '-': 'dash',
-            '*': 'star',
-            '%': 'percent',
-            '/': 'fslash',
-            ':': 'colon',
-            '=': 'assign',
-            '<': 'lt',
-            '>': 'gt',
-            '?': 'questionmark',
-        }
 
     def getline(self, line_start: int) -> str:
         return self.code[line_start:self.code.find('\n', line_start)]
 
-    def lex(self, filename: str) -> T.Generator[Token, None, None]:
+    def lex(self, filename: str, keep_whitespace: bool = True) -> T.Generator[Token, None, None]:
+        """Tokenize the code.
+
+        When keep_whitespace is False, the whitespace and comment tokens, which
+        are only needed to reproduce the original source, are not emitted.
+        """
+        code = self.code
+        code_len = len(code)
+        match = TOKEN_RE.match
+        keywords = self.keywords
         line_start = 0
         lineno = 1
         loc = 0
         par_count = 0
         bracket_count = 0
         curl_count = 0
-        try:
-            while loc < len(self.code):
-                value: str
-                span_start = loc
-                col = loc - line_start
-                curline = lineno
-                curline_start = line_start
-                for (tid, reg) in self.token_specification:
-                    mo = reg.match(self.code, loc)
-                    if mo:
-                        value = mo.group()
-                        loc = mo.end()
-                        break
-                else:
-                    # lex single characters and raise an exception for invalid tokens
-                    value = self.code[loc]
-                    tid = self.single_char_tokens[value]
-                    loc += 1
-
-                    if tid == 'lparen':
-                        par_count += 1
-                    elif tid == 'rparen':
-                        par_count -= 1
-                    elif tid == 'lbracket':
-                        bracket_count += 1
-                    elif tid == 'rbracket':
-                        bracket_count -= 1
-                    elif tid == 'lcurl':
-                        curl_count += 1
-                    elif tid == 'rcurl':
-                        curl_count -= 1
-                    elif tid == 'dblquote':
-                        raise ParseException('Double quotes are not supported. Use single quotes.', self.getline(line_start), lineno, col)
-                    elif tid == 'eol':
-                        lineno += 1
-                        line_start = loc
-                        if par_count > 0 or bracket_count > 0 or curl_count > 0:
-                            tid = 'whitespace'
-
-                if tid == 'id':
-                    if value in self.keywords:
-                        tid = value
-                    else:
-                        if value in self.future_keywords:
-                            mlog.warning(f"Identifier '{value}' will become a reserved keyword in a future release. Please rename it.",
-                                         location=BaseNode(lineno, col, filename))
-                elif tid in {'string', 'fstring'}:
-                    if value.find("\n") != -1:
-                        msg = ("Newline character in a string detected, use ''' (three single quotes) "
-                               "for multiline strings instead.\n"
-                               "This will become a hard error in a future Meson release.")
-                        mlog.warning(mlog.code_line(msg, self.getline(line_start), col), location=BaseNode(lineno, col, filename))
-                    value = value[2 if tid == 'fstring' else 1:-1]
-                elif tid in {'multiline_string', 'multiline_fstring'}:
-                    value = value[4 if tid == 'multiline_fstring' else 3:-3]
-                    lines = value.split('\n')
-                    if len(lines) > 1:
-                        lineno += len(lines) - 1
-                        line_start = loc - len(lines[-1]) - 3
-                elif tid == 'eol_cont':
-                    lineno += 1
-                    line_start = loc
+        while loc < code_len:
+            value: str
+            span_start = loc
+            col = loc - line_start
+            curline = lineno
+            curline_start = line_start
+            mo = match(code, loc)
+            if mo is None:
+                raise ParseException(f'lexer: unrecognized token {code[loc]!r}', self.getline(line_start), lineno, col)
+            tid = mo.lastgroup
+            value = mo.group()
+            loc = mo.end()
+
+            if tid == 'id':
+                if value in keywords:
+                    tid = value
+                elif value in self.future_keywords:
+                    mlog.warning(f"Identifier '{value}' will become a reserved keyword in a future release. Please rename it.",
+                                 location=BaseNode(lineno, col, filename))
+            elif tid == 'whitespace' or tid == 'comment':
+                if not keep_whitespace:
+                    continue
+            elif tid == 'eol':
+                lineno += 1
+                line_start = loc
+                if par_count > 0 or bracket_count > 0 or curl_count > 0:
+                    if not keep_whitespace:
+                        continue
                     tid = 'whitespace'
-                bytespan = (span_start, loc)
-                yield Token(tid, filename, curline_start, curline, col, bytespan, value)
-
-        except KeyError:
-            raise ParseException(f'lexer: unrecognized token {self.code[loc]!r}', self.getline(line_start), lineno, loc - line_start)
+            elif tid == 'string' or tid == 'fstring':
+                if '\n' in value:
+                    msg = ("Newline character in a string detected, use ''' (three single quotes) "
+                           "for multiline strings instead.\n"
+                           "This will become a hard error in a future Meson release.")
+                    mlog.warning(mlog.code_line(msg, self.getline(line_start), col), location=BaseNode(lineno, col, filename))
+                value = value[2 if tid == 'fstring' else 1:-1]
+            elif tid == 'lparen':
+                par_count += 1
+            elif tid == 'rparen':
+                par_count -= 1
+            elif tid == 'lbracket':
+                bracket_count += 1
+            elif tid == 'rbracket':
+                bracket_count -= 1
+            elif tid == 'lcurl':
+                curl_count += 1
+            elif tid == 'rcurl':
+                curl_count -= 1
+            elif tid == 'multiline_string' or tid == 'multiline_fstring':
+                value = value[4 if tid == 'multiline_fstring' else 3:-3]
+                lines = value.split('\n')
+                if len(lines) > 1:
+                    lineno += len(lines) - 1
+                    line_start = loc - len(lines[-1]) - 3
+            elif tid == 'eol_cont':
+                lineno += 1
+                line_start = loc
+                if not keep_whitespace:
+                    continue
+                tid = 'whitespace'
+            elif tid == 'dblquote':
+                raise ParseException('Double quotes are not supported. Use single quotes.', self.getline(line_start), lineno, col)
+            yield Token(tid, filename, curline_start, curline, col, (span_start, loc), value)
 
 @dataclass
 class BaseNode:
@@ -717,9 +726,9 @@ MULDIV_MAP: T.Mapping[str, ARITH_OPERATORS] = {
 # 10 plain token
 
 class Parser:
-    def __init__(self, code: str, filename: str):
+    def __init__(self, code: str, filename: str, keep_whitespace: bool = True):
         self.lexer = Lexer(code)
-        self.stream = self.lexer.lex(filename)
+        self.stream = self.lexer.lex(filename, keep_whitespace)
         self.current: Token = Token('eof', '', 0, 0, 0, (0, 0), None)
         self.previous = self.current
         self.current_ws: T.List[Token] = []
@@ -850,12 +859,8 @@ class Parser:
             if self.accept('in'):
                 in_token = self.previous
                 self.current_ws = self.current_ws[len(ws):]  # remove whitespaces between not and in
-                temp_node = EmptyNode(in_token.lineno, in_token.colno, in_token.filename)
-                for w in ws:
-                    temp_node.append_whitespaces(w)
-
+                not_token.value = self.lexer.code[not_token.bytespan[0]:in_token.bytespan[1]]
                 not_token.bytespan = (not_token.bytespan[0], in_token.bytespan[1])
-                not_token.value += temp_node.whitespaces.value + in_token.value
                 operator = self.create_node(SymbolNode, not_token)
                 return self.create_node(ComparisonNode, 'not in', left, operator, self.e5())
         return left
@@ -1126,3 +1131,44 @@ class Parser:
         self.current_ws = []
 
         return block
+
+
+def parse_cached(code: str, filename: str, cachedir: str, keep_whitespace: bool = True) -> CodeBlockNode:
+    """Parse code, reusing the AST stored in cachedir by a previous run.
+
+    There is one cache entry per file, holding the Meson version and the hash
+    of the code it was parsed from, so a stale entry is replaced rather than
+    accumulated. Files that produce warnings while being parsed are not
+    cached, so the warnings are printed every time.
+    """
+    from .coredata import version
+
+    in_unit_test = 'MESON_RUNNING_IN_PROJECT_TESTS' in os.environ
+    name = hashlib.sha256(repr((filename, keep_whitespace, in_unit_test)).encode('utf-8')).hexdigest()
+    cachefile = os.path.join(cachedir, name + '.dat')
+    header = (version, hashlib.sha256(code.encode('utf-8')).hexdigest())
+    try:
+        with open(cachefile, 'rb') as f:
+            if pickle.load(f) == header:
+                ast = pickle.load(f)
+                if isinstance(ast, CodeBlockNode):
+                    return ast
+    except FileNotFoundError:
+        pass
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError, ImportError) as e:
+        mlog.debug(f'Failed to load cached AST of {filename}: {e!s}')
+
+    warnings = mlog.get_warning_count()
+    ast = Parser(code, filename, keep_whitespace).parse()
+    if mlog.get_warning_count() != warnings:
+        return ast
+
+    try:
+        data = pickle.dumps(header) + pickle.dumps(ast)
+        os.makedirs(cachedir, exist_ok=True)
+        with tempfile.NamedTemporaryFile('wb', dir=cachedir, prefix='.', delete=False) as f:
+            f.write(data)
+        os.replace(f.name, cachefile)
+    except (OSError, RecursionError, pickle.PicklingError) as e:
+        mlog.debug(f'Failed to cache AST of {filename}: {e!s}')
+    return ast
@@ -4,12 +4,13 @@
 
 from __future__ import annotations
 
-import argparse, datetime, glob, json, os, platform, shutil, sys, tempfile, time
+import argparse, datetime, glob, json, os, pickle, platform, shutil, sys, tempfile, time
 import cProfile as profile
 from pathlib import Path
 import typing as T
 
 from . import build, cmdline, coredata, environment, interpreter, mesonlib, mintro, mlog
+from .backend.backends import RegenInfo
 from .dependencies import Dependency
 from .mesonlib import MesonException
 from .interpreterbase import ObjectHolder
@@ -27,6 +28,7 @@ if T.TYPE_CHECKING:
         reconfigure: bool
         wipe: bool
         clearcache: bool
+        regenerate: bool
         builddir: str
         sourcedir: str
         pager: bool
@@ -69,6 +71,7 @@ def add_arguments(parser: argparse.ArgumentParser) -> None:
                              'newer version of meson.')
     parser.add_argument('--clearcache', action='store_true', default=False,
                         help='Clear cached state (e.g. found dependencies). Since 1.3.0.')
+    parser.add_argument('--regenerate', action='store_true', help=argparse.SUPPRESS)
     parser.add_argument('builddir', nargs='?', default=None)
     parser.add_argument('sourcedir', nargs='?', default=None)
 
@@ -179,8 +182,36 @@ class MesonApp:
             raise MesonException(f'Directory is not empty and does not contain a previous build:\n{build_dir}')
         return src_dir, build_dir
 
+    def regeneration_needed(self) -> bool:
+        '''Check whether the build files need to be regenerated when the
+        backend asks for it because build definition files are newer than
+        build.ninja.'''
+        build_ninja = os.path.join(self.build_dir, 'build.ninja')
+        try:
+            with open(os.path.join(self.build_dir, environment.Environment.private_dir, 'regeninfo.dump'), 'rb') as f:
+                regeninfo = pickle.load(f)
+            stamp = os.stat(build_ninja).st_mtime
+            if not isinstance(regeninfo, RegenInfo):
+                return True
+            # Nothing is newer when the user explicitly asked to reconfigure
+            if not any(os.stat(os.path.join(self.build_dir, f)).st_mtime > stamp for f in regeninfo.depfiles):
+                return True
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError, ImportError):
+            return True
+        changed = regeninfo.changed_files()
+        if changed is None:
+            return True
+        if changed:
+            mlog.log('Regenerating because build files changed:', ', '.join(changed))
+            return True
+        mlog.log('Build definition files are unchanged, regeneration is not needed.')
+        os.utime(build_ninja)
+        return False
+
     # See class Backend's 'generate' for comments on capture args and returned dictionary.
     def generate(self, capture: bool = False, vslite_ctx: T.Optional[dict] = None) -> T.Optional[dict]:
+        if self.options.regenerate and not self.regeneration_needed():
+            return None
         env = environment.Environment(self.source_dir, self.build_dir, self.options)
         if not env.first_invocation:
             assert self.options.reconfigure
@@ -13,6 +13,7 @@ import argparse
 import asyncio
 import datetime
 import enum
+import heapq
 import json
 import os
 import pickle
@@ -20,6 +21,7 @@ import platform
 import random
 import re
 import signal
+import tempfile
 import subprocess
 import shlex
 import sys
@@ -171,8 +173,23 @@ def add_arguments(parser: argparse.ArgumentParser) -> None:
                         help='Arguments to pass to the specified test(s) or all tests')
     parser.add_argument('--max-lines', default=100, dest='max_lines', type=int,
                         help='Maximum number of lines to show from a long test log. Since 1.5.0.')
+    parser.add_argument('--spool-output', default=False, action='store_true',
+                        help='Write the output of the tests to temporary files instead of keeping it '
+                        'in memory, except for the first and last --max-lines lines. Since 1.11.0.')
     parser.add_argument('--slice', default=None, type=test_slice, metavar='SLICE/NUM_SLICES',
                         help='Split tests into NUM_SLICES slices and execute slice SLICE. Since 1.8.0.')
+    parser.add_argument('--slice-durations', default=None, metavar='FILE',
+                        help='Balance the slices using the test durations in FILE, a JSON test log of '
+                        'a previous run. Since 1.11.0.')
+    parser.add_argument('--slice-plan', default=None, type=int, metavar='NUM_SLICES',
+                        help='Print in JSON format how the tests would be split into NUM_SLICES slices. '
+                        'Since 1.11.0.')
+    parser.add_argument('--merge-logs', default=None, nargs='+', metavar='LOG',
+                        help='Merge the JSON and JUnit test logs of several runs, such as the slices of a '
+                        'test run, into the log files of this build directory. Since 1.11.0.')
+    parser.add_argument('--overlap-rebuild', default=False, action='store_true',
+                        help='Start each test as soon as its dependencies are rebuilt, while the '
+                        'dependencies of the other tests are still being built. Since 1.11.0.')
     parser.add_argument('args', nargs='*',
                         help='Optional list of test names to run. "testname" to run all tests with that name, '
                         '"subprojname:testname" to specifically run "testname" from "subprojname", '
@@ -771,10 +788,16 @@ class TextLogfileBuilder(TestFileLogger):
         if result.stdo:
             name = 'stdout' if harness.options.split else 'output'
             self.file.write(dashes(name, '-', 78) + '\n')
-            self.file.write(result.stdo)
+            if result.stdo_spool:
+                result.stdo_spool.copy_to(self.file)
+            else:
+                self.file.write(result.stdo)
         if result.stde:
             self.file.write(dashes('stderr', '-', 78) + '\n')
-            self.file.write(result.stde)
+            if result.stde_spool:
+                result.stde_spool.copy_to(self.file)
+            else:
+                self.file.write(result.stde)
         self.file.write(dashes('', '=', 78) + '\n\n')
 
     async def finish(self, harness: 'TestHarness') -> None:
@@ -802,7 +825,23 @@ class JsonLogfileBuilder(TestFileLogger):
         }
         if result.stde:
             jresult['stderr'] = result.stde
-        self.file.write(json.dumps(jresult) + '\n')
+        if not result.stdo_spool and not result.stde_spool:
+            self.file.write(json.dumps(jresult) + '\n')
+            return
+
+        # Copy the whole output from the spools, escaping it one chunk at a time
+        spools = {'stdout': result.stdo_spool, 'stderr': result.stde_spool}
+        for key, spool in spools.items():
+            if spool:
+                jresult.pop(key, None)
+        self.file.write(json.dumps(jresult)[:-1])
+        for key, spool in spools.items():
+            if spool and (key == 'stdout' or spool.size):
+                self.file.write(f', "{key}": "')
+                for chunk in spool.chunks():
+                    self.file.write(json.dumps(chunk)[1:-1])
+                self.file.write('"')
+        self.file.write('}\n')
 
 
 class JunitBuilder(TestLogger):
@@ -974,6 +1013,8 @@ class TestRun:
         self.duration: T.Optional[float] = None
         self.stdo = ''
         self.stde = ''
+        self.stdo_spool: T.Optional[OutputSpool] = None
+        self.stde_spool: T.Optional[OutputSpool] = None
         self.additional_error = ''
         self.cmd: T.Optional[T.List[str]] = None
         self.env = test_env
@@ -1040,11 +1081,27 @@ class TestRun:
         if self.should_fail and self.res in (TestResult.OK, TestResult.FAIL):
             self.res = TestResult.UNEXPECTEDPASS if self.res is TestResult.OK else TestResult.EXPECTEDFAIL
         if self.stdo and not self.stdo.endswith('\n'):
-            self.stdo += '\n'
+            self.add_stdout('\n')
         if self.stde and not self.stde.endswith('\n'):
-            self.stde += '\n'
+            self.add_stderr('\n')
         self.duration = time.time() - self.starttime
 
+    def add_stdout(self, text: str) -> None:
+        self.stdo += text
+        if self.stdo_spool:
+            self.stdo_spool.write(text)
+
+    def add_stderr(self, text: str) -> None:
+        self.stde += text
+        if self.stde_spool:
+            self.stde_spool.write(text)
+
+    def close_spools(self) -> None:
+        for spool in [self.stdo_spool, self.stde_spool]:
+            if spool:
+                spool.close()
+        self.stdo_spool = self.stde_spool = None
+
     @property
     def cmdline(self) -> T.Optional[str]:
         if not self.cmd:
@@ -1135,8 +1192,7 @@ class TestRunTAP(TestRun):
     def complete(self) -> None:
         if self.returncode != 0 and not self.res.was_killed():
             self.res = TestResult.ERROR
-            self.stde = self.stde or ''
-            self.stde += f'\n(test program exited with status code {self.returncode})'
+            self.add_stderr(f'\n(test program exited with status code {self.returncode})')
         super().complete()
 
     async def parse(self, harness: 'TestHarness', lines: T.AsyncIterator[str]) -> None:
@@ -1246,10 +1302,57 @@ def decode(stream: T.Union[None, bytes]) -> str:
     except UnicodeDecodeError:
         return stream.decode('iso-8859-1', errors='ignore')
 
+class OutputSpool:
+    '''Output of a test, written to a temporary file as it is read. Only the
+    first and last @window lines are kept in memory, for the console.'''
+
+    def __init__(self, window: int) -> None:
+        self.file = tempfile.TemporaryFile('w+', encoding='utf-8', newline='')
+        self.head: T.List[str] = []
+        self.tail: T.Deque[str] = deque(maxlen=window)
+        self.window = window
+        self.omitted = 0
+        self.size = 0
+
+    def write(self, line: str) -> None:
+        self.file.write(line)
+        self.size += len(line)
+        if len(self.head) < self.window:
+            self.head.append(line)
+        else:
+            if len(self.tail) == self.window:
+                self.omitted += 1
+            self.tail.append(line)
+
+    def getvalue(self) -> str:
+        if not self.omitted:
+            return ''.join(self.head + list(self.tail))
+        return ''.join(self.head) + f'[... {self.omitted} lines omitted ...]\n' + ''.join(self.tail)
+
+    def chunks(self) -> T.Iterator[str]:
+        self.file.seek(0)
+        while True:
+            chunk = self.file.read(65536)
+            if not chunk:
+                break
+            yield chunk
+
+    def copy_to(self, f: T.TextIO) -> None:
+        for chunk in self.chunks():
+            f.write(chunk)
+
+    def close(self) -> None:
+        self.file.close()
+
 async def read_decode(reader: asyncio.StreamReader,
                       queue: T.Optional['asyncio.Queue[T.Optional[str]]'],
-                      console_mode: ConsoleUser) -> str:
-    stdo_lines = []
+                      console_mode: ConsoleUser,
+                      spool: T.Optional[OutputSpool] = None) -> str:
+    stdo_lines: T.List[str] = []
+
+    def getvalue() -> str:
+        return spool.getvalue() if spool else ''.join(stdo_lines)
+
     try:
         while not reader.at_eof():
             # Prefer splitting by line, as that produces nicer output
@@ -1261,14 +1364,17 @@ async def read_decode(reader: asyncio.StreamReader,
                 line_bytes = await reader.readexactly(e.consumed)
             if line_bytes:
                 line = decode(line_bytes).replace('\r\n', '\n')
-                stdo_lines.append(line)
+                if spool:
+                    spool.write(line)
+                else:
+                    stdo_lines.append(line)
                 if console_mode is ConsoleUser.STDOUT:
                     print(line, end='', flush=True)
                 if queue:
                     await queue.put(line)
-        return ''.join(stdo_lines)
+        return getvalue()
     except asyncio.CancelledError:
-        return ''.join(stdo_lines)
+        return getvalue()
     finally:
         if queue:
             await queue.put(None)
@@ -1351,8 +1457,8 @@ class TestSubprocess:
         self.all_futures: T.List[asyncio.Future] = []
         self.queue: T.Optional[asyncio.Queue[T.Optional[str]]] = None
 
-    def stdout_lines(self) -> T.AsyncIterator[str]:
-        self.queue = asyncio.Queue()
+    def stdout_lines(self, maxsize: int = 0) -> T.AsyncIterator[str]:
+        self.queue = asyncio.Queue(maxsize)
         return queue_iter(self.queue)
 
     def communicate(self,
@@ -1362,12 +1468,12 @@ class TestSubprocess:
         async def collect_stdo(test: 'TestRun',
                                reader: asyncio.StreamReader,
                                console_mode: ConsoleUser) -> None:
-            test.stdo = await read_decode(reader, self.queue, console_mode)
+            test.stdo = await read_decode(reader, self.queue, console_mode, test.stdo_spool)
 
         async def collect_stde(test: 'TestRun',
                                reader: asyncio.StreamReader,
                                console_mode: ConsoleUser) -> None:
-            test.stde = await read_decode(reader, None, console_mode)
+            test.stde = await read_decode(reader, None, console_mode, test.stde_spool)
 
         # asyncio.ensure_future ensures that printing can
         # run in the background, even before it is awaited
@@ -1634,8 +1740,17 @@ class SingleTestRunner:
                                        env=self.runobj.env,
                                        cwd=self.test.workdir)
 
+        if self.options.spool_output and self.console_mode is not ConsoleUser.INTERACTIVE:
+            window = max(self.options.max_lines, 1)
+            self.runobj.stdo_spool = OutputSpool(window)
+            if stderr == asyncio.subprocess.PIPE:
+                self.runobj.stde_spool = OutputSpool(window)
+
         if self.runobj.needs_parsing and self.console_mode is not ConsoleUser.INTERACTIVE:
-            parse_coro = self.runobj.parse(harness, p.stdout_lines())
+            # When spooling, do not let the lines pile up if the parser
+            # cannot keep up with the test
+            maxsize = 1024 if self.options.spool_output else 0
+            parse_coro = self.runobj.parse(harness, p.stdout_lines(maxsize))
             parse_task = asyncio.ensure_future(parse_coro)
         else:
             parse_task = None
@@ -1653,10 +1768,90 @@ class SingleTestRunner:
         self.runobj.complete()
 
 
+class TestDependencyBuilder:
+    '''Rebuilds the dependencies of the tests in batches, in the order in which
+    the tests are started, so that the first tests can run while the
+    dependencies of the next ones are being built.
+
+    Ninja cannot run twice at the same time in the same build directory, so
+    the batches are built one after the other. The first batch has enough
+    tests to keep all the test processes busy and each batch is twice as large
+    as the previous one, to limit the overhead of starting ninja.
+    '''
+
+    def __init__(self, ninja: T.List[str], wd: str, tests: T.List[TestSerialisation], first_batch: int):
+        self.ninja = ninja
+        self.wd = wd
+        self.failed = False
+        intro_targets = load_intro_targets(wd)
+
+        self.batches: T.List[T.List[str]] = []
+        self.test_batch: T.Dict[int, int] = {}
+        built: T.Set[str] = set()
+        batch_size = max(first_batch, 1)
+        pending: T.List[TestSerialisation] = []
+        for i, test in enumerate(tests):
+            if id(test) not in self.test_batch:
+                self.test_batch[id(test)] = len(self.batches)
+                pending.append(test)
+            if len(pending) == batch_size or i == len(tests) - 1:
+                targets: T.Set[str] = set()
+                for t in pending:
+                    for d in t.depends:
+                        targets.update(intro_targets[d])
+                self.batches.append(sorted(targets - built))
+                built.update(targets)
+                pending = []
+                batch_size *= 2
+        self.done = [asyncio.Event() for _ in self.batches]
+
+    async def wait_for(self, test: TestSerialisation) -> bool:
+        '''Waits until the dependencies of @test are built, returns False if
+        they could not be.'''
+        await self.done[self.test_batch[id(test)]].wait()
+        return not self.failed
+
+    async def run(self) -> None:
+        try:
+            for i, targets in enumerate(self.batches):
+                if targets and not await self.build(targets):
+                    self.failed = True
+                    print(f'Could not rebuild {self.wd}')
+                    break
+                self.done[i].set()
+        finally:
+            # Tests that were not built cannot run
+            self.failed = self.failed or not all(e.is_set() for e in self.done)
+            for e in self.done:
+                e.set()
+
+    async def build(self, targets: T.List[str]) -> bool:
+        # The output of ninja would be mixed with the progress report of the
+        # tests, so it is only shown when the build fails.
+        p = await asyncio.create_subprocess_exec(*self.ninja, '-C', self.wd, *targets,
+                                                 stdin=subprocess.DEVNULL,
+                                                 stdout=asyncio.subprocess.PIPE,
+                                                 stderr=asyncio.subprocess.STDOUT)
+        try:
+            stdo, _ = await p.communicate()
+        finally:
+            if p.returncode is None:
+                p.kill()
+                await p.wait()
+        if p.returncode != 0:
+            print_safe(decode(stdo))
+            return False
+        return True
+
+
 class TestHarness:
     def __init__(self, options: argparse.Namespace):
         self.options = options
         self.collected_failures: T.List[TestRun] = []
+        # Wall-clock durations of the tests in the previous runs, used to
+        # start the longest tests first
+        self.durations: T.Dict[str, float] = {}
+        self.rebuild_failed = False
         self.fail_count = 0
         self.expectedfail_count = 0
         self.unexpectedpass_count = 0
@@ -1821,8 +2016,11 @@ class TestHarness:
 
         if result.res.is_bad():
             self.collected_failures.append(result)
+        if result.duration is not None and result.res is not TestResult.INTERRUPT:
+            self.durations[result.name] = result.duration
         for l in self.loggers:
             l.log(self, result)
+        result.close_spools()
 
     @property
     def numlen(self) -> int:
@@ -1899,7 +2097,7 @@ class TestHarness:
         rebuild_only_tests = tests if tests != self.tests else []
         if not tests:
             return 0
-        if not self.options.no_rebuild and not rebuild_deps(self.ninja, self.options.wd, rebuild_only_tests, self.options.benchmark):
+        if not self.options.no_rebuild and not self.options.overlap_rebuild and not rebuild_deps(self.ninja, self.options.wd, rebuild_only_tests, self.options.benchmark):
             # We return 125 here in case the build failed.
             # The reason is that exit code 125 tells `git bisect run` that the current
             # commit should be skipped.  Thus users can directly use `meson test` to
@@ -1913,9 +2111,10 @@ class TestHarness:
         startdir = os.getcwd()
         try:
             os.chdir(self.options.wd)
+            self.load_durations()
             runners: T.List[SingleTestRunner] = []
             for i in range(self.options.repeat):
-                runners.extend(self.get_test_runner(test, i) for test in tests)
+                runners.extend(self.order_runners([self.get_test_runner(test, i) for test in tests]))
                 if i == 0:
                     self.duration_max_len = max(len(str(int(runner.timeout or 99)))
                                                 for runner in runners)
@@ -1925,10 +2124,60 @@ class TestHarness:
 
             self.test_count = len(runners)
             self.run_tests(runners)
+            self.save_durations()
         finally:
             os.chdir(startdir)
+        if self.rebuild_failed:
+            # Same as when the build fails before running the tests
+            sys.exit(125)
         return 1 if self.total_failure_count() > 0 else 0
 
+    def get_durations_file(self) -> T.Optional[str]:
+        # Benchmarks are always run one at a time
+        if self.options.benchmark:
+            return None
+        return os.path.join('meson-private', 'test-durations.json')
+
+    def load_durations(self) -> None:
+        fname = self.get_durations_file()
+        if fname is None:
+            return
+        try:
+            with open(fname, encoding='utf-8') as f:
+                durations = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(durations, dict):
+            self.durations = durations
+
+    def save_durations(self) -> None:
+        fname = self.get_durations_file()
+        if fname is None or not self.durations:
+            return
+        with open(fname, 'w', encoding='utf-8') as f:
+            json.dump(self.durations, f)
+
+    def order_runners(self, runners: T.List[SingleTestRunner]) -> T.List[SingleTestRunner]:
+        '''Returns the order in which the tests are started.
+
+        Tests with a higher priority are always started first. The order of
+        tests with the same priority is not specified, so when running tests
+        in parallel, the ones that took the longest in the previous runs are
+        started first so that the run does not end waiting for one long test.
+        Tests that cannot run in parallel are started last, so that they do
+        not stop the other tests in the middle of the run.
+        '''
+        if self.options.num_processes <= 1:
+            return runners
+        known = [self.durations[r.visible_name] for r in runners if r.visible_name in self.durations]
+        # Tests that never ran get the average duration
+        default = sum(known) / len(known) if known else 0.0
+
+        def key(runner: SingleTestRunner) -> T.Tuple[int, bool, float]:
+            return (-runner.test.priority, not runner.is_parallel,
+                    -self.durations.get(runner.visible_name, default))
+        return sorted(runners, key=key)
+
     @staticmethod
     def split_suite_string(suite: str) -> T.Tuple[str, str]:
         if ':' in suite:
@@ -2032,7 +2281,7 @@ class TestHarness:
                     # succeed on an invalid pattern.
                     raise MesonException(f'{arg} test name does not match any test')
 
-    def get_tests(self, errorfile: T.Optional[T.IO] = None) -> T.List[TestSerialisation]:
+    def get_tests(self, errorfile: T.Optional[T.IO] = None, apply_slice: bool = True) -> T.List[TestSerialisation]:
         if not self.tests:
             print('No tests defined.', file=errorfile)
             return []
@@ -2040,11 +2289,9 @@ class TestHarness:
         tests = [t for t in self.tests if self.test_suitable(t)]
         if self.options.args:
             tests = list(self.tests_from_args(tests))
-        if self.options.slice:
+        if self.options.slice and apply_slice:
             our_slice, nslices = self.options.slice
-            if nslices > len(tests):
-                raise MesonException(f'number of slices ({nslices}) exceeds number of tests ({len(tests)})')
-            tests = tests[our_slice - 1::nslices]
+            tests = self.get_slices(tests, nslices)[our_slice - 1]
 
         if not tests:
             print('No suitable tests defined.', file=errorfile)
@@ -2052,6 +2299,35 @@ class TestHarness:
 
         return tests
 
+    def get_slices(self, tests: T.List[TestSerialisation], nslices: int) -> T.List[T.List[TestSerialisation]]:
+        '''Splits @tests into @nslices slices.
+
+        Without --slice-durations, tests are assigned to the slices in turn.
+        With it, each test is assigned, longest first, to the slice with the
+        least total duration so far, so that all slices take about the same
+        time. Either way the result only depends on the list of tests and on
+        the durations, so that all the slices of a run agree on it.
+        '''
+        if nslices > len(tests):
+            raise MesonException(f'number of slices ({nslices}) exceeds number of tests ({len(tests)})')
+        if not self.options.slice_durations:
+            return [tests[i::nslices] for i in range(nslices)]
+
+        durations = load_test_durations(self.options.slice_durations)
+        names = [self.get_pretty_suite(t) for t in tests]
+        known = [durations[n] for n in names if n in durations]
+        # Tests that never ran get the average duration
+        default = sum(known) / len(known) if known else 1.0
+        weights = [durations.get(n, default) for n in names]
+
+        heap = [(0.0, i) for i in range(nslices)]
+        slices: T.List[T.List[int]] = [[] for _ in range(nslices)]
+        for i in sorted(range(len(tests)), key=lambda i: (-weights[i], i)):
+            total, s = heapq.heappop(heap)
+            slices[s].append(i)
+            heapq.heappush(heap, (total + weights[i], s))
+        return [[tests[i] for i in sorted(s)] for s in slices]
+
     def flush_logfiles(self) -> None:
         for l in self.loggers:
             l.flush()
@@ -2119,8 +2395,21 @@ class TestHarness:
         interrupted = False
         ctrlc_times: T.Deque[float] = deque(maxlen=MAX_CTRLC)
         loop = asyncio.get_running_loop()
+        builder: T.Optional[TestDependencyBuilder] = None
+        if not self.options.no_rebuild and self.options.overlap_rebuild:
+            builder = TestDependencyBuilder(self.ninja, self.options.wd, [r.test for r in runners],
+                                            self.options.num_processes)
 
         async def run_test(test: SingleTestRunner) -> None:
+            if builder is not None and not await builder.wait_for(test.test):
+                self.rebuild_failed = True
+                if interrupted:
+                    return
+                test.runobj.add_stdout('Not run because its dependencies could not be built.')
+                self.log_start_test(test.runobj)
+                test.runobj.complete_skip()
+                self.process_test_result(test.runobj)
+                return
             async with semaphore:
                 if interrupted or (self.options.repeat > 1 and self.fail_count):
                     return
@@ -2188,6 +2477,7 @@ class TestHarness:
             else:
                 loop.add_signal_handler(signal.SIGINT, sigterm_handler)
             loop.add_signal_handler(signal.SIGTERM, sigterm_handler)
+        build_task = asyncio.ensure_future(builder.run()) if builder is not None else None
         try:
             for runner in runners:
                 if not runner.is_parallel:
@@ -2203,6 +2493,9 @@ class TestHarness:
 
             await complete_all(futures)
         finally:
+            if build_task is not None:
+                build_task.cancel()
+                await complete(build_task)
             if sys.platform != 'win32':
                 loop.remove_signal_handler(signal.SIGINT)
                 loop.remove_signal_handler(signal.SIGTERM)
@@ -2215,27 +2508,115 @@ def list_tests(th: TestHarness) -> bool:
         print(th.get_pretty_suite(t))
     return not tests
 
-def rebuild_deps(ninja: T.List[str], wd: str, tests: T.List[TestSerialisation], benchmark: bool) -> bool:
+def load_intro_targets(wd: str) -> T.Dict[str, T.List[str]]:
+    '''Returns the ninja targets of the outputs of each target, by ID.'''
     def convert_path_to_target(path: str) -> str:
         path = os.path.relpath(path, wd)
         if os.sep != '/':
             path = path.replace(os.sep, '/')
         return path
 
+    targets_file = os.path.join(wd, 'meson-info/intro-targets.json')
+    with open(targets_file, encoding='utf-8') as fp:
+        targets_info = json.load(fp)
+
+    intro_targets: T.Dict[str, T.List[str]] = {}
+    for target in targets_info:
+        intro_targets[target['id']] = [
+            convert_path_to_target(f)
+            for f in target['filename']]
+    return intro_targets
+
+def print_slice_plan(th: TestHarness) -> int:
+    tests = th.get_tests(errorfile=sys.stderr, apply_slice=False)
+    if not tests:
+        return 1
+    durations = load_test_durations(th.options.slice_durations) if th.options.slice_durations else {}
+    plan = []
+    for i, slice_tests in enumerate(th.get_slices(tests, th.options.slice_plan), 1):
+        names = [th.get_pretty_suite(t) for t in slice_tests]
+        plan.append({
+            'slice': f'{i}/{th.options.slice_plan}',
+            'tests': names,
+            'duration': sum(durations.get(n, 0.0) for n in names),
+        })
+    print(json.dumps(plan, indent=2))
+    return 0
+
+def load_test_durations(fname: str) -> T.Dict[str, float]:
+    '''Loads the duration of each test from a JSON test log, which has one
+    JSON object per line, or from the durations recorded by `meson test` in
+    the private directory of a build directory.'''
+    try:
+        with open(fname, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        if len(lines) == 1:
+            data = json.loads(lines[0])
+            if isinstance(data, dict) and 'name' not in data:
+                return {k: float(v) for k, v in data.items()}
+        durations: T.Dict[str, float] = {}
+        for line in lines:
+            if line.strip():
+                result = json.loads(line)
+                if result.get('duration') is not None:
+                    durations[result['name']] = float(result['duration'])
+        return durations
+    except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+        raise TestException(f'Could not read test durations from {fname!r}: {e}')
+
+def merge_logs(fnames: T.List[str], logfile_base: str) -> int:
+    '''Merges the JSON and JUnit logs in @fnames, which can be told apart by
+    their extension, into the logs starting with @logfile_base. Returns 1 if
+    any of the tests failed, like `meson test`.'''
+    json_lines: T.List[str] = []
+    failed = False
+    root: T.Optional[et.Element] = None
+    suites: T.Dict[str, et.Element] = {}
+    for fname in fnames:
+        if fname.endswith('.xml'):
+            if root is None:
+                root = et.Element('testsuites', tests='0', errors='0', failures='0')
+            for suite in et.parse(fname).getroot().findall('testsuite'):
+                name = suite.get('name', '')
+                if name not in suites:
+                    suites[name] = suite
+                    root.append(suite)
+                    continue
+                # Tests of the same project that ran in different slices
+                merged = suites[name]
+                for attr in ['tests', 'errors', 'failures', 'skipped']:
+                    merged.set(attr, str(int(merged.get(attr, '0')) + int(suite.get(attr, '0'))))
+                merged.set('time', str(float(merged.get('time', '0')) + float(suite.get('time', '0'))))
+                merged.extend(suite)
+        else:
+            with open(fname, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        failed = failed or json.loads(line).get('is_fail', False)
+                        json_lines.append(line.rstrip('\n') + '\n')
+
+    os.makedirs(os.path.dirname(logfile_base), exist_ok=True)
+    if json_lines:
+        with open(logfile_base + '.json', 'w', encoding='utf-8') as f:
+            f.writelines(json_lines)
+        print(f'Merged {len(json_lines)} test results into {logfile_base}.json')
+    if root is not None:
+        for suite in suites.values():
+            for attr in ['tests', 'errors', 'failures']:
+                root.set(attr, str(int(root.get(attr, '0')) + int(suite.get(attr, '0'))))
+            failed = failed or int(suite.get('errors', '0')) > 0 or int(suite.get('failures', '0')) > 0
+        with open(logfile_base + '.junit.xml', 'wb') as f:
+            et.ElementTree(root).write(f, encoding='utf-8', xml_declaration=True)
+        print(f'Merged {len(suites)} test suites into {logfile_base}.junit.xml')
+    return 1 if failed else 0
+
+def rebuild_deps(ninja: T.List[str], wd: str, tests: T.List[TestSerialisation], benchmark: bool) -> bool:
     assert len(ninja) > 0
 
     targets: T.Set[str] = set()
     if tests:
-        targets_file = os.path.join(wd, 'meson-info/intro-targets.json')
-        with open(targets_file, encoding='utf-8') as fp:
-            targets_info = json.load(fp)
-
         depends: T.Set[str] = set()
-        intro_targets: T.Dict[str, T.List[str]] = {}
-        for target in targets_info:
-            intro_targets[target['id']] = [
-                convert_path_to_target(f)
-                for f in target['filename']]
+        intro_targets = load_intro_targets(wd)
         for t in tests:
             for d in t.depends:
                 if d in depends:
@@ -2261,6 +2642,11 @@ def rebuild_deps(ninja: T.List[str], wd: str, tests: T.List[TestSerialisation],
     return True
 
 def run(options: argparse.Namespace) -> int:
+    if options.merge_logs:
+        # Does not need a build directory, logs are usually merged on another
+        # machine than the ones that ran the tests
+        return merge_logs(options.merge_logs, os.path.join(options.wd, 'meson-logs', options.logbase))
+
     if options.benchmark or options.interactive:
         options.num_processes = 1
 
@@ -2306,6 +2692,8 @@ def run(options: argparse.Namespace) -> int:
         try:
             if options.list:
                 return list_tests(th)
+            if options.slice_plan is not None:
+                return print_slice_plan(th)
             return th.doit()
         except TestException as e:
             print('Meson test encountered an error:\n')
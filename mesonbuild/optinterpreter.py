@@ -65,7 +65,8 @@ optname_regex = re.compile('[^a-zA-Z0-9_-]')
 
 
 class OptionInterpreter:
-    def __init__(self, optionstore: 'OptionStore', subproject: 'SubProject') -> None:
+    def __init__(self, optionstore: 'OptionStore', subproject: 'SubProject', ast_cache_dir: T.Optional[str] = None) -> None:
+        self.ast_cache_dir = ast_cache_dir
         self.options: options.MutableKeyedOptionDictType = {}
         self.subproject = subproject
         self.option_types: T.Dict[str, T.Callable[..., options.AnyOptionType]] = {
@@ -85,7 +86,10 @@ class OptionInterpreter:
         except UnicodeDecodeError as e:
             raise mesonlib.MesonException(f'Malformed option file {option_file!r} failed to parse as unicode: {e}')
         try:
-            ast = mparser.Parser(code, option_file).parse()
+            if self.ast_cache_dir is not None:
+                ast = mparser.parse_cached(code, option_file, self.ast_cache_dir, keep_whitespace=False)
+            else:
+                ast = mparser.Parser(code, option_file, keep_whitespace=False).parse()
         except mesonlib.MesonException as me:
             me.file = option_file
             raise me
@@ -8,9 +8,11 @@ from itertools import chain
 import argparse
 import copy
 import dataclasses
+import functools
 import itertools
 import os
 import pathlib
+import types
 
 import typing as T
 
@@ -44,6 +46,7 @@ if T.TYPE_CHECKING:
         'UserIntegerOption', 'UserStdOption', 'UserStringArrayOption',
         'UserStringOption', 'UserUmaskOption']
     ElementaryOptionValues: TypeAlias = T.Union[str, int, bool, T.List[str]]
+    OptionSnapshot: TypeAlias = T.Mapping['OptionKey', ElementaryOptionValues]
     MutableKeyedOptionDictType: TypeAlias = T.Dict['OptionKey', AnyOptionType]
 
     _OptionKeyTuple: TypeAlias = T.Tuple[T.Optional[str], MachineChoice, str]
@@ -94,6 +97,8 @@ _BUILTIN_NAMES = {
     'layout',
     'optimization',
     'prefer_static',
+    'script_worker',
+    'skip_noop_regen',
     'stdsplit',
     'strip',
     'unity',
@@ -731,6 +736,8 @@ BUILTIN_CORE_OPTIONS: T.Mapping[OptionKey, AnyOptionType] = {
         UserComboOption('namingscheme', 'How target file names are formed', 'classic', choices=['platform', 'classic']),
         UserComboOption('optimization', 'Optimization level', '0', choices=['plain', '0', 'g', '1', '2', '3', 's']),
         UserBooleanOption('prefer_static', 'Whether to try static linking before shared linking', False),
+        UserBooleanOption('script_worker', 'Run internal build scripts in a persistent worker process', False),
+        UserBooleanOption('skip_noop_regen', 'Skip regeneration when no build definition file changed content', False),
         UserBooleanOption('stdsplit', 'Split stdout and stderr in test logs', True),
         UserBooleanOption('strip', 'Strip targets on install', False),
         UserComboOption('unity', 'Unity build', 'off', choices=['on', 'off', 'subprojects']),
@@ -804,6 +811,25 @@ COMPILER_BASE_OPTIONS: T.Mapping[OptionKey, AnyOptionType] = {
     ])
 }
 
+_F = T.TypeVar('_F', bound=T.Callable[..., T.Any])
+
+
+def _clears_value_cache(func: _F) -> _F:
+    """Decorate OptionStore methods that can change the value of an option.
+
+    The cached values are dropped before the call, so that the method sees
+    the current state, and after it, even if it raised halfway through.
+    """
+    @functools.wraps(func)
+    def wrapper(self: OptionStore, *args: T.Any, **kwargs: T.Any) -> T.Any:
+        self.clear_value_cache()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self.clear_value_cache()
+    return T.cast('_F', wrapper)
+
+
 class OptionStore:
     DEFAULT_DEPENDENTS = {'plain': ('plain', False),
                           'debug': ('0', True),
@@ -828,6 +854,26 @@ class OptionStore:
         # Subproject options from toplevel project()
         self.pending_subproject_options: OptionDict = {}
 
+        # Resolved values, valid until the next method that changes an option
+        # (see _clears_value_cache). They are not pickled.
+        self.value_cache: T.Dict[OptionKey, T.Tuple[AnyOptionType, ElementaryOptionValues]] = {}
+        self.snapshots: T.Dict[str, OptionSnapshot] = {}
+
+    def __getstate__(self) -> T.Dict[str, T.Any]:
+        state = self.__dict__.copy()
+        del state['value_cache']
+        del state['snapshots']
+        return state
+
+    def __setstate__(self, state: T.Dict[str, T.Any]) -> None:
+        self.__dict__.update(state)
+        self.value_cache = {}
+        self.snapshots = {}
+
+    def clear_value_cache(self) -> None:
+        self.value_cache.clear()
+        self.snapshots.clear()
+
     def ensure_and_validate_key(self, key: T.Union[OptionKey, str]) -> OptionKey:
         if isinstance(key, str):
             return OptionKey(key)
@@ -873,6 +919,11 @@ class OptionStore:
 
     def get_option_and_value_for(self, key: OptionKey) -> T.Tuple[AnyOptionType, ElementaryOptionValues]:
         assert isinstance(key, OptionKey)
+        try:
+            return self.value_cache[key]
+        except KeyError:
+            pass
+        orig_key = key
         key = self.ensure_and_validate_key(key)
         option_object = self.resolve_option(key)
         computed_value = option_object.value
@@ -881,7 +932,9 @@ class OptionStore:
             computed_value = self.augments[key]
         elif option_object.yielding:
             computed_value = option_object.parent.value
-        return (option_object, computed_value)
+        result = (option_object, computed_value)
+        self.value_cache[orig_key] = result
+        return result
 
     def option_has_value(self, key: OptionKey, value: ElementaryOptionValues) -> bool:
         option_object, current_value = self.get_option_and_value_for(key)
@@ -896,12 +949,39 @@ class OptionStore:
         _, resolved_value = self.get_option_and_value_for(key)
         return resolved_value
 
+    def get_snapshot(self, subproject: str) -> OptionSnapshot:
+        """Return the resolved value of every option as seen by @subproject.
+
+        The result is an immutable mapping from keys for @subproject to
+        values, that callers may keep around as long as no option is set.
+        """
+        try:
+            return self.snapshots[subproject]
+        except KeyError:
+            pass
+        values: T.Dict[OptionKey, ElementaryOptionValues] = {}
+        for key in self.options:
+            if key.subproject is None:
+                key = key.evolve(subproject=subproject)
+            elif key.subproject != subproject:
+                continue
+            values[key] = self.get_option_and_value_for(key)[1]
+        snapshot = types.MappingProxyType(values)
+        self.snapshots[subproject] = snapshot
+        return snapshot
+
+    @_clears_value_cache
+    def set_augment(self, key: OptionKey, value: ElementaryOptionValues) -> None:
+        assert key.subproject is not None
+        self.augments[key] = value
+
     def add_system_option(self, key: T.Union[OptionKey, str], valobj: AnyOptionType) -> None:
         key = self.ensure_and_validate_key(key)
         if '.' in key.name:
             raise MesonException(f'Internal error: non-module option has a period in its name {key.name}.')
         self.add_system_option_internal(key, valobj)
 
+    @_clears_value_cache
     def add_system_option_internal(self, key: OptionKey, valobj: AnyOptionType) -> None:
         assert isinstance(valobj, UserOption)
         if not isinstance(valobj.name, str):
@@ -924,6 +1004,7 @@ class OptionStore:
             raise MesonException(f'Internal error: all compiler option names must start with language prefix. ({key.name} vs {language}_)')
         self.add_system_option(key, valobj)
 
+    @_clears_value_cache
     def add_project_option(self, key: T.Union[OptionKey, str], valobj: AnyOptionType) -> None:
         key = self.ensure_and_validate_key(key)
         assert key.subproject is not None
@@ -1026,6 +1107,7 @@ class OptionStore:
         # .as_posix() keeps the posix-like file separators Meson uses.
         return value.as_posix()
 
+    @_clears_value_cache
     def set_option(self, key: OptionKey, new_value: ElementaryOptionValues, first_invocation: bool = False) -> bool:
         changed = False
         error_key = key
@@ -1095,6 +1177,7 @@ class OptionStore:
 
         return changed
 
+    @_clears_value_cache
     def set_user_option(self, o: OptionKey, new_value: ElementaryOptionValues, first_invocation: bool = False) -> bool:
         if not self.is_cross and o.is_for_build():
             return False
@@ -1128,6 +1211,7 @@ class OptionStore:
         else:
             raise MesonException(f'Unknown option: "{o}".')
 
+    @_clears_value_cache
     def set_from_configure_command(self, D_args: T.Dict[OptionKey, T.Optional[str]]) -> bool:
         dirty = False
         for key, valstr in D_args.items():
@@ -1156,6 +1240,7 @@ class OptionStore:
                 opt.yielding = bool(opt.parent)
         return dirty
 
+    @_clears_value_cache
     def reset_prefixed_options(self, old_prefix: str, new_prefix: str) -> None:
         for optkey, prefix_mapping in BUILTIN_DIR_NOPREFIX_OPTIONS.items():
             valobj = self.options[optkey]
@@ -1175,6 +1260,7 @@ class OptionStore:
         key = self.ensure_and_validate_key(key)
         return self.options[key]
 
+    @_clears_value_cache
     def remove(self, key: OptionKey) -> None:
         del self.options[key]
         try:
@@ -1288,6 +1374,7 @@ class OptionStore:
             self.hard_reset_from_prefix(prefix)
         return (nopref_project_default_options, nopref_cmd_line_options, nopref_machine_file_options)
 
+    @_clears_value_cache
     def hard_reset_from_prefix(self, prefix: str) -> None:
         prefix = self.sanitize_prefix(prefix)
         for optkey, prefix_mapping in BUILTIN_DIR_NOPREFIX_OPTIONS.items():
@@ -1301,6 +1388,7 @@ class OptionStore:
             valobj.set_value(new_value)
         self.options[OptionKey('prefix')].set_value(prefix)
 
+    @_clears_value_cache
     def initialize_from_top_level_project_call(self,
                                                project_default_options_in: OptionDict,
                                                cmd_line_options_in: OptionDict,
@@ -1343,6 +1431,7 @@ class OptionStore:
             return True
         return self.is_base_option(key)
 
+    @_clears_value_cache
     def initialize_from_subproject_call(self,
                                         subproject: str,
                                         spcall_default_options: OptionDict,
@@ -1408,6 +1497,7 @@ class OptionStore:
 
         self.subprojects.add(subproject)
 
+    @_clears_value_cache
     def update_project_options(self, project_options: MutableKeyedOptionDictType, subproject: SubProject) -> None:
         for key, value in project_options.items():
             assert key.machine is MachineChoice.HOST
@@ -6,15 +6,20 @@ from __future__ import annotations
 
 import sys
 import os
+import io
+import mmap
 import stat
 import struct
 import shutil
 import subprocess
 import typing as T
+from functools import lru_cache
 
 from ..mesonlib import OrderedSet, generate_list, Popen_safe
 
 SHT_STRTAB = 3
+SHT_GNU_VERDEF = 0x6ffffffd
+SHT_GNU_VERSYM = 0x6fffffff
 DT_NEEDED = 1
 DT_RPATH = 15
 DT_RUNPATH = 29
@@ -22,6 +27,11 @@ DT_STRTAB = 5
 DT_SONAME = 14
 DT_MIPS_RLD_MAP_REL = 1879048245
 
+SHN_UNDEF = 0
+VERSYM_HIDDEN = 0x8000
+STB_NAMES = {1: 'GLOBAL', 2: 'WEAK', 10: 'UNIQUE'}
+STT_NAMES = {0: 'NOTYPE', 1: 'OBJECT', 2: 'FUNC', 5: 'COMMON', 6: 'TLS', 10: 'IFUNC'}
+
 # Global cache for tools
 INSTALL_NAME_TOOL = False
 
@@ -56,93 +66,60 @@ class DataSizes:
             self.Off = p + 'I'
             self.OffSize = 4
 
-class DynamicEntry(DataSizes):
-    def __init__(self, ifile: T.BinaryIO, ptrsize: int, is_le: bool) -> None:
-        super().__init__(ptrsize, is_le)
-        self.ptrsize = ptrsize
+class ElfStructs(T.NamedTuple):
+    header: struct.Struct
+    section: struct.Struct
+    dynamic: struct.Struct
+    dynsym: struct.Struct
+
+@lru_cache(maxsize=None)
+def get_structs(ptrsize: int, is_le: bool) -> ElfStructs:
+    p = '<' if is_le else '>'
+    if ptrsize == 64:
+        return ElfStructs(struct.Struct(p + '16sHHIQQQIHHHHHH'),
+                          struct.Struct(p + 'IIQQQQIIQQ'),
+                          struct.Struct(p + 'qQ'),
+                          struct.Struct(p + 'IBBhQQ'))
+    return ElfStructs(struct.Struct(p + '16sHHIIIIIHHHHHH'),
+                      struct.Struct(p + 'IIIIIIIIII'),
+                      struct.Struct(p + 'iI'),
+                      struct.Struct(p + 'IIIBBh'))
+
+class DynamicEntry:
+    def __init__(self, d_tag: int, val: int) -> None:
+        self.d_tag = d_tag
+        self.val = val
+
+class DynsymEntry:
+    def __init__(self, fields: T.Tuple[int, ...], ptrsize: int) -> None:
         if ptrsize == 64:
-            self.d_tag = struct.unpack(self.Sxword, ifile.read(self.SxwordSize))[0]
-            self.val = struct.unpack(self.XWord, ifile.read(self.XWordSize))[0]
+            (self.st_name, self.st_info, self.st_other, self.st_shndx,
+             self.st_value, self.st_size) = fields
         else:
-            self.d_tag = struct.unpack(self.Sword, ifile.read(self.SwordSize))[0]
-            self.val = struct.unpack(self.Word, ifile.read(self.WordSize))[0]
+            (self.st_name, self.st_value, self.st_size, self.st_info,
+             self.st_other, self.st_shndx) = fields
 
-    def write(self, ofile: T.BinaryIO) -> None:
-        if self.ptrsize == 64:
-            ofile.write(struct.pack(self.Sxword, self.d_tag))
-            ofile.write(struct.pack(self.XWord, self.val))
-        else:
-            ofile.write(struct.pack(self.Sword, self.d_tag))
-            ofile.write(struct.pack(self.Word, self.val))
-
-class DynsymEntry(DataSizes):
-    def __init__(self, ifile: T.BinaryIO, ptrsize: int, is_le: bool) -> None:
-        super().__init__(ptrsize, is_le)
-        is_64 = ptrsize == 64
-        self.st_name = struct.unpack(self.Word, ifile.read(self.WordSize))[0]
-        if is_64:
-            self.st_info = struct.unpack(self.Char, ifile.read(self.CharSize))[0]
-            self.st_other = struct.unpack(self.Char, ifile.read(self.CharSize))[0]
-            self.st_shndx = struct.unpack(self.Section, ifile.read(self.SectionSize))[0]
-            self.st_value = struct.unpack(self.Addr, ifile.read(self.AddrSize))[0]
-            self.st_size = struct.unpack(self.XWord, ifile.read(self.XWordSize))[0]
-        else:
-            self.st_value = struct.unpack(self.Addr, ifile.read(self.AddrSize))[0]
-            self.st_size = struct.unpack(self.Word, ifile.read(self.WordSize))[0]
-            self.st_info = struct.unpack(self.Char, ifile.read(self.CharSize))[0]
-            self.st_other = struct.unpack(self.Char, ifile.read(self.CharSize))[0]
-            self.st_shndx = struct.unpack(self.Section, ifile.read(self.SectionSize))[0]
-
-class SectionHeader(DataSizes):
-    def __init__(self, ifile: T.BinaryIO, ptrsize: int, is_le: bool) -> None:
-        super().__init__(ptrsize, is_le)
-        is_64 = ptrsize == 64
-
-# Elf64_Word
-        self.sh_name = struct.unpack(self.Word, ifile.read(self.WordSize))[0]
-# Elf64_Word
-        self.sh_type = struct.unpack(self.Word, ifile.read(self.WordSize))[0]
-# Elf64_Xword
-        if is_64:
-            self.sh_flags = struct.unpack(self.XWord, ifile.read(self.XWordSize))[0]
-        else:
-            self.sh_flags = struct.unpack(self.Word, ifile.read(self.WordSize))[0]
-# Elf64_Addr
-        self.sh_addr = struct.unpack(self.Addr, ifile.read(self.AddrSize))[0]
-# Elf64_Off
-        self.sh_offset = struct.unpack(self.Off, ifile.read(self.OffSize))[0]
-# Elf64_Xword
-        if is_64:
-            self.sh_size = struct.unpack(self.XWord, ifile.read(self.XWordSize))[0]
-        else:
-            self.sh_size = struct.unpack(self.Word, ifile.read(self.WordSize))[0]
-# Elf64_Word
-        self.sh_link = struct.unpack(self.Word, ifile.read(self.WordSize))[0]
-# Elf64_Word
-        self.sh_info = struct.unpack(self.Word, ifile.read(self.WordSize))[0]
-# Elf64_Xword
-        if is_64:
-            self.sh_addralign = struct.unpack(self.XWord, ifile.read(self.XWordSize))[0]
-        else:
-            self.sh_addralign = struct.unpack(self.Word, ifile.read(self.WordSize))[0]
-# Elf64_Xword
-        if is_64:
-            self.sh_entsize = struct.unpack(self.XWord, ifile.read(self.XWordSize))[0]
-        else:
-            self.sh_entsize = struct.unpack(self.Word, ifile.read(self.WordSize))[0]
+class SectionHeader:
+    def __init__(self, fields: T.Tuple[int, ...]) -> None:
+        (self.sh_name, self.sh_type, self.sh_flags, self.sh_addr,
+         self.sh_offset, self.sh_size, self.sh_link, self.sh_info,
+         self.sh_addralign, self.sh_entsize) = fields
 
 class Elf(DataSizes):
-    def __init__(self, bfile: str, verbose: bool = True) -> None:
+    def __init__(self, bfile: str, verbose: bool = True, readonly: bool = False) -> None:
         self.bfile = bfile
         self.verbose = verbose
+        self.readonly = readonly
         self.sections: T.List[SectionHeader] = []
         self.dynamic: T.List[DynamicEntry] = []
         self.dynsym: T.List[DynsymEntry] = []
         self.dynsym_strings: T.List[str] = []
+        self.sections_by_name: T.Optional[T.Dict[bytes, SectionHeader]] = None
         self.open_bf(bfile)
         try:
             (self.ptrsize, self.is_le) = self.detect_elf_type()
             super().__init__(self.ptrsize, self.is_le)
+            self.structs = get_structs(self.ptrsize, self.is_le)
             self.parse_header()
             self.parse_sections()
             self.parse_dynamic()
@@ -153,27 +130,43 @@ class Elf(DataSizes):
             raise
 
     def open_bf(self, bfile: str) -> None:
-        self.bf = None
+        # The file is mapped in memory, bf is the mapping seen as a file
+        self.bf: T.Optional[T.BinaryIO] = None
+        self.mm: T.Optional[mmap.mmap] = None
         self.bf_perms = None
-        try:
-            self.bf = open(bfile, 'r+b')
-        except PermissionError as e:
-            self.bf_perms = stat.S_IMODE(os.lstat(bfile).st_mode)
-            os.chmod(bfile, stat.S_IREAD | stat.S_IWRITE | stat.S_IEXEC)
+        if self.readonly:
+            f = open(bfile, 'rb')
+        else:
             try:
-                self.bf = open(bfile, 'r+b')
-            except Exception:
-                os.chmod(bfile, self.bf_perms)
-                self.bf_perms = None
-                raise e
+                f = open(bfile, 'r+b')
+            except PermissionError as e:
+                self.bf_perms = stat.S_IMODE(os.lstat(bfile).st_mode)
+                os.chmod(bfile, stat.S_IREAD | stat.S_IWRITE | stat.S_IEXEC)
+                try:
+                    f = open(bfile, 'r+b')
+                except Exception:
+                    os.chmod(bfile, self.bf_perms)
+                    self.bf_perms = None
+                    raise e
+        with f:
+            # Empty files cannot be mapped, and are not ELF files anyway
+            if os.fstat(f.fileno()).st_size == 0:
+                self.bf = T.cast('T.BinaryIO', io.BytesIO())
+                return
+            access = mmap.ACCESS_READ if self.readonly else mmap.ACCESS_WRITE
+            self.mm = mmap.mmap(f.fileno(), 0, access=access)
+        self.bf = T.cast('T.BinaryIO', self.mm)
 
     def close_bf(self) -> None:
         if self.bf is not None:
-            if self.bf_perms is not None:
-                os.chmod(self.bf.fileno(), self.bf_perms)
-                self.bf_perms = None
+            if self.mm is not None and not self.readonly:
+                self.mm.flush()
             self.bf.close()
             self.bf = None
+            self.mm = None
+        if self.bf_perms is not None:
+            os.chmod(self.bfile, self.bf_perms)
+            self.bf_perms = None
 
     def __enter__(self) -> 'Elf':
         return self
@@ -207,73 +200,68 @@ class Elf(DataSizes):
         return ptrsize, is_le
 
     def parse_header(self) -> None:
-        self.bf.seek(0)
-        self.e_ident = struct.unpack('16s', self.bf.read(16))[0]
-        self.e_type = struct.unpack(self.Half, self.bf.read(self.HalfSize))[0]
-        self.e_machine = struct.unpack(self.Half, self.bf.read(self.HalfSize))[0]
-        self.e_version = struct.unpack(self.Word, self.bf.read(self.WordSize))[0]
-        self.e_entry = struct.unpack(self.Addr, self.bf.read(self.AddrSize))[0]
-        self.e_phoff = struct.unpack(self.Off, self.bf.read(self.OffSize))[0]
-        self.e_shoff = struct.unpack(self.Off, self.bf.read(self.OffSize))[0]
-        self.e_flags = struct.unpack(self.Word, self.bf.read(self.WordSize))[0]
-        self.e_ehsize = struct.unpack(self.Half, self.bf.read(self.HalfSize))[0]
-        self.e_phentsize = struct.unpack(self.Half, self.bf.read(self.HalfSize))[0]
-        self.e_phnum = struct.unpack(self.Half, self.bf.read(self.HalfSize))[0]
-        self.e_shentsize = struct.unpack(self.Half, self.bf.read(self.HalfSize))[0]
-        self.e_shnum = struct.unpack(self.Half, self.bf.read(self.HalfSize))[0]
-        self.e_shstrndx = struct.unpack(self.Half, self.bf.read(self.HalfSize))[0]
+        (self.e_ident, self.e_type, self.e_machine, self.e_version,
+         self.e_entry, self.e_phoff, self.e_shoff, self.e_flags,
+         self.e_ehsize, self.e_phentsize, self.e_phnum, self.e_shentsize,
+         self.e_shnum, self.e_shstrndx) = self.structs.header.unpack_from(self.mm, 0)
 
     def parse_sections(self) -> None:
-        self.bf.seek(self.e_shoff)
-        for _ in range(self.e_shnum):
-            self.sections.append(SectionHeader(self.bf, self.ptrsize, self.is_le))
+        st = self.structs.section
+        for i in range(self.e_shnum):
+            self.sections.append(SectionHeader(st.unpack_from(self.mm, self.e_shoff + i * st.size)))
+
+    def str_at(self, offset: int) -> bytes:
+        end = self.mm.find(b'\0', offset)
+        if end == -1:
+            raise RuntimeError('Tried to read past the end of the file')
+        return self.mm[offset:end]
 
     def read_str(self) -> bytes:
-        arr = []
-        x = self.bf.read(1)
-        while x != b'\0':
-            arr.append(x)
-            x = self.bf.read(1)
-            if x == b'':
-                raise RuntimeError('Tried to read past the end of the file')
-        return b''.join(arr)
+        result = self.str_at(self.bf.tell())
+        self.bf.seek(len(result) + 1, os.SEEK_CUR)
+        return result
 
     def find_section(self, target_name: bytes) -> T.Optional[SectionHeader]:
-        section_names = self.sections[self.e_shstrndx]
-        for i in self.sections:
-            self.bf.seek(section_names.sh_offset + i.sh_name)
-            name = self.read_str()
-            if name == target_name:
-                return i
-        return None
+        if self.sections_by_name is None:
+            section_names = self.sections[self.e_shstrndx]
+            self.sections_by_name = {}
+            for i in self.sections:
+                self.sections_by_name.setdefault(self.str_at(section_names.sh_offset + i.sh_name), i)
+        return self.sections_by_name.get(target_name)
 
     def parse_dynamic(self) -> None:
         sec = self.find_section(b'.dynamic')
         if sec is None:
             return
-        self.bf.seek(sec.sh_offset)
+        st = self.structs.dynamic
+        offset = sec.sh_offset
         while True:
-            e = DynamicEntry(self.bf, self.ptrsize, self.is_le)
+            e = DynamicEntry(*st.unpack_from(self.mm, offset))
             self.dynamic.append(e)
             if e.d_tag == 0:
                 break
+            offset += st.size
+
+    def write_dynamic(self) -> None:
+        sec = self.find_section(b'.dynamic')
+        st = self.structs.dynamic
+        for i, entry in enumerate(self.dynamic):
+            st.pack_into(self.mm, sec.sh_offset + i * st.size, entry.d_tag, entry.val)
 
     def parse_dynsym(self) -> None:
         sec = self.find_section(b'.dynsym')
         if sec is None:
             return
-        self.bf.seek(sec.sh_offset)
+        st = self.structs.dynsym
         for i in range(sec.sh_size // sec.sh_entsize):
-            e = DynsymEntry(self.bf, self.ptrsize, self.is_le)
-            self.dynsym.append(e)
+            self.dynsym.append(DynsymEntry(st.unpack_from(self.mm, sec.sh_offset + i * st.size), self.ptrsize))
 
     def parse_dynsym_strings(self) -> None:
         sec = self.find_section(b'.dynstr')
         if sec is None:
             return
         for i in self.dynsym:
-            self.bf.seek(sec.sh_offset + i.st_name)
-            self.dynsym_strings.append(self.read_str().decode())
+            self.dynsym_strings.append(self.str_at(sec.sh_offset + i.st_name).decode())
 
     @generate_list
     def get_section_names(self) -> T.Generator[str, None, None]:
@@ -295,6 +283,74 @@ class Elf(DataSizes):
         self.bf.seek(strtab.val + soname.val)
         return self.read_str().decode()
 
+    def find_section_by_type(self, sh_type: int) -> T.Optional[SectionHeader]:
+        for i in self.sections:
+            if i.sh_type == sh_type:
+                return i
+        return None
+
+    def get_version_names(self) -> T.Dict[int, str]:
+        """Map the indexes of the versions defined by this file to their names."""
+        names: T.Dict[int, str] = {}
+        sec = self.find_section_by_type(SHT_GNU_VERDEF)
+        if sec is None:
+            return names
+        strtab = self.sections[sec.sh_link]
+        offset = sec.sh_offset
+        for _ in range(sec.sh_info):
+            self.bf.seek(offset)
+            _, _, vd_ndx, _ = struct.unpack(self.Half[0] + 'HHHH', self.bf.read(4 * self.HalfSize))
+            _, vd_aux, vd_next = struct.unpack(self.Word[0] + 'III', self.bf.read(3 * self.WordSize))
+            self.bf.seek(offset + vd_aux)
+            vda_name = struct.unpack(self.Word, self.bf.read(self.WordSize))[0]
+            self.bf.seek(strtab.sh_offset + vda_name)
+            names[vd_ndx] = self.read_str().decode()
+            if vd_next == 0:
+                break
+            offset += vd_next
+        return names
+
+    def get_symbol_versions(self) -> T.List[str]:
+        """Return the version suffix of each dynamic symbol, like nm does."""
+        sec = self.find_section_by_type(SHT_GNU_VERSYM)
+        if sec is None:
+            return [''] * len(self.dynsym)
+        names = self.get_version_names()
+        self.bf.seek(sec.sh_offset)
+        count = len(self.dynsym)
+        indexes = struct.unpack(f'{self.Half[0]}{count}H', self.bf.read(count * self.HalfSize))
+        versions = []
+        for index in indexes:
+            name = names.get(index & ~VERSYM_HIDDEN)
+            # Index 1 is the base version, named after the library itself
+            if name is None or index & ~VERSYM_HIDDEN == 1:
+                versions.append('')
+            elif index & VERSYM_HIDDEN:
+                versions.append('@' + name)
+            else:
+                versions.append('@@' + name)
+        return versions
+
+    def get_exported_symbols(self) -> T.List[str]:
+        """Describe the symbols defined and exported by this library.
+
+        Each symbol is described by its versioned name, type and binding, and
+        for data objects their size, which is part of the ABI because of copy
+        relocations."""
+        result = []
+        versions = self.get_symbol_versions()
+        for sym, name, version in zip(self.dynsym, self.dynsym_strings, versions):
+            info = sym.st_info
+            binding = STB_NAMES.get(info >> 4)
+            if not name or binding is None or sym.st_shndx == SHN_UNDEF:
+                continue
+            symtype = STT_NAMES.get(info & 0xf, str(info & 0xf))
+            entry = f'{name}{version} {symtype} {binding}'
+            if symtype in {'OBJECT', 'COMMON', 'TLS'}:
+                entry += f' {sym.st_size}'
+            result.append(entry)
+        return sorted(result)
+
     def get_entry_offset(self, entrynum: int) -> T.Optional[int]:
         sec = self.find_section(b'.dynstr')
         for i in self.dynamic:
@@ -447,9 +503,7 @@ class Elf(DataSizes):
             if entry.d_tag == DT_MIPS_RLD_MAP_REL:
                 entry.val += 2 * (self.ptrsize // 8)
                 break
-        self.bf.seek(sec.sh_offset)
-        for entry in self.dynamic:
-            entry.write(self.bf)
+        self.write_dynamic()
         return None
 
 def fix_elf(fname: str, rpath_dirs_to_remove: T.Set[bytes], new_rpath: T.Optional[bytes], verbose: bool = True) -> None:
@@ -479,7 +533,7 @@ def get_darwin_rpaths(fname: str) -> OrderedSet[str]:
             result.add(rp)
     return result
 
-def fix_darwin(fname: str, rpath_dirs_to_remove: T.Set[bytes], new_rpath: str, final_path: str, install_name_mappings: T.Dict[str, str]) -> None:
+def fix_darwin(fname: str, rpath_dirs_to_remove: T.Set[bytes], new_rpath: str, final_path: str, install_name_mappings: T.Mapping[str, str]) -> None:
     try:
         old_rpaths = get_darwin_rpaths(fname)
     except subprocess.CalledProcessError:
@@ -534,7 +588,7 @@ def fix_jar(fname: str) -> None:
     # than the beginning, but the spec doesn't forbid that.
     subprocess.check_call(['jar', 'ufM', fname, 'META-INF/MANIFEST.MF'])
 
-def fix_rpath(fname: str, rpath_dirs_to_remove: T.Set[bytes], new_rpath: T.Union[str, bytes], final_path: str, install_name_mappings: T.Dict[str, str], verbose: bool = True) -> None:
+def fix_rpath(fname: str, rpath_dirs_to_remove: T.Set[bytes], new_rpath: T.Union[str, bytes], final_path: str, install_name_mappings: T.Mapping[str, str], verbose: bool = True) -> None:
     global INSTALL_NAME_TOOL  # pylint: disable=global-statement
     # Static libraries, import libraries, debug information, headers, etc
     # never have rpaths
@@ -564,3 +618,25 @@ def fix_rpath(fname: str, rpath_dirs_to_remove: T.Set[bytes], new_rpath: T.Union
         if isinstance(new_rpath, bytes):
             new_rpath = new_rpath.decode('utf8')
         fix_darwin(fname, rpath_dirs_to_remove, new_rpath, final_path, install_name_mappings)
+
+def fix_rpaths(jobs: T.Sequence[T.Tuple[str, T.Set[bytes], T.Union[str, bytes], str, T.Mapping[str, str]]],
+               verbose: bool = True, max_workers: T.Optional[int] = None) -> None:
+    """Run fix_rpath() for each tuple of arguments in jobs.
+
+    Files are processed by a pool of threads, unless max_workers is 1. The
+    first error is raised once all the files have been processed.
+    """
+    # fix_jar() extracts the manifest in the current directory
+    jars = [args for args in jobs if args[0].endswith('.jar')]
+    others = [args for args in jobs if not args[0].endswith('.jar')]
+    for args in jars:
+        fix_rpath(*args, verbose=verbose)
+    if max_workers == 1 or len(others) <= 1:
+        for args in others:
+            fix_rpath(*args, verbose=verbose)
+        return
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fix_rpath, *args, verbose=verbose) for args in others]
+    for f in futures:
+        f.result()
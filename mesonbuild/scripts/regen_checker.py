@@ -17,7 +17,10 @@ def need_regen(regeninfo: RegenInfo, regen_timestamp: float) -> bool:
         curfile = os.path.join(regeninfo.build_dir, i)
         curtime = os.stat(curfile).st_mtime
         if curtime > regen_timestamp:
-            return True
+            # Files may have been touched without being modified
+            if regeninfo.changed_files() != []:
+                return True
+            break
     # The timestamp file gets automatically deleted by MSBuild during a 'Clean' build.
     # We must make sure to recreate it, even if we do not regenerate the solution.
     # Otherwise, Visual Studio will always consider the REGEN project out of date.
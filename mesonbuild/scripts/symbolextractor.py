@@ -11,7 +11,7 @@
 from __future__ import annotations
 
 import typing as T
-import os, sys
+import os, struct, sys
 from .. import mesonlib
 from .. import mlog
 from ..mesonlib import Popen_safe
@@ -86,6 +86,29 @@ def call_tool_nowarn(tool: T.List[str], **kwargs: T.Any) -> T.Tuple[str, str]:
         return None, e
     return output, None
 
+def elf_syms(libfilename: str) -> T.Optional[T.List[str]]:
+    """Read the soname and exported symbols of an ELF library directly, which
+    is much faster than running readelf and nm. Returns None if the file is not
+    an ELF file or cannot be parsed."""
+    try:
+        with open(libfilename, 'rb') as f:
+            ident = f.read(6)
+    except OSError:
+        return None
+    if len(ident) != 6 or ident[:4] != b'\x7fELF' or ident[4] not in {1, 2} or ident[5] not in {1, 2}:
+        return None
+    from .depfixer import Elf, DT_SONAME
+    try:
+        with Elf(libfilename, verbose=False, readonly=True) as elf:
+            result = []
+            offset = elf.get_entry_offset(DT_SONAME)
+            if offset is not None:
+                elf.bf.seek(offset)
+                result.append('SONAME ' + elf.read_str().decode())
+            return result + elf.get_exported_symbols()
+    except (OSError, ValueError, IndexError, RuntimeError, struct.error, UnicodeDecodeError):
+        return None
+
 def gnu_syms(libfilename: str, outfilename: str) -> None:
     # Get the name of the library
     output = call_tool('readelf', ['-d', libfilename])
@@ -284,7 +307,12 @@ def os2_syms(impfilename: str, outfilename: str) -> None:
     print_tool_warning(['nm', 'listomf'], 'do not work or were not found', all_stderr)
 
 def gen_symbols(libfilename: str, impfilename: str, outfilename: str, cross_host: str) -> None:
-    if cross_host is not None:
+    # ELF libraries are read directly on all platforms, including when cross
+    # compiling because no tools are needed
+    result = elf_syms(libfilename)
+    if result is not None:
+        write_if_changed('\n'.join(result) + '\n', outfilename)
+    elif cross_host is not None:
         # In case of cross builds just always relink. In theory we could
         # determine the correct toolset, but we would need to use the correct
         # `nm`, `readelf`, etc, from the cross info which requires refactoring.
@@ -0,0 +1,195 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2026 The Meson development team
+
+"""A persistent process that runs internal scripts with warm imports.
+
+When the script_worker option is enabled, the ninja backend runs the scripts
+in WORKER_SCRIPTS through worker_client.py instead of `meson --internal`. The
+client connects to this server over a Unix socket in the private directory of
+the build and sends its arguments, working directory, environment and standard
+file descriptors. The server forks a child for each request, which runs the
+script in-process exactly like `meson --internal` would and reports its exit
+code.
+
+The server is started by the first client that cannot connect to it, and exits
+when it has been idle for IDLE_TIMEOUT seconds, when the build directory is
+reconfigured or when its socket is removed.
+"""
+
+from __future__ import annotations
+
+import array
+import importlib
+import json
+import os
+import select
+import socket
+import struct
+import sys
+import time
+import typing as T
+
+# Scripts that are run for many build edges. worker_client.py must be kept
+# in sync with the protocol and the file names used here.
+WORKER_SCRIPTS = {'exe', 'symbolextractor', 'depscan', 'depaccumulate'}
+SOCKET_NAME = 'worker.sock'
+LOCK_NAME = 'worker.lock'
+INFO_NAME = 'worker.json'
+
+IDLE_TIMEOUT = 300
+POLL_INTERVAL = 5
+
+# AF_UNIX socket paths are limited to 104 bytes on some platforms
+MAX_SOCKET_PATH = 100
+
+def socket_path(privdir: str) -> str:
+    return os.path.join(privdir, SOCKET_NAME)
+
+def is_supported(privdir: str) -> bool:
+    return hasattr(socket, 'AF_UNIX') and hasattr(os, 'fork') and len(socket_path(privdir)) <= MAX_SOCKET_PATH
+
+def write_info(privdir: str, meson_command: T.List[str]) -> None:
+    """Store the Meson command that the client uses to start the server and
+    to run scripts directly when the server is not available."""
+    with open(os.path.join(privdir, INFO_NAME), 'w', encoding='utf-8') as f:
+        json.dump({'meson_command': meson_command}, f)
+
+def recv_exactly(conn: socket.socket, size: int) -> bytes:
+    data = b''
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError('Connection closed by the client')
+        data += chunk
+    return data
+
+def recv_request(conn: socket.socket) -> T.Tuple[T.Dict[str, T.Any], T.List[int]]:
+    fds = array.array('i')
+    header, ancdata, _, _ = conn.recvmsg(4, socket.CMSG_SPACE(3 * fds.itemsize))
+    for level, type_, data in ancdata:
+        if level == socket.SOL_SOCKET and type_ == socket.SCM_RIGHTS:
+            fds.frombytes(data[:len(data) - (len(data) % fds.itemsize)])
+    if len(fds) != 3:
+        raise ConnectionError('Expected the standard file descriptors of the client')
+    header += recv_exactly(conn, 4 - len(header))
+    size, = struct.unpack('!I', header)
+    return json.loads(recv_exactly(conn, size).decode('utf-8')), list(fds)
+
+def handle(conn: socket.socket) -> int:
+    """Run one request in the current, forked, process."""
+    request, fds = recv_request(conn)
+    script = request['args'][0]
+    if script not in WORKER_SCRIPTS:
+        raise ConnectionError(f'Script {script} cannot be run by the worker')
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    for i, fd in enumerate(fds):
+        os.dup2(fd, i)
+        os.close(fd)
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+    # Tell the client that the script started, it can no longer run it by
+    # itself if anything goes wrong from now on. It forwards the signals it
+    # receives to this process.
+    conn.sendall(b'R' + struct.pack('!i', os.getpid()))
+
+    from .. import mesonmain
+    try:
+        returncode = mesonmain.run_script_command(script, request['args'][1:])
+    except SystemExit as e:
+        returncode = e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        returncode = 2
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return returncode
+
+def serve_child(conn: socket.socket, server: socket.socket, lockfile: T.TextIO) -> None:
+    server.close()
+    lockfile.close()
+    returncode = 2
+    try:
+        returncode = handle(conn)
+        conn.sendall(struct.pack('!i', returncode))
+    except BaseException:
+        pass
+    finally:
+        os._exit(returncode)
+
+def reap_children() -> None:
+    try:
+        while os.waitpid(-1, os.WNOHANG)[0] != 0:
+            pass
+    except ChildProcessError:
+        pass
+
+def stat_key(path: str) -> T.Optional[T.Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns)
+
+def run(args: T.List[str]) -> int:
+    privdir = os.path.abspath(args[0])
+    sockpath = socket_path(privdir)
+
+    import fcntl
+    lockfile = open(os.path.join(privdir, LOCK_NAME), 'w', encoding='utf-8')
+    try:
+        fcntl.flock(lockfile, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        # Another client already started a server
+        return 0
+
+    for script in WORKER_SCRIPTS:
+        importlib.import_module('mesonbuild.scripts.' + {'exe': 'meson_exe'}.get(script, script))
+
+    if os.path.exists(sockpath):
+        os.unlink(sockpath)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o077)
+    try:
+        server.bind(sockpath)
+    finally:
+        os.umask(old_umask)
+    server.listen(64)
+
+    sock_key = stat_key(sockpath)
+    coredata_path = os.path.join(privdir, 'coredata.dat')
+    coredata_key = stat_key(coredata_path)
+    last_request = time.monotonic()
+    try:
+        while True:
+            ready, _, _ = select.select([server], [], [], POLL_INTERVAL)
+            reap_children()
+            if not ready:
+                if time.monotonic() - last_request > IDLE_TIMEOUT:
+                    break
+                if stat_key(sockpath) != sock_key or stat_key(coredata_path) != coredata_key:
+                    break
+                continue
+            conn, _ = server.accept()
+            if stat_key(coredata_path) != coredata_key:
+                # The build directory was reconfigured, possibly by another
+                # version of Meson. Pending clients run their script by
+                # themselves and the next one starts a new server.
+                conn.close()
+                break
+            last_request = time.monotonic()
+            if os.fork() == 0:
+                serve_child(conn, server, lockfile)
+            conn.close()
+    finally:
+        if stat_key(sockpath) == sock_key:
+            os.unlink(sockpath)
+        server.close()
+        lockfile.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(run(sys.argv[1:]))
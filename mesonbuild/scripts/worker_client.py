@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2026 The Meson development team
+
+"""Client of the script worker, see worker.py for details.
+
+This is not an internal script: ninja runs this file directly with
+`python -I worker_client.py <privdir> <script> <args>`. It must not import
+anything from mesonbuild, nor typing, so that it starts as fast as a bare
+Python interpreter.
+"""
+
+from __future__ import annotations
+
+import array
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import typing as T
+
+# Must match worker.py
+SOCKET_NAME = 'worker.sock'
+INFO_NAME = 'worker.json'
+
+def get_meson_command(privdir: str) -> T.List[str]:
+    with open(os.path.join(privdir, INFO_NAME), encoding='utf-8') as f:
+        command: T.List[str] = json.load(f)['meson_command']
+    return command
+
+def start_server(meson_command: T.List[str], privdir: str) -> None:
+    if os.fork() != 0:
+        return
+    try:
+        os.setsid()
+        devnull = os.open(os.devnull, os.O_RDWR)
+        for fd in range(3):
+            os.dup2(devnull, fd)
+        os.execvp(meson_command[0], meson_command + ['--internal', 'worker', privdir])
+    finally:
+        os._exit(1)
+
+def run_directly(meson_command: T.List[str], args: T.List[str]) -> T.NoReturn:
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.execvp(meson_command[0], meson_command + ['--internal'] + args)
+
+def recv_exactly(sock: socket.socket, size: int) -> bytes:
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+def send_request(sock: socket.socket, args: T.List[str]) -> T.Optional[int]:
+    """Send the request and return the pid of the process running it, or
+    None if the server did not accept it."""
+    payload = json.dumps({'args': args, 'cwd': os.getcwd(), 'env': dict(os.environ)}).encode('utf-8')
+    try:
+        sock.sendmsg([struct.pack('!I', len(payload))],
+                     [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', [0, 1, 2]))])
+        sock.sendall(payload)
+        reply = recv_exactly(sock, 5)
+    except OSError:
+        return None
+    if len(reply) != 5 or reply[:1] != b'R':
+        return None
+    pid: int = struct.unpack('!i', reply[1:])[0]
+    return pid
+
+def main() -> int:
+    privdir = sys.argv[1]
+    args = sys.argv[2:]
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(os.path.join(privdir, SOCKET_NAME))
+    except OSError:
+        sock.close()
+        meson_command = get_meson_command(privdir)
+        start_server(meson_command, privdir)
+        run_directly(meson_command, args)
+
+    pid = send_request(sock, args)
+    if pid is None:
+        # The server is shutting down, the next client will start a new one
+        sock.close()
+        run_directly(get_meson_command(privdir), args)
+
+    def forward(signum: int, frame: T.Any) -> None:
+        try:
+            os.kill(pid, signum)
+        except OSError:
+            pass
+    for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+        signal.signal(signum, forward)
+
+    reply = recv_exactly(sock, 4)
+    if len(reply) != 4:
+        print(f'Meson worker process for {args[0]} exited unexpectedly', file=sys.stderr)
+        return 1
+    returncode: int = struct.unpack('!i', reply)[0]
+    return returncode
+
+if __name__ == '__main__':
+    sys.exit(main())
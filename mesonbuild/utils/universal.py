@@ -953,6 +953,7 @@ def version_compare_many(vstr1: str, conditions: T.Union[str, T.Iterable[str]])
 
 # determine if the minimum version satisfying the condition |condition| exceeds
 # the minimum version for a feature |minimum|
+@lru_cache(maxsize=None)
 def version_compare_condition_with_min(condition: str, minimum: str) -> bool:
     if condition.startswith('>='):
         cmpop = operator.le
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+
+import sys
+
+if sys.argv[1] == '--tap':
+    count = int(sys.argv[2])
+    print(f'1..{count}')
+    for i in range(count):
+        print(f'ok {i + 1} subtest {i}')
+else:
+    for i in range(int(sys.argv[1])):
+        print(f'line {i}')
+    print('error', file=sys.stderr)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2026 The Meson development team
+
+'''Measures how long the Meson interpreter takes to run synthetic build files.
+
+Each workload is a generated project without languages, so that configuring
+it is almost only interpreting its meson.build. To compare against another
+Meson version, pass the root of its source tree with --baseline:
+
+    tools/interpreter_benchmark.py --baseline ../meson-1.10
+'''
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import typing as T
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def join_lines(lines: T.List[str]) -> str:
+    return '\n'.join(lines) + '\n'
+
+def generate_loop(count: int) -> str:
+    '''A foreach loop doing the usual string, array and dict manipulations on
+    each of @count source files.'''
+    return join_lines([
+        "project('bench')",
+        'count = 0',
+        'names = []',
+        f'foreach i : range({count})',
+        "  name = 'src/dir@0@/file@1@.c'.format(i % 97, i)",
+        "  if name.endswith('.c') and not name.contains('skip')",
+        '    count += 1',
+        '  endif',
+        '  if i % 100 == 0',
+        '    names += [name]',
+        '  endif',
+        "  d = {'name' : name, 'index' : i}",
+        "  x = d['index'] * 2 + 1",
+        "  args = ['-DFOO', '-DBAR=@0@'.format(x), f'-DNAME=@name@']",
+        "  kind = i % 2 == 0 ? 'even' : 'odd'",
+        "  base = name.split('/')[-1].replace('.c', '')",
+        'endforeach',
+        'message(count, names.length())',
+    ])
+
+def generate_literals(count: int) -> str:
+    '''Long literal arrays, like lists of sources, assigned and concatenated.'''
+    lines = ["project('bench')", 'all = []']
+    for i in range(count // 100):
+        items = ', '.join(f"'src/dir{i}/file{j}.c'" for j in range(100))
+        lines.append(f'sources_{i} = [{items}]')
+        lines.append(f"flags_{i} = ['-DDIR={i}', '-Wall', true, 42]")
+        if i % 10 == 0:
+            lines.append(f'all += sources_{i}')
+    lines.append('message(all.length())')
+    return join_lines(lines)
+
+def generate_functions(count: int) -> str:
+    '''Calls of functions and methods with typed positional and keyword
+    arguments.'''
+    return join_lines([
+        "project('bench')",
+        'deps = []',
+        f'foreach i : range({count})',
+        "  dep = declare_dependency(compile_args : ['-DINDEX=@0@'.format(i)], version : '1.0',",
+        "                           variables : {'index' : i.to_string()})",
+        "  path = join_paths('src', 'dir@0@'.format(i % 10), 'file.c')",
+        "  conf = configuration_data({'INDEX' : i, 'NAME' : path})",
+        "  conf.set('PATH', path, description : 'the path')",
+        "  env = environment({'INDEX' : i.to_string()}, method : 'set')",
+        "  parts = path.split('/')",
+        '  if i % 100 == 0',
+        '    deps += dep',
+        '  endif',
+        'endforeach',
+        "message(deps.length())",
+    ])
+
+WORKLOADS = {
+    'loop': generate_loop,
+    'functions': generate_functions,
+    'literals': generate_literals,
+}
+
+def run(meson_root: str, workloads: T.List[str], count: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name in workloads:
+            srcdir = os.path.join(tmpdir, name)
+            builddir = os.path.join(tmpdir, name + '-build')
+            os.makedirs(srcdir)
+            with open(os.path.join(srcdir, 'meson.build'), 'w', encoding='utf-8') as f:
+                f.write(WORKLOADS[name](count))
+            best = float('inf')
+            for _ in range(repeat):
+                shutil.rmtree(builddir, ignore_errors=True)
+                start = time.perf_counter()
+                subprocess.run([sys.executable, os.path.join(meson_root, 'meson.py'), 'setup', builddir, srcdir],
+                               check=True, stdout=subprocess.DEVNULL)
+                best = min(best, time.perf_counter() - start)
+            print(f'{name:>10}: {best * 1000:.0f} ms')
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--baseline', help='root of another Meson source tree to compare with')
+    parser.add_argument('--count', type=int, default=20000, help='number of iterations or array items per workload')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('workloads', nargs='*', metavar='WORKLOAD',
+                        help=f'workloads to run, among {", ".join(WORKLOADS)} (default: all)')
+    options = parser.parse_args()
+    for name in options.workloads:
+        if name not in WORKLOADS:
+            parser.error(f'unknown workload {name!r}')
+
+    roots = [('current', ROOT)]
+    if options.baseline:
+        roots.insert(0, ('baseline', os.path.abspath(options.baseline)))
+    for title, root in roots:
+        print(f'{title} ({root}):', flush=True)
+        run(root, options.workloads or list(WORKLOADS), options.count, options.repeat)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2026 The Meson development team
+
+'''Measures the token throughput of the Meson lexer.
+
+By default a large generated meson.build is lexed, otherwise the files given
+on the command line. To compare against another Meson version, pass the root
+of its source tree with --baseline:
+
+    tools/lexer_benchmark.py --baseline ../meson-1.10 path/to/meson.build
+'''
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import typing as T
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def generate_code(lines: int) -> str:
+    out = ['project(\'bench\', \'c\')', '', 'sources = files(']
+    for i in range(lines):
+        out.append(f"  'src/dir{i % 97}/file{i}.c',  # source number {i}")
+    out.append(')')
+    out.append("executable('bench', sources, c_args : ['-DFOO=1', '-DBAR=2'])")
+    out.append('if host_machine.system() not in [\'windows\', \'darwin\']')
+    out.append("  message(f'@0@ sources'.format(sources.length()))")
+    out.append('endif')
+    return '\n'.join(out) + '\n'
+
+def run(codes: T.List[T.Tuple[str, str]], repeat: int) -> None:
+    from mesonbuild import mparser
+
+    size = sum(len(code) for _, code in codes)
+    modes = [('all tokens', True)]
+    if 'keep_whitespace' in mparser.Lexer.lex.__code__.co_varnames:
+        modes.append(('no whitespace', False))
+    for name, keep in modes:
+        best = float('inf')
+        count = 0
+        for _ in range(repeat):
+            count = 0
+            start = time.perf_counter()
+            for filename, code in codes:
+                lexer = mparser.Lexer(code)
+                tokens = lexer.lex(filename, keep) if not keep else lexer.lex(filename)
+                for _ in tokens:
+                    count += 1
+            best = min(best, time.perf_counter() - start)
+        print(f'{name:>14}: {count} tokens in {best * 1000:.1f} ms, {size / best / 1e6:.2f} MB/s')
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--baseline', help='root of another Meson source tree to compare with')
+    parser.add_argument('--lines', type=int, default=50000, help='number of lines of the generated file')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--meson-root', default=ROOT, help=argparse.SUPPRESS)
+    parser.add_argument('files', nargs='*')
+    options = parser.parse_args()
+
+    if options.baseline:
+        args = [sys.executable, __file__, '--lines', str(options.lines), '--repeat', str(options.repeat)] + options.files
+        for title, root in (('baseline', options.baseline), ('current', options.meson_root)):
+            print(f'{title} ({root}):', flush=True)
+            subprocess.check_call(args + ['--meson-root', os.path.abspath(root)])
+        return 0
+
+    sys.path.insert(0, options.meson_root)
+    if options.files:
+        codes = []
+        for f in options.files:
+            with open(f, encoding='utf-8') as fh:
+                codes.append((f, fh.read()))
+    else:
+        codes = [('meson.build', generate_code(options.lines))]
+    run(codes, options.repeat)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
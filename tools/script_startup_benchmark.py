@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2026 The Meson development team
+
+'''Measures the startup time of the internal scripts run by the backends.
+
+Each script is run the way ninja runs it, as `meson --internal <script>`, and
+compared with the startup time of a bare Python interpreter. To compare against
+another Meson version, pass the root of its source tree with --baseline:
+
+    tools/script_startup_benchmark.py --baseline ../meson-1.10
+'''
+
+import argparse
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+import typing as T
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def measure(cmd: T.List[str], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def script_commands(meson_root: str, tmpdir: str) -> T.List[T.Tuple[str, T.List[str]]]:
+    sys.path.insert(0, meson_root)
+    from mesonbuild.utils.core import ExecutableSerialisation
+
+    exe_data = os.path.join(tmpdir, 'exe.dat')
+    with open(exe_data, 'wb') as f:
+        pickle.dump(ExecutableSerialisation([sys.executable, '-c', 'pass']), f)
+    src = os.path.join(tmpdir, 'src.txt')
+    with open(src, 'w', encoding='utf-8') as f:
+        f.write('benchmark\n')
+
+    meson = [sys.executable, os.path.join(meson_root, 'meson.py'), '--internal']
+    return [
+        ('exe --unpickle', meson + ['exe', '--unpickle', exe_data]),
+        ('copy', meson + ['copy', src, os.path.join(tmpdir, 'dst.txt')]),
+        ('delsuffix', meson + ['delsuffix', tmpdir, 'nonexistent']),
+    ]
+
+def run(meson_root: str, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bare = measure([sys.executable, '-c', 'pass'], repeat)
+        print(f'{"bare python":>16}: {bare * 1000:.1f} ms')
+        for name, cmd in script_commands(meson_root, tmpdir):
+            t = measure(cmd, repeat)
+            print(f'{name:>16}: {t * 1000:.1f} ms (+{(t - bare) * 1000:.1f} ms)')
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--baseline', help='root of another Meson source tree to compare with')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--meson-root', default=ROOT, help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.baseline:
+        args = [sys.executable, __file__, '--repeat', str(options.repeat)]
+        for title, root in (('baseline', options.baseline), ('current', options.meson_root)):
+            print(f'{title} ({root}):', flush=True)
+            subprocess.check_call(args + ['--meson-root', os.path.abspath(root)])
+        return 0
+
+    run(options.meson_root, options.repeat)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
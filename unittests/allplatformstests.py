@@ -13,6 +13,7 @@ import shutil
 import platform
 import pickle
 import zipfile, tarfile
+import xml.etree.ElementTree as ET
 import sys
 import sysconfig
 from unittest import mock, SkipTest, skipIf, skipUnless, expectedFailure
@@ -685,6 +686,67 @@ class AllPlatformTests(BasePlatformTests):
         self.assertPathDoesNotExist(exename)
         self.assertPathDoesNotExist(dirname)
 
+    def test_install_incremental(self):
+        testdir = self.copy_srcdir(os.path.join(self.common_test_dir, '8 install'))
+        exename = os.path.join(self.installdir, 'usr/bin/prog' + exe_suffix)
+        libname = os.path.join(self.installdir + self.prefix, self.libdir, 'libstat.a')
+        install_cmd = self.meson_command + ['install', '--incremental', '--destdir', self.installdir]
+        self.init(testdir)
+        self.build()
+        out = self._run(install_cmd, workdir=self.builddir)
+        self.assertNotIn('up to date', out)
+        self.assertPathExists(os.path.join(self.logdir, 'install-manifest.json'))
+        exe_mtime = os.stat(exename).st_mtime_ns
+
+        out = self._run(install_cmd, workdir=self.builddir)
+        self.assertIn('3 files were up to date', out)
+        self.assertNotIn('Installing', out)
+        self.assertEqual(exe_mtime, os.stat(exename).st_mtime_ns)
+
+        # Only the changed target is installed again
+        with open(os.path.join(testdir, 'stat.c'), 'a', encoding='utf-8') as f:
+            f.write('int func2(void) { return 1; }\n')
+        self.build()
+        out = self._run(install_cmd, workdir=self.builddir)
+        self.assertIn('2 files were up to date', out)
+        self.assertIn('libstat', out)
+        self.assertEqual(exe_mtime, os.stat(exename).st_mtime_ns)
+
+        # A file that was removed from the destination is installed again
+        os.unlink(exename)
+        out = self._run(install_cmd, workdir=self.builddir)
+        self.assertIn('2 files were up to date', out)
+        self.assertPathExists(exename)
+
+        # Files that are no longer installed are removed
+        with open(os.path.join(testdir, 'meson.build'), 'r+', encoding='utf-8') as f:
+            code = f.read().replace('install : true', 'install : false', 1)
+            f.seek(0)
+            f.write(code)
+            f.truncate()
+        self.build()
+        out = self._run(install_cmd, workdir=self.builddir)
+        self.assertIn('Removing ' + libname, out)
+        self.assertPathDoesNotExist(libname)
+        self.assertPathExists(exename)
+
+    def test_install_incremental_only_changed(self):
+        testdir = os.path.join(self.common_test_dir, '8 install')
+        exename = os.path.join(self.installdir, 'usr/bin/prog' + exe_suffix)
+        install_cmd = self.meson_command + ['install', '--incremental', '--only-changed', '--destdir', self.installdir]
+        self.init(testdir)
+        self.build()
+        self._run(install_cmd, workdir=self.builddir)
+
+        # A touched file is no longer up to date, but is preserved by
+        # --only-changed and must not be removed as if it was not installed
+        for _ in range(2):
+            st = os.stat(exename)
+            os.utime(exename, ns=(st.st_atime_ns, st.st_mtime_ns + 10**10))
+            out = self._run(install_cmd, workdir=self.builddir)
+            self.assertNotIn('Removing', out)
+            self.assertPathExists(exename)
+
     def test_forcefallback(self):
         testdir = os.path.join(self.unit_test_dir, '31 forcefallback')
         self.init(testdir, extra_args=['--wrap-mode=forcefallback'])
@@ -891,6 +953,111 @@ class AllPlatformTests(BasePlatformTests):
         self.assertIn('ENV_B is 3', other_log)
         self.assertIn('ENV_C is 2', other_log)
 
+    def test_test_durations_order(self):
+        testdir = os.path.join(self.unit_test_dir, '133 test durations')
+        self.init(testdir)
+
+        # Record the order in which the runners are started instead of
+        # comparing start times, which depend on the load of the machine
+        orders = []
+        run_tests = mtest.TestHarness.run_tests
+
+        def record_order(harness, runners):
+            orders.append([r.test.name for r in runners])
+            return run_tests(harness, runners)
+
+        with mock.patch.object(mtest.TestHarness, 'run_tests', record_order):
+            # Nothing is known about the tests yet, only the priority and
+            # is_parallel affect the order
+            self.assertEqual(mtest.run_with_args(['-C', self.builddir, '--num-processes', '2']), 0)
+            self.assertEqual(orders[-1], ['high priority', 'short', 'long', 'serial'])
+            with open(os.path.join(self.privatedir, 'test-durations.json'), encoding='utf-8') as f:
+                self.assertEqual(len(json.load(f)), 4)
+
+            self.assertEqual(mtest.run_with_args(['-C', self.builddir, '--num-processes', '2']), 0)
+            self.assertEqual(orders[-1], ['high priority', 'long', 'short', 'serial'])
+
+    def test_test_slice_durations(self):
+        testdir = os.path.join(self.unit_test_dir, '133 test durations')
+        self.init(testdir)
+        self._run(self.mtest_command)
+        durations = os.path.join(self.logdir, 'testlog.json')
+
+        plan = json.loads(self._run(self.mtest_command + ['--slice-durations', durations, '--slice-plan', '2']))
+        self.assertEqual([p['slice'] for p in plan], ['1/2', '2/2'])
+        self.assertEqual([n.split(':')[-1] for n in plan[0]['tests']], ['long'])
+        self.assertEqual(sorted(n.split(':')[-1] for n in plan[1]['tests']), ['high priority', 'serial', 'short'])
+        self.assertGreater(plan[0]['duration'], plan[1]['duration'])
+
+        logs = []
+        for i in [1, 2]:
+            self._run(self.mtest_command + ['--slice-durations', durations, '--slice', f'{i}/2',
+                                            '--logbase', f'slice{i}'])
+            logs += [os.path.join(self.logdir, f'slice{i}.json'), os.path.join(self.logdir, f'slice{i}.junit.xml')]
+        self._run(self.mtest_command + ['--merge-logs'] + logs + ['--logbase', 'merged'])
+        with open(os.path.join(self.logdir, 'merged.json'), encoding='utf-8') as f:
+            self.assertEqual(len([json.loads(line) for line in f]), 4)
+        junit = ET.parse(os.path.join(self.logdir, 'merged.junit.xml')).getroot()
+        self.assertEqual(junit.get('tests'), '4')
+        self.assertEqual(len(junit.findall('testsuite')), 1)
+        self.assertEqual(len(junit.findall('testsuite/testcase')), 4)
+
+    def test_test_spool_output(self):
+        testdir = os.path.join(self.unit_test_dir, '134 test output spool')
+        self.init(testdir)
+        self._run(self.mtest_command + ['--spool-output', '--max-lines', '10'])
+
+        # The log files have the whole output
+        with open(os.path.join(self.logdir, 'testlog.json'), encoding='utf-8') as f:
+            logs = {log['name'].split(':')[-1]: log for log in map(json.loads, f)}
+        self.assertEqual(logs['long output']['stdout'], ''.join(f'line {i}\n' for i in range(1000)))
+        self.assertEqual(logs['long output']['stderr'], 'error\n')
+        self.assertEqual(logs['long tap']['result'], 'OK')
+        self.assertEqual(len(logs['long tap']['stdout'].splitlines()), 501)
+        with open(os.path.join(self.logdir, 'testlog.txt'), encoding='utf-8') as f:
+            self.assertIn(''.join(f'line {i}\n' for i in range(1000)), f.read())
+
+        # The JUnit log only has the first and last lines
+        junit = ET.parse(os.path.join(self.logdir, 'testlog.junit.xml')).getroot()
+        out = junit.find('testsuite/testcase[@name="test_output_spool:long output"]/system-out').text
+        self.assertIn('[... 980 lines omitted ...]', out)
+        self.assertTrue(out.startswith('line 0\n'))
+        self.assertTrue(out.endswith('line 999'))
+        self.assertEqual(len(junit.findall('testsuite[@name="test output spool.test_output_spool:long tap"]/testcase')), 500)
+
+    def test_test_overlap_rebuild(self):
+        if self.backend is not Backend.ninja:
+            raise SkipTest(f'{self.backend.name!r} backend can\'t rebuild tests')
+        testdir = os.path.join(self.common_test_dir, '6 linkshared')
+        self.init(testdir)
+        # Nothing is built yet
+        out = self._run(self.mtest_command + ['--overlap-rebuild', '--num-processes', '1'])
+        self.assertIn('runtest', out)
+        self.assertIn('cpptest', out)
+        self.assertIn('Ok:                2', out)
+
+    def test_test_overlap_rebuild_failure(self):
+        if self.backend is not Backend.ninja:
+            raise SkipTest(f'{self.backend.name!r} backend can\'t rebuild tests')
+        testdir = self.copy_srcdir(os.path.join(self.common_test_dir, '1 trivial'))
+        with open(os.path.join(testdir, 'meson.build'), 'w', encoding='utf-8') as f:
+            f.write(textwrap.dedent('''
+                project('overlap rebuild failure', 'c')
+                test('good', executable('good', 'trivial.c'), priority: 10)
+                test('bad', executable('bad', 'broken.c'))
+                '''))
+        with open(os.path.join(testdir, 'broken.c'), 'w', encoding='utf-8') as f:
+            f.write('#error broken\n')
+        self.init(testdir)
+        # The dependencies of each test are built in a separate batch
+        with self.assertRaises(subprocess.CalledProcessError) as cm:
+            self._run(self.mtest_command + ['--overlap-rebuild', '--num-processes', '1'])
+        self.assertEqual(cm.exception.returncode, 125)
+        self.assertIn('Skipped:           1', cm.exception.output)
+        with open(os.path.join(self.logdir, 'testlog.json'), encoding='utf-8') as f:
+            results = {r['name'].split(':')[-1]: r['result'] for r in map(json.loads, f)}
+        self.assertEqual(results, {'good': 'OK', 'bad': 'SKIP'})
+
     def assertFailedTestCount(self, failure_count, command):
         try:
             self._run(command)
@@ -972,6 +1139,30 @@ class AllPlatformTests(BasePlatformTests):
         o = self._run(self.mtest_command + ['--list', '--no-rebuild'])
         self.assertNotIn('Regenerating build files', o)
 
+    def test_skip_noop_regen(self):
+        if self.backend is not Backend.ninja:
+            raise SkipTest(f'{self.backend.name!r} backend does not support skip_noop_regen')
+
+        testdir = self.copy_srcdir(os.path.join(self.common_test_dir, '98 subproject subdir'))
+        self.init(testdir, extra_args=['-Dskip_noop_regen=true'])
+        self.build()
+        sub_build = os.path.join(testdir, 'subprojects', 'sub', 'meson.build')
+        self.utime(os.path.join(testdir, 'meson.build'))
+        self.utime(sub_build)
+        out = self.build()
+        self.assertIn('regeneration is not needed', out)
+        self.assertNotIn('The Meson build system', out)
+        self.assertBuildIsNoop()
+
+        with open(sub_build, 'a', encoding='utf-8') as f:
+            f.write('\n# changed\n')
+        out = self.build()
+        changed = [l for l in out.splitlines() if 'Regenerating because build files changed:' in l]
+        self.assertEqual(len(changed), 1)
+        self.assertTrue(changed[0].replace('\\', '/').endswith('subprojects/sub/meson.build'), changed[0])
+        self.assertIn('The Meson build system', out)
+        self.assertBuildIsNoop()
+
     def test_unexisting_test_name(self):
         testdir = os.path.join(self.unit_test_dir, '4 suite selection')
         self.init(testdir)
@@ -1060,6 +1251,71 @@ class AllPlatformTests(BasePlatformTests):
         self.assertBuildRelinkedOnlyTarget(name)
 
 
+    def test_compile_args_per_compiler(self):
+        '''
+        Arguments shared by the sources of a target are computed once per
+        compiler and must not leak between compilers or sources.
+        '''
+        testdir = self.copy_srcdir(os.path.join(self.common_test_dir, '1 trivial'))
+        with open(os.path.join(testdir, 'meson.build'), 'w', encoding='utf-8') as f:
+            f.write(textwrap.dedent('''
+                project('per compiler args', 'c', 'cpp')
+                executable('prog', 'a.c', 'b.c', 'c.cpp', c_args: '-DONLY_C', cpp_args: '-DONLY_CPP')
+                '''))
+        for name in ['a.c', 'b.c', 'c.cpp']:
+            with open(os.path.join(testdir, name), 'w', encoding='utf-8') as f:
+                f.write('int main(void) { return 0; }\n' if name == 'a.c' else '\n')
+        self.init(testdir)
+        commands = {os.path.basename(c['file']): split_args(c['command']) for c in self.get_compdb()}
+        self.assertEqual(sorted(commands), ['a.c', 'b.c', 'c.cpp'])
+        self.assertIn('-DONLY_C', commands['a.c'])
+        self.assertNotIn('-DONLY_CPP', commands['a.c'])
+        self.assertIn('-DONLY_CPP', commands['c.cpp'])
+        self.assertNotIn('-DONLY_C', commands['c.cpp'])
+        # Apart from the file names, both C sources have the same command line
+        self.assertEqual([a for a in commands['a.c'] if 'a.c' not in a],
+                         [a for a in commands['b.c'] if 'b.c' not in a])
+
+    def test_ninja_shared_variables(self):
+        '''
+        Long values shared by several build statements are written once as
+        global variables of build.ninja, the commands must stay the same.
+        '''
+        if self.backend is not Backend.ninja:
+            raise SkipTest(f'{self.backend.name!r} backend does not write build.ninja')
+        testdir = self.copy_srcdir(os.path.join(self.common_test_dir, '1 trivial'))
+        c_args = [f'-DMESON_LONG_DEFINE_NUMBER_{i}="some value {i}"' for i in range(10)]
+        with open(os.path.join(testdir, 'meson.build'), 'w', encoding='utf-8') as f:
+            f.write(textwrap.dedent(f'''
+                project('shared variables', 'c')
+                foreach t : ['one', 'two']
+                  executable(t, 'main.c', 'a.c', 'b.c', c_args: {c_args!r})
+                endforeach
+                '''))
+        with open(os.path.join(testdir, 'main.c'), 'w', encoding='utf-8') as f:
+            f.write('int main(void) { return 0; }\n')
+        for name in ['a.c', 'b.c']:
+            with open(os.path.join(testdir, name), 'w', encoding='utf-8') as f:
+                f.write('\n')
+
+        def ninja_commands() -> T.Tuple[str, str]:
+            with open(os.path.join(self.builddir, 'build.ninja'), encoding='utf-8') as f:
+                contents = f.read()
+            return contents, self._run(self.build_command + ['-t', 'commands'], workdir=self.builddir)
+
+        with mock.patch('mesonbuild.backend.ninjabackend.SHARED_VARIABLE_MIN_LENGTH', sys.maxsize):
+            self.init(testdir, inprocess=True)
+        plain_ninja, plain_commands = ninja_commands()
+        self.assertNotIn('shared_vars_', plain_ninja)
+
+        self.wipe()
+        self.init(testdir)
+        shared_ninja, shared_commands = ninja_commands()
+        self.assertIn('shared_vars_0 = ', shared_ninja)
+        self.assertLess(len(shared_ninja), len(plain_ninja))
+        self.assertIn('MESON_LONG_DEFINE_NUMBER_9', shared_commands)
+        self.assertEqual(shared_commands, plain_commands)
+
     def test_internal_include_order(self):
         if mesonbuild.envconfig.detect_msys2_arch() and ('MESON_RSP_THRESHOLD' in os.environ):
             raise SkipTest('Test does not yet support gcc rsp files on msys2')
@@ -7,11 +7,13 @@ from unittest import mock
 import argparse
 import contextlib
 import io
+import itertools
 import json
 import operator
 import os
 import pickle
 import stat
+import struct
 import subprocess
 import tempfile
 import textwrap
@@ -26,13 +28,15 @@ import mesonbuild.envconfig
 import mesonbuild.environment
 import mesonbuild.modules.gnome
 import mesonbuild.scripts.env2mfile
-from mesonbuild import coredata
+from mesonbuild import coredata, mparser
+from mesonbuild.scripts import depfixer
 from mesonbuild.compilers.c import ClangCCompiler, GnuCCompiler
 from mesonbuild.compilers.cpp import VisualStudioCPPCompiler
 from mesonbuild.compilers.d import DmdDCompiler
 from mesonbuild.linkers import linkers
 from mesonbuild.interpreterbase import typed_pos_args, InvalidArguments, ObjectHolder
 from mesonbuild.interpreterbase import typed_pos_args, InvalidArguments, typed_kwargs, ContainerTypeInfo, KwargInfo
+from mesonbuild.interpreterbase.decorators import compile_type_check
 from mesonbuild.mesonlib import (
     LibType, MachineChoice, PerMachine, Version, is_windows, is_osx,
     is_cygwin, is_openbsd, search_version, MesonException, python_command,
@@ -1620,6 +1624,62 @@ class InternalTests(unittest.TestCase):
         _(None, mock.Mock(), [['']], {'input': ['']})
         self.assertRaises(InvalidArguments, _, None, mock.Mock(), [], {'input': 42})
 
+    def test_container_type_info_compile_check(self) -> None:
+        infos = [
+            ContainerTypeInfo(list, str),
+            ContainerTypeInfo(list, (str, int)),
+            ContainerTypeInfo(list, str, allow_empty=False),
+            ContainerTypeInfo(list, str, pairs=True),
+            ContainerTypeInfo(dict, str),
+            ContainerTypeInfo(dict, (str, list)),
+            ContainerTypeInfo(dict, str, allow_empty=False),
+        ]
+        values = [
+            None, '', 'a', 1, True, [], ['a'], ['a', 'b'], ['a', 1], [1], [['a']],
+            {}, {'a': 'b'}, {'a': 1}, {'a': ['b']}, {'a': 'b', 'c': 'd'},
+        ]
+        for info in infos:
+            check = info.compile_check()
+            for value in values:
+                with self.subTest(info=info.description(), value=value):
+                    self.assertIs(check(value), info.check(value))
+
+    def test_compile_type_check(self) -> None:
+        def check(types_tuple, value) -> bool:
+            return any(t.check(value) if isinstance(t, ContainerTypeInfo) else isinstance(value, t)
+                       for t in types_tuple)
+
+        types = [
+            (str,),
+            (str, int),
+            (ContainerTypeInfo(list, str),),
+            (str, ContainerTypeInfo(list, str)),
+            (str, ContainerTypeInfo(list, str, allow_empty=False)),
+            (NoneType, ContainerTypeInfo(dict, str), ContainerTypeInfo(list, int)),
+            (ContainerTypeInfo(dict, (str, int)), ContainerTypeInfo(list, str, pairs=True)),
+        ]
+        values = [None, '', 'a', 1, [], ['a'], ['a', 'b'], [1], ['a', 1], {}, {'a': 'b'}, {'a': 1}, {'a': None}]
+        for types_tuple in types:
+            compiled = compile_type_check(types_tuple)
+            for value in values:
+                with self.subTest(types=types_tuple, value=value):
+                    self.assertIs(compiled(value), check(types_tuple, value))
+
+    def test_typed_pos_args_optargs_types(self) -> None:
+        @typed_pos_args('foo', str, optargs=[int, (str, int)])
+        def _(obj, node, args: T.Tuple[str, T.Optional[int], T.Optional[T.Union[str, int]]], kwargs) -> T.Tuple:
+            return args
+
+        self.assertEqual(_(None, mock.Mock(), ['a'], None), ('a', None, None))
+        self.assertEqual(_(None, mock.Mock(), ['a', 1], None), ('a', 1, None))
+        self.assertEqual(_(None, mock.Mock(), ['a', 1, 'b'], None), ('a', 1, 'b'))
+        with self.assertRaises(InvalidArguments) as cm:
+            _(None, mock.Mock(), ['a', 'b'], None)
+        self.assertEqual(str(cm.exception), 'foo argument 2 was of type "str" but should have been "int"')
+        with self.assertRaises(InvalidArguments) as cm:
+            _(None, mock.Mock(), ['a', 1, None], None)
+        self.assertEqual(str(cm.exception), 'foo argument 3 was of type "NoneType" but should have been one of: "str", "int"')
+
     def test_detect_cpu_family(self) -> None:
         """Test the various cpu families that we detect and normalize.
 
@@ -1763,6 +1823,55 @@ class InternalTests(unittest.TestCase):
         self.assertFalse(coredata.major_versions_differ('0.59.99', '0.59.99'))
         self.assertFalse(coredata.major_versions_differ('0.60.0.rc1', '0.60.0.rc2'))
 
+    def test_lexer_keep_whitespace(self) -> None:
+        code = textwrap.dedent('''\
+            # comment
+            x = [ 'a',  # trailing
+                  'b' ] \\
+                + ['c']
+            if 'd' not   in x
+              y = f\'\'\'multi
+            line\'\'\'
+            endif
+            ''')
+        full = list(mparser.Lexer(code).lex('meson.build'))
+        stripped = list(mparser.Lexer(code).lex('meson.build', keep_whitespace=False))
+        expected = [t for t in full if t.tid not in {'whitespace', 'comment'}]
+        self.assertEqual([(t.tid, t.lineno, t.colno, t.bytespan, t.value) for t in stripped],
+                         [(t.tid, t.lineno, t.colno, t.bytespan, t.value) for t in expected])
+        self.assertEqual(full[-2].tid, 'endif')
+        self.assertEqual(full[-2].lineno, 8)
+
+        for keep in (True, False):
+            ast = mparser.Parser(code, 'meson.build', keep_whitespace=keep).parse()
+            condition = ast.lines[1].ifs[0].condition
+            self.assertEqual(condition.ctype, 'not in')
+            self.assertEqual(condition.operator.value, 'not   in')
+
+        with self.assertRaises(mparser.ParseException):
+            list(mparser.Lexer('x = "a"').lex('meson.build', keep_whitespace=False))
+        with self.assertRaises(mparser.ParseException):
+            list(mparser.Lexer('x = 1 $ 2').lex('meson.build'))
+
+    def test_parse_cached(self) -> None:
+        with tempfile.TemporaryDirectory() as cachedir:
+            code = "x = ['a', 'b']\nif x.length() > 1\n  y = f'@x@'\nendif\n"
+            ast = mparser.parse_cached(code, 'meson.build', cachedir)
+            self.assertEqual(len(os.listdir(cachedir)), 1)
+            with mock.patch.object(mparser, 'Parser', side_effect=AssertionError('not cached')):
+                cached = mparser.parse_cached(code, 'meson.build', cachedir)
+            self.assertEqual(ast, cached)
+
+            # A modified file replaces the previous entry
+            ast = mparser.parse_cached(code + 'z = 1\n', 'meson.build', cachedir)
+            self.assertEqual(len(ast.lines), 3)
+            self.assertEqual(len(os.listdir(cachedir)), 1)
+
+            # Files with warnings are not cached, so they are printed every time
+            code = "foo(a : 1, a : 2)\n"
+            mparser.parse_cached(code, 'other.build', cachedir)
+            self.assertEqual(len(os.listdir(cachedir)), 1)
+
     def test_option_key_from_string(self) -> None:
         cases = [
             ('c_args', OptionKey('c_args')),
@@ -2167,3 +2276,108 @@ class InternalTests(unittest.TestCase):
                 self.assertEqual(actual.compile_args, expected.compile_args)
                 self.assertEqual(actual.link_args, expected.link_args)
                 self.assertEqual(actual.cmake, expected.cmake)
+
+    @staticmethod
+    def _write_elf(path: str, ptrsize: int, is_le: bool, runpath: bytes, dynamic: bool = True) -> None:
+        '''Write a minimal shared library with a DT_NEEDED and a DT_RUNPATH entry'''
+        structs = depfixer.get_structs(ptrsize, is_le)
+        shstrtab = b'\0.shstrtab\0.dynstr\0.dynamic\0'
+        dynstr = b'\0libfoo.so\0' + runpath + b'\0'
+        entries = [(depfixer.DT_NEEDED, 1), (depfixer.DT_RUNPATH, 11), (0, 0)]
+        sections = [(b'', 0, 0, b''),
+                    (b'.shstrtab', depfixer.SHT_STRTAB, 0, shstrtab),
+                    (b'.dynstr', depfixer.SHT_STRTAB, 0, dynstr)]
+        if dynamic:
+            sections.append((b'.dynamic', 6, structs.dynamic.size,
+                             b''.join(structs.dynamic.pack(*e) for e in entries)))
+        data = bytearray(structs.header.size)
+        headers = []
+        for name, sh_type, entsize, contents in sections:
+            sh_name = shstrtab.index(name + b'\0') if name else 0
+            headers.append(structs.section.pack(sh_name, sh_type, 0, 0, len(data), len(contents), 0, 0, 1, entsize))
+            data += contents
+        shoff = len(data)
+        data += b''.join(headers)
+        ident = b'\x7fELF' + bytes([1 if ptrsize == 32 else 2, 1 if is_le else 2, 1]) + bytes(9)
+        structs.header.pack_into(data, 0, ident, 3, 0, 1, 0, 0, shoff, 0, structs.header.size,
+                                 0, 0, structs.section.size, len(sections), 1)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def test_depfixer_fix_rpath(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            for ptrsize, is_le in itertools.product((32, 64), (True, False)):
+                with self.subTest(ptrsize=ptrsize, is_le=is_le):
+                    fname = os.path.join(d, f'lib{ptrsize}{is_le}.so')
+                    self._write_elf(fname, ptrsize, is_le, b'/build/sub:/usr/lib')
+                    depfixer.fix_rpath(fname, {b'/build/sub'}, '/opt/lib', fname, {}, verbose=False)
+                    with depfixer.Elf(fname, readonly=True) as e:
+                        self.assertEqual((e.ptrsize, e.is_le), (ptrsize, is_le))
+                        self.assertEqual(e.get_runpath(), '/opt/lib:/usr/lib')
+                        self.assertEqual(e.get_deps(), ['libfoo.so'])
+
+                    # Removing every entry drops DT_RUNPATH from .dynamic
+                    depfixer.fix_rpath(fname, {b'/opt/lib', b'/usr/lib'}, '', fname, {}, verbose=False)
+                    with depfixer.Elf(fname, readonly=True) as e:
+                        self.assertIsNone(e.get_runpath())
+                        self.assertEqual([i.d_tag for i in e.dynamic], [depfixer.DT_NEEDED, 0])
+                        self.assertEqual(e.get_deps(), ['libfoo.so'])
+
+    def test_depfixer_fix_rpath_errors(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            for ptrsize, is_le in itertools.product((32, 64), (True, False)):
+                with self.subTest(ptrsize=ptrsize, is_le=is_le):
+                    fname = os.path.join(d, f'lib{ptrsize}{is_le}.so')
+                    self._write_elf(fname, ptrsize, is_le, b'/usr/lib')
+                    with open(fname, 'rb') as f:
+                        contents = f.read()
+                    with self.assertRaises(SystemExit) as cm:
+                        depfixer.fix_rpath(fname, set(), '/a/much/longer/path', fname, {}, verbose=False)
+                    self.assertIn('New rpath must not be longer than the old one', str(cm.exception.code))
+                    with open(fname, 'rb') as f:
+                        self.assertEqual(f.read(), contents)
+
+                    # Without a .dynamic section there is nothing to patch
+                    self._write_elf(fname, ptrsize, is_le, b'/usr/lib', dynamic=False)
+                    with open(fname, 'rb') as f:
+                        contents = f.read()
+                    depfixer.fix_rpath(fname, set(), '/opt', fname, {}, verbose=False)
+                    with open(fname, 'rb') as f:
+                        self.assertEqual(f.read(), contents)
+
+                    # Section headers past the end of the file
+                    with open(fname, 'r+b') as f:
+                        f.truncate(len(contents) - 1)
+                    with self.assertRaises(struct.error):
+                        depfixer.Elf(fname, verbose=False)
+
+            # Files that are not ELF are skipped
+            fname = os.path.join(d, 'script.sh')
+            with open(fname, 'wb') as f:
+                f.write(b'#!/bin/sh\n')
+            with mock.patch('mesonbuild.scripts.depfixer.INSTALL_NAME_TOOL', None):
+                depfixer.fix_rpath(fname, set(), '/opt', fname, {}, verbose=False)
+            with open(fname, 'rb') as f:
+                self.assertEqual(f.read(), b'#!/bin/sh\n')
+
+    def test_depfixer_fix_rpaths(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            jobs = []
+            for ptrsize, is_le in itertools.product((32, 64), (True, False)):
+                fname = os.path.join(d, f'lib{ptrsize}{is_le}.so')
+                self._write_elf(fname, ptrsize, is_le, b'/build/sub:/usr/lib')
+                jobs.append((fname, {b'/build/sub'}, '/opt/lib', fname, {}))
+            depfixer.fix_rpaths(jobs, verbose=False, max_workers=2)
+            for fname, *_ in jobs:
+                with depfixer.Elf(fname, readonly=True) as e:
+                    self.assertEqual(e.get_runpath(), '/opt/lib:/usr/lib')
+
+            # An error in one file does not stop the others from being fixed
+            for fname, *_ in jobs:
+                self._write_elf(fname, 64, True, b'/build/sub:/usr/lib')
+            jobs[0] = (jobs[0][0], set(), '/a/path/that/is/much/too/long', jobs[0][0], {})
+            with self.assertRaises(SystemExit):
+                depfixer.fix_rpaths(jobs, verbose=False, max_workers=2)
+            for fname, *_ in jobs[1:]:
+                with depfixer.Elf(fname, readonly=True) as e:
+                    self.assertEqual(e.get_runpath(), '/opt/lib:/usr/lib')
@@ -9,6 +9,7 @@ import textwrap
 import os
 import shutil
 import hashlib
+import time
 from unittest import mock, skipUnless, SkipTest
 from glob import glob
 from pathlib import Path
@@ -25,7 +26,7 @@ import mesonbuild.modules.gnome
 from mesonbuild.mesonlib import (
     MachineChoice, is_windows, is_osx, is_cygwin, is_openbsd, is_haiku,
     is_sunos, windows_proof_rmtree, version_compare, is_linux,
-    EnvironmentException
+    EnvironmentException, Popen_safe
 )
 from mesonbuild.options import OptionKey
 from mesonbuild.compilers import (
@@ -1154,6 +1155,94 @@ class LinuxlikeTests(BasePlatformTests):
         link_args = ['-L' + libpath.as_posix(), '-lrelativepath']
         self.assertEqual(relative_path_dep.get_link_args(), link_args)
 
+    @skipIfNoPkgconfig
+    def test_pkgconfig_query_cache(self):
+        '''
+        Test that pkg-config results are kept in the coredata across Meson
+        runs, until a .pc file in the search path changes.
+        '''
+        testdir = os.path.join(self.unit_test_dir, '61 pkgconfig relative paths')
+        pkg_dir = os.path.join(self.builddir, 'pkgconfig')
+        os.mkdir(pkg_dir)
+        pc_template = 'Name: {0}\nDescription: {0}\nVersion: {1}\nCflags:\nLibs:\n'
+        with open(os.path.join(pkg_dir, 'foo.pc'), 'w', encoding='utf-8') as f:
+            f.write(pc_template.format('foo', '1.0'))
+
+        env = get_fake_env(testdir, self.builddir, self.prefix)
+        env.coredata.optstore.set_option(OptionKey('pkg_config_path'), pkg_dir)
+        impl = PkgConfigCLI(env, MachineChoice.HOST, silent=True)
+        self.assertEqual(impl._call_pkgbin(['--modversion', 'foo'])[0:2], (0, '1.0'))
+        self.assertNotEqual(impl._call_pkgbin(['--modversion', 'bar'])[0], 0)
+        # Errors other than a missing .pc file are not cached
+        failure = (mock.Mock(returncode=1), '', 'pkg-config: out of memory')
+        with mock.patch('mesonbuild.dependencies.pkgconfig.Popen_safe', return_value=failure):
+            self.assertEqual(impl._call_pkgbin(['--modversion', 'foo', '--print-errors'])[0], 1)
+        os.makedirs(os.path.join(self.builddir, 'meson-private'), exist_ok=True)
+        mesonbuild.coredata.save(env.coredata, self.builddir)
+        env.coredata = mesonbuild.coredata.load(self.builddir)
+
+        # A new run does not spawn pkg-config again, found or not. It only
+        # asks for the default search path to check that no .pc file changed.
+        impl = PkgConfigCLI(env, MachineChoice.HOST, silent=True)
+        with mock.patch('mesonbuild.dependencies.pkgconfig.Popen_safe', wraps=Popen_safe) as popen:
+            self.assertEqual(impl._call_pkgbin(['--modversion', 'foo'])[0:2], (0, '1.0'))
+            self.assertNotEqual(impl._call_pkgbin(['--modversion', 'bar'])[0], 0)
+            self.assertEqual(impl._call_pkgbin(['--modversion', 'foo', '--print-errors'])[0:2], (0, '1.0'))
+        ncmd = len(impl.pkgbin.get_command())
+        self.assertEqual([c.args[0][ncmd:] for c in popen.call_args_list],
+                         [['--variable=pc_path', 'pkg-config'],
+                          ['--modversion', 'foo', '--print-errors']])
+
+        # But it does after a .pc file was added or modified
+        with open(os.path.join(pkg_dir, 'foo.pc'), 'w', encoding='utf-8') as f:
+            f.write(pc_template.format('foo', '2.0'))
+        with open(os.path.join(pkg_dir, 'bar.pc'), 'w', encoding='utf-8') as f:
+            f.write(pc_template.format('bar', '1.0'))
+        mtime = time.time() + 10
+        os.utime(os.path.join(pkg_dir, 'foo.pc'), (mtime, mtime))
+        impl = PkgConfigCLI(env, MachineChoice.HOST, silent=True)
+        self.assertEqual(impl._call_pkgbin(['--modversion', 'foo'])[0:2], (0, '2.0'))
+        self.assertEqual(impl._call_pkgbin(['--modversion', 'bar'])[0:2], (0, '1.0'))
+
+    @skipIfNoPkgconfig
+    def test_pkgconfig_prefetch(self):
+        '''
+        Test that pkg-config queries run together give the same results as
+        when run one by one, and that a dependency runs each query only once.
+        '''
+        testdir = os.path.join(self.unit_test_dir, '61 pkgconfig relative paths')
+        pkg_dir = os.path.join(testdir, 'pkgconfig')
+
+        def new_impl():
+            env = get_fake_env(testdir, self.builddir, self.prefix)
+            env.coredata.optstore.set_option(OptionKey('pkg_config_path'), pkg_dir)
+            return env, PkgConfigCLI(env, MachineChoice.HOST, silent=True)
+
+        queries = [(['--cflags', 'librelativepath'], None),
+                   (['--libs', 'librelativepath'], dict(os.environ, PKG_CONFIG_ALLOW_SYSTEM_LIBS='1')),
+                   (['--libs', 'librelativepath'], None),
+                   (['--modversion', 'nonexistent'], None)]
+        _, impl = new_impl()
+        expected = []
+        for args, env in queries:
+            p, out, err = Popen_safe(impl.pkgbin.get_command() + args, env=impl._setup_env(env or os.environ))
+            expected.append((p.returncode, out.strip(), err.strip()))
+        self.assertEqual(impl._call_pkgbin_many(queries), expected)
+
+        env, impl = new_impl()
+        kwargs = {'required': True, 'silent': True, 'native': MachineChoice.HOST}
+        with mock.patch.object(PkgConfigInterface, 'instance', return_value=impl), \
+                mock.patch('mesonbuild.dependencies.pkgconfig.Popen_safe', wraps=Popen_safe) as popen:
+            dep = PkgConfigDependency('librelativepath', env, kwargs)
+        self.assertTrue(dep.found())
+        ncmd = len(impl.pkgbin.get_command())
+        self.assertCountEqual([c.args[0][ncmd:] for c in popen.call_args_list],
+                              [['--variable=pc_path', 'pkg-config'],
+                               ['--modversion', 'librelativepath'],
+                               ['--cflags', 'librelativepath'],
+                               ['--libs', 'librelativepath'],
+                               ['--libs', 'librelativepath']])
+
     @skipIfNoPkgconfig
     def test_pkgconfig_duplicate_path_entries(self):
         testdir = os.path.join(self.unit_test_dir, '111 pkgconfig duplicate path entries')
@@ -1847,6 +1936,44 @@ class LinuxlikeTests(BasePlatformTests):
             stdout = self._run(['dsymutil', '--dump-debug-map', lib])
             self.assertNotIn('symbols:', stdout)
 
+    def test_install_copy_mode(self):
+        testdir = os.path.join(self.common_test_dir, '8 install')
+        self.init(testdir)
+        self.build()
+
+        destdir = self.installdir + self.prefix
+        data_src = os.path.join(self.builddir, 'dir', 'file.txt')
+        data_dst = os.path.join(destdir, 'share', 'dir', 'file.txt')
+        exe_src = os.path.join(self.builddir, 'prog')
+        exe_dst = os.path.join(destdir, 'bin', 'prog')
+        install_cmd = self.meson_command + ['install', '--destdir', self.installdir, '-j', '4']
+
+        self._run(install_cmd + ['--copy-mode', 'hardlink'], workdir=self.builddir)
+        self.assertTrue(os.path.samefile(data_src, data_dst))
+        # Targets are modified in place when installing, they are never linked
+        self.assertFalse(os.path.samefile(exe_src, exe_dst))
+        self._run([exe_dst])
+
+        # Files whose permissions are changed when installed are not linked,
+        # which would change the permissions of the original file
+        os.chmod(data_src, 0o600)
+        self._run(install_cmd + ['--copy-mode', 'hardlink'], workdir=self.builddir)
+        self.assertFalse(os.path.samefile(data_src, data_dst))
+        self.assertEqual(stat.S_IMODE(os.stat(data_src).st_mode), 0o600)
+        self.assertEqual(stat.S_IMODE(os.stat(data_dst).st_mode), 0o644)
+
+        # Hardlinks are only made into a DESTDIR
+        with self.assertRaises(subprocess.CalledProcessError) as cm:
+            self._run(self.meson_command + ['install', '--copy-mode', 'hardlink'], workdir=self.builddir)
+        self.assertIn('can only be used with a DESTDIR', cm.exception.stdout)
+
+        for copy_mode in ['reflink', 'copy']:
+            self._run(install_cmd + ['--copy-mode', copy_mode], workdir=self.builddir)
+            self.assertFalse(os.path.samefile(data_src, data_dst))
+            self.assertFalse(os.path.samefile(exe_src, exe_dst))
+            with open(exe_src, 'rb') as f1, open(exe_dst, 'rb') as f2:
+                self.assertEqual(f1.read(), f2.read())
+
     def test_isystem_default_removal_with_symlink(self):
         env = get_fake_env()
         cpp = detect_cpp_compiler(env, MachineChoice.HOST)
@@ -1889,6 +2016,51 @@ class LinuxlikeTests(BasePlatformTests):
         self.assertIn('build t12-e1: c_LINKER t12-e1.p/main.c.o | libt12-s1.a libt12-s2.a libt12-s3.a\n', content)
         self.assertIn('build t13-e1: c_LINKER t13-e1.p/main.c.o | libt12-s1.a libt13-s3.a\n', content)
 
+    def test_script_worker(self):
+        if self.backend is not Backend.ninja:
+            raise SkipTest(f'{self.backend.name!r} backend does not support script_worker')
+        testdir = os.path.join(self.common_test_dir, '109 custom target capture')
+        self.init(testdir, extra_args=['-Dscript_worker=true'])
+        with open(os.path.join(self.builddir, 'build.ninja'), encoding='utf-8') as f:
+            self.assertIn('worker_client.py', f.read())
+
+        # The first client starts the worker and runs its script by itself
+        self.build()
+        output = os.path.join(self.builddir, 'data.dat')
+        with open(output, encoding='utf-8') as f:
+            expected = f.read()
+        sockpath = os.path.join(self.privatedir, 'worker.sock')
+        for _ in range(100):
+            if os.path.exists(sockpath):
+                break
+            time.sleep(0.1)
+        self.assertPathExists(sockpath)
+
+        self.clean()
+        self.build()
+        with open(output, encoding='utf-8') as f:
+            self.assertEqual(f.read(), expected)
+
+    def test_symbolextractor_elf(self):
+        if self.backend is not Backend.ninja:
+            raise SkipTest(f'{self.backend.name!r} backend does not extract symbols')
+        testdir = self.copy_srcdir(os.path.join(self.common_test_dir, '6 linkshared'))
+        self.init(testdir)
+        self.build()
+        symfile = os.path.join(self.builddir, 'libmylib.so.p', 'libmylib.so.symbols')
+        with open(symfile, encoding='utf-8') as f:
+            symbols = f.read().splitlines()
+        self.assertEqual(symbols[0], 'SONAME libmylib.so')
+        self.assertIn('func FUNC GLOBAL', symbols)
+
+        # Adding an exported symbol changes the ABI and relinks the executable
+        with open(os.path.join(testdir, 'libfile.c'), 'a', encoding='utf-8') as f:
+            f.write('\nint DLL_PUBLIC func2(void) {\n    return 1;\n}\n')
+        out = self.build()
+        self.assertIn('Linking target prog', out)
+        with open(symfile, encoding='utf-8') as f:
+            self.assertIn('func2 FUNC GLOBAL', f.read().splitlines())
+
     def test_top_options_in_sp(self):
         testdir = os.path.join(self.unit_test_dir, '127 pkgsubproj')
         self.init(testdir)
@@ -536,3 +536,110 @@ class OptionTests(unittest.TestCase):
         optstore.add_system_option(build_pkg_config, build_option_obj)
         option, value = optstore.get_option_and_value_for(build_pkg_config)
         self.assertEqual(value, ['/mingw/lib64/pkgconfig'])
+
+    def test_value_cache_invalidation(self):
+        name = 'optimization'
+        subp = 'subp'
+        optstore = OptionStore(False)
+        prefix = UserStringOption('prefix', 'This is needed by OptionStore', '/usr')
+        optstore.add_system_option('prefix', prefix)
+        o = UserComboOption(name, 'Optimization level', '0', choices=['plain', '0', 'g', '1', '2', '3', 's'])
+        optstore.add_system_option(name, o)
+        self.assertEqual(optstore.get_value_for(name), '0')
+        self.assertEqual(optstore.get_value_for(name, subp), '0')
+
+        optstore.set_option(OptionKey(name), '2')
+        self.assertEqual(optstore.get_value_for(name), '2')
+        self.assertEqual(optstore.get_value_for(name, subp), '2')
+
+        optstore.set_augment(OptionKey(name, subproject=subp), '3')
+        self.assertEqual(optstore.get_value_for(name), '2')
+        self.assertEqual(optstore.get_value_for(name, subp), '3')
+
+        optstore.set_from_configure_command({OptionKey(name, subproject=subp): None})
+        self.assertEqual(optstore.get_value_for(name, subp), '2')
+
+    def test_value_cache_yielding(self):
+        name = 'someoption'
+        subp = 'subp'
+        optstore = OptionStore(False)
+        optstore.add_project_option(OptionKey(name, subproject=''),
+                                    UserStringOption(name, 'Top level option', 'top'))
+        optstore.add_project_option(OptionKey(name, subproject=subp),
+                                    UserStringOption(name, 'Yielding option', 'sub', yielding=True))
+        self.assertEqual(optstore.get_value_for(name, subp), 'top')
+        optstore.set_option(OptionKey(name, subproject=''), 'changed')
+        self.assertEqual(optstore.get_value_for(name, subp), 'changed')
+
+    def test_snapshot(self):
+        name = 'optimization'
+        subp = 'subp'
+        optstore = OptionStore(False)
+        prefix = UserStringOption('prefix', 'This is needed by OptionStore', '/usr')
+        optstore.add_system_option('prefix', prefix)
+        o = UserComboOption(name, 'Optimization level', '0', choices=['plain', '0', 'g', '1', '2', '3', 's'])
+        optstore.add_system_option(name, o)
+        optstore.add_project_option(OptionKey('projopt', subproject=subp),
+                                    UserStringOption('projopt', 'A project option', 'foo'))
+        optstore.add_project_option(OptionKey('otheropt', subproject=''),
+                                    UserStringOption('otheropt', 'Another project option', 'bar'))
+        optstore.set_augment(OptionKey(name, subproject=subp), '3')
+
+        snapshot = optstore.get_snapshot(subp)
+        self.assertEqual(dict(snapshot), {OptionKey('prefix', subproject=subp): '/usr',
+                                          OptionKey(name, subproject=subp): '3',
+                                          OptionKey('projopt', subproject=subp): 'foo'})
+        self.assertIs(optstore.get_snapshot(subp), snapshot)
+        with self.assertRaises(TypeError):
+            snapshot[OptionKey(name, subproject=subp)] = '1'
+
+        optstore.set_option(OptionKey('projopt', subproject=subp), 'new')
+        self.assertEqual(snapshot[OptionKey('projopt', subproject=subp)], 'foo')
+        self.assertEqual(optstore.get_snapshot(subp)[OptionKey('projopt', subproject=subp)], 'new')
+        self.assertEqual(dict(optstore.get_snapshot('')), {OptionKey('prefix', subproject=''): '/usr',
+                                                           OptionKey(name, subproject=''): '0',
+                                                           OptionKey('otheropt', subproject=''): 'bar'})
+
+    def test_snapshot_for_target(self):
+        from unittest import mock
+        from mesonbuild.coredata import CoreData
+        from mesonbuild.mesonlib import MachineChoice, MesonException
+        name = 'optimization'
+        subp = 'subp'
+        optstore = OptionStore(False)
+        prefix = UserStringOption('prefix', 'This is needed by OptionStore', '/usr')
+        optstore.add_system_option('prefix', prefix)
+        o = UserComboOption(name, 'Optimization level', '0', choices=['plain', '0', 'g', '1', '2', '3', 's'])
+        optstore.add_system_option(name, o)
+        optstore.set_augment(OptionKey(name, subproject=subp), '3')
+        coredata = mock.Mock(optstore=optstore, is_cross_build=lambda: False)
+        overrides = {}
+        target = mock.Mock(subproject=subp, for_machine=MachineChoice.HOST, get_override=overrides.get)
+
+        self.assertEqual(CoreData.get_option_for_target(coredata, target, name), '3')
+        self.assertIn(subp, optstore.snapshots)
+
+        # Target overrides are still validated by the option
+        overrides[name] = '2'
+        self.assertEqual(CoreData.get_option_for_target(coredata, target, name), '2')
+        overrides[name] = 'bogus'
+        with self.assertRaises(MesonException):
+            CoreData.get_option_for_target(coredata, target, name)
+        del overrides[name]
+
+        optstore.set_option(OptionKey(name), 's')
+        self.assertEqual(optstore.snapshots, {})
+        self.assertEqual(CoreData.get_option_for_target(coredata, target, name), '3')
+        target.subproject = ''
+        self.assertEqual(CoreData.get_option_for_target(coredata, target, name), 's')
+
+    def test_value_cache_not_pickled(self):
+        import pickle
+        optstore = OptionStore(False)
+        optstore.add_system_option('someoption', UserStringOption('someoption', 'An option', 'value'))
+        optstore.get_value_for('someoption')
+        optstore.get_snapshot('')
+        restored = pickle.loads(pickle.dumps(optstore))
+        self.assertEqual(restored.value_cache, {})
+        self.assertEqual(restored.snapshots, {})
+        self.assertEqual(restored.get_value_for('someoption'), 'value')